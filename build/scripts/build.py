@@ -6,15 +6,21 @@ import sys
 import compile_ui
 import fnmatch
 
-def clean():
+def clean(remove_all=False):
+    """Removes generated Ui_*.py files.
+
+    Args:
+      remove_all (bool): If True every generated file is removed. Otherwise only files whose .ui source no longer exists are removed, so that unchanged forms are not compiled again.
+    """
     sourceDir = "commotion_client"
-    # Compile .ui files
-    print("\nCompiling user interface files ...")
-    # step 1: remove old Ui_*.py files
+    print("\nRemoving {0}user interface files ...".format("" if remove_all else "orphaned "))
+    # remove old Ui_*.py files
     try:
         for root, _, files in os.walk(sourceDir):
             for file in [f for f in files if fnmatch.fnmatch(f, 'Ui_*.py')]:
-                os.remove(os.path.join(root, file))
+                path = os.path.join(root, file)
+                if remove_all or not os.path.isfile(compile_ui.uiSource(path)):
+                    os.remove(path)
     except Exception as e:
         sys.exit(e)
 
@@ -30,7 +36,7 @@ def build():
 
 if __name__ == "__main__":
     if sys.argv[1] == "clean":
-        clean()
+        clean("--all" in sys.argv[2:])
     elif sys.argv[1] == "build":
         build()
     else:
@@ -11,100 +11,190 @@
 Script for Commotion to compile all .ui files to Python source.
 
 From the eric5 projects code base.
+
+Only .ui files that have changed since they were last compiled are compiled again. A .ui file has changed if its content hash differs from the one recorded when it was last compiled, or, if no hash was recorded, if it is newer than its generated module. Changed files are compiled in parallel across a pool of processes.
 """
 
 import sys
 import os
+import json
+import time
+import hashlib
+import argparse
+from concurrent import futures
+
+#The file the content hash of each compiled .ui file is recorded in.
+MANIFEST_PATH = os.path.join("build", "resources", "ui_manifest.json")
+
+
+def pyName(py_dir, py_file):
+    """
+    Function to create the Python source file name for the compiled
+    .ui file.
+    
+    @param py_dir suggested name of the directory (string)
+    @param py_file suggested name for the compile source file (string)
+    @return tuple of directory name (string) and source file name (string)
+    """
+    return py_dir, "Ui_{0}".format(py_file)
+
+
+def uiSource(py_path):
+    """
+    Function to get the .ui file a generated Python module is compiled from.
+    
+    @param py_path path of a generated Ui_*.py module (string)
+    @return path of the .ui file (string) or None if it is not a generated module
+    """
+    py_dir, py_file = os.path.split(py_path)
+    if not (py_file.startswith("Ui_") and py_file.endswith(".py")):
+        return None
+    return os.path.join(py_dir, py_file[len("Ui_"):-len(".py")] + ".ui")
+
+
+def findUiFiles(root="."):
+    """
+    Function to find every .ui file in a directory tree.
+    
+    @param root directory to search (string)
+    @return sorted list of (ui path, py path) tuples
+    """
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".") and d != "__pycache__"]
+        for ui_file in filenames:
+            if ui_file.endswith('.ui'):
+                py_dir, py_file = pyName(dirpath, ui_file[:-3] + '.py')
+                found.append((os.path.join(dirpath, ui_file), os.path.join(py_dir, py_file)))
+    return sorted(found)
+
+
+def fileHash(path):
+    """
+    Function to get the sha256 hex digest of a file.
+    
+    @param path path of the file (string)
+    @return hex digest (string)
+    """
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
 
 
-def compileUiFiles():
+def loadManifest(path=MANIFEST_PATH):
+    """
+    Function to load the content hashes recorded for compiled .ui files.
+    
+    @param path path of the manifest (string)
+    @return dictionary of hex digests keyed by .ui path
     """
-    Compile the .ui files to Python sources.
-    """                                                 # __IGNORE_WARNING__
     try:
-        from PyQt4.uic import compileUiDir
-    except ImportError:
-        from PyQt4.uic import compileUi
-        
-        def compileUiDir(dir, recurse=False,            # __IGNORE_WARNING__
-                         map=None, **compileUi_args):
-            """
-            Creates Python modules from Qt Designer .ui files in a directory or
-            directory tree.
-            
-            Note: This function is a modified version of the one found in
-            PyQt4.
-
-            @param dir Name of the directory to scan for files whose name ends
-                with '.ui'. By default the generated Python module is created
-                in the same directory ending with '.py'.
-            @param recurse flag indicating that any sub-directories should be
-                scanned.
-            @param map an optional callable that is passed the name of the
-                directory containing the '.ui' file and the name of the Python
-                module that will be created. The callable should return a tuple
-                of the name of the directory in which the Python module will be
-                created and the (possibly modified) name of the module.
-            @param compileUi_args any additional keyword arguments that are
-                passed to the compileUi() function that is called to create
-                each Python module.
-            """
-            def compile_ui(ui_dir, ui_file):
-                """
-                Local function to compile a single .ui file.
-                
-                @param ui_dir directory containing the .ui file (string)
-                @param ui_file file name of the .ui file (string)
-                """
-                # Ignore if it doesn't seem to be a .ui file.
-                if ui_file.endswith('.ui'):
-                    py_dir = ui_dir
-                    py_file = ui_file[:-3] + '.py'
-
-                    # Allow the caller to change the name of the .py file or
-                    # generate it in a different directory.
-                    if map is not None:
-                        py_dir, py_file = list(map(py_dir, py_file))
-
-                    # Make sure the destination directory exists.
-                    try:
-                        os.makedirs(py_dir)
-                    except:
-                        pass
-
-                    ui_path = os.path.join(ui_dir, ui_file)
-                    py_path = os.path.join(py_dir, py_file)
-
-                    ui_file = open(ui_path, 'r')
-                    py_file = open(py_path, 'w')
-
-                    try:
-                        compileUi(ui_file, py_file, **compileUi_args)
-                    finally:
-                        ui_file.close()
-                        py_file.close()
-
-            if recurse:
-                for root, _, files in os.walk(dir):
-                    for ui in files:
-                        compile_ui(root, ui)
-            else:
-                for ui in os.listdir(dir):
-                    if os.path.isfile(os.path.join(dir, ui)):
-                        compile_ui(dir, ui)
+        with open(path, 'r', encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def saveManifest(manifest, path=MANIFEST_PATH):
+    """
+    Function to save the content hashes recorded for compiled .ui files.
+    
+    @param manifest dictionary of hex digests keyed by .ui path
+    @param path path of the manifest (string)
+    """
+    manifest_dir = os.path.dirname(path)
+    if manifest_dir and not os.path.isdir(manifest_dir):
+        os.makedirs(manifest_dir)
+    with open(path + ".tmp", 'w', encoding="utf-8") as f:
+        json.dump(manifest, f, sort_keys=True, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def isStale(ui_path, py_path, digest, manifest):
+    """
+    Function to check if a .ui file needs to be compiled.
+    
+    @param ui_path path of the .ui file (string)
+    @param py_path path of its generated module (string)
+    @param digest current hex digest of the .ui file (string)
+    @param manifest dictionary of recorded hex digests keyed by .ui path
+    @return flag indicating that the .ui file has to be compiled
+    """
+    if not os.path.isfile(py_path):
+        return True
+    if ui_path in manifest:
+        return manifest[ui_path] != digest
+    return os.path.getmtime(ui_path) > os.path.getmtime(py_path)
+
+
+def compileUiFile(ui_path, py_path):
+    """
+    Function to compile a single .ui file. Runs in a worker process.
     
-    def pyName(py_dir, py_file):
-        """
-        Local function to create the Python source file name for the compiled
-        .ui file.
-        
-        @param py_dir suggested name of the directory (string)
-        @param py_file suggested name for the compile source file (string)
-        @return tuple of directory name (string) and source file name (string)
-        """
-        return py_dir, "Ui_{0}".format(py_file)
+    The module is written to a temporary file first so that a failed
+    compile never leaves a partial module that looks up to date.
     
-    compileUiDir(".", True, pyName, pyqt3_wrapper=True, )
+    @param ui_path path of the .ui file (string)
+    @param py_path path of the Python module to create (string)
+    @return number of seconds the compile took (float)
+    """
+    from PyQt4.uic import compileUi
+    started = time.time()
+    temp_path = py_path + ".tmp"
+    try:
+        with open(ui_path, 'r') as ui_file, open(temp_path, 'w') as py_file:
+            compileUi(ui_file, py_file, pyqt3_wrapper=True)
+        os.replace(temp_path, py_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return time.time() - started
+
+
+def compileUiFiles(root=".", force=False, jobs=None):
+    """
+    Compile the changed .ui files to Python sources.
+    
+    @param root directory to search for .ui files (string)
+    @param force flag indicating that every .ui file should be compiled
+    @param jobs number of worker processes (integer). Defaults to the
+        number of processors.
+    @return list of the .ui paths that were compiled
+    """
+    started = time.time()
+    manifest = {} if force else loadManifest()
+    digests = {}
+    stale = []
+    for ui_path, py_path in findUiFiles(root):
+        digests[ui_path] = fileHash(ui_path)
+        if force or isStale(ui_path, py_path, digests[ui_path], manifest):
+            stale.append((ui_path, py_path))
+        else:
+            manifest[ui_path] = digests[ui_path]
+    print("{0} of {1} user interface files changed.".format(len(stale), len(digests)))
+    compiled = []
+    failed = []
+    if stale:
+        with futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            jobs_ = dict((pool.submit(compileUiFile, ui_path, py_path), ui_path) for ui_path, py_path in stale)
+            for job in futures.as_completed(jobs_):
+                ui_path = jobs_[job]
+                try:
+                    seconds = job.result()
+                except Exception as e:
+                    failed.append(ui_path)
+                    print("  failed   {0}: {1}".format(ui_path, e))
+                    continue
+                manifest[ui_path] = digests[ui_path]
+                compiled.append(ui_path)
+                print("  {0:6.2f}s  {1}".format(seconds, ui_path))
+    #forget files that no longer exist
+    manifest = dict((path, digest) for path, digest in manifest.items() if path in digests)
+    saveManifest(manifest)
+    print("Compiled {0} user interface files in {1:.2f}s.".format(len(compiled), time.time() - started))
+    if failed:
+        raise RuntimeError("{0} user interface files could not be compiled.".format(len(failed)))
+    return sorted(compiled)
 
 
 def main(argv):
@@ -113,9 +203,13 @@ def main(argv):
 
     @param argv the list of command line arguments.
     """
+    parser = argparse.ArgumentParser(description="Compile the changed .ui files to Python sources.")
+    parser.add_argument("--force", action="store_true", help="Compile every .ui file even if it has not changed.")
+    parser.add_argument("--jobs", type=int, default=None, help="The number of worker processes. Defaults to the number of processors.")
+    args = parser.parse_args(argv[1:])
     # Compile .ui files
     print("Compiling user interface files...")
-    compileUiFiles()
+    compileUiFiles(force=args.force, jobs=args.jobs)
     
     
 if __name__ == "__main__":
@@ -24,10 +24,29 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 zip_extensions.py
 
 This module takes all extensions in the commotion_client/extension/ directory and prepares them as commotion packages.
+
+Archives are written deterministically. Members are added in sorted order with fixed timestamps and permissions, so the same inputs always produce a byte for byte identical archive. A manifest of the content hash of each extension's inputs is kept in the destination directory. Extensions whose inputs have not changed since they were last packaged are skipped.
+
+Archives can also carry byte-code. A module.pyc member compiled by the interpreter running the packager is added beside each module.py member. zipimport loads the .pyc instead of compiling the source each time an extension is imported. Interpreters with a different magic number fall back to the source. The .pyc members are checked-hash files (PEP 552) so they do not depend on member timestamps. They need Python 3.7 or newer to build.
 """
 
 import zipfile
 import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import tempfile
+import py_compile
+import importlib.util
+
+#The timestamp given to every archive member. (The earliest a zip archive can record.)
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+#The name of the file in the destination directory that records the inputs of each packaged extension.
+MANIFEST_NAME = "zip_manifest.json"
+#Bumped whenever the archive layout changes so that every extension is packaged again.
+PACKAGER_VERSION = 1
 
 def get_extensions(main_directory):
     """Gets all extension sub-directories within a given directory.
@@ -36,7 +55,7 @@ def get_extensions(main_directory):
       main_directory (string): The path to the main extension directory to check for extensions within.
     
     Returns:
-      A list containing of all of the extension directories within the main_directory.
+      A sorted list containing of all of the extension directories within the main_directory.
         ['path/to/extension01', 'path/to/extension02', 'path/to/extension03']
     """
     #if not a directory... shame on them
@@ -50,36 +69,166 @@ def get_extensions(main_directory):
             if directory != "__pycache__":
                 extensions.append(os.path.join(dirpath, directory))
         break
-    return extensions
+    return sorted(extensions)
+
+def get_members(source):
+    """Gets the files that make up an extension in the order they are archived.
+
+    Every directory in an extension is given an __init__.py file if it does not have one.
+
+    Args:
+      source (string): The path to the source directory which contains the extension files.
+
+    Returns:
+      A list of (archive name, file path) tuples sorted by archive name. Archive names always use "/" as their separator.
+    """
+    members = []
+    for dirpath, dirnames, filenames in os.walk(source):
+        #byte-code is not reproducible and is never packaged
+        dirnames[:] = [directory for directory in dirnames if directory != "__pycache__"]
+        if "__init__.py" not in filenames:
+            touch_init(dirpath)
+            filenames.append("__init__.py")
+        for zip_file in filenames:
+            if zip_file.endswith((".pyc", ".pyo")):
+                continue
+            file_path = os.path.join(dirpath, zip_file)
+            members.append((os.path.relpath(file_path, source).replace(os.sep, "/"), file_path))
+    return sorted(members)
+
+def file_hash(path, block_size=65536):
+    """Returns the sha256 hex digest of a file, reading it block_size bytes at a time."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as _file:
+        for block in iter(lambda: _file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def bytecode_supported():
+    """Returns True if the running interpreter can write byte-code that does not depend on timestamps."""
+    return sys.version_info >= (3, 7)
+
+def compile_bytecode(name, path, extension_name):
+    """Compiles a source file into the contents of a checked-hash .pyc file for the running interpreter.
+
+    Args:
+      name (string): The archive name of the source file.
+      path (string): The path to the source file.
+      extension_name (string): The name of the extension the source file is packaged into.
+
+    Returns:
+      The .pyc file (bytes).
+
+    Raises:
+      py_compile.PyCompileError: If the source file could not be compiled.
+    """
+    handle, temp_path = tempfile.mkstemp(suffix=".pyc")
+    os.close(handle)
+    try:
+        py_compile.compile(path, cfile=temp_path, dfile="/".join([extension_name, name]), doraise=True,
+                           invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH)
+        with open(temp_path, 'rb') as compiled:
+            return compiled.read()
+    finally:
+        os.remove(temp_path)
+
+def inputs_hash(members, compresslevel, bytecode=False):
+    """Returns a sha256 hex digest of everything that goes into an archive.
+
+    Args:
+      members (list): The (archive name, file path) tuples of an extension. See get_members().
+      compresslevel (int): The compression level the archive is written with.
+      bytecode (bool): If the archive carries byte-code. The byte-code's magic number is part of the hash.
+    """
+    digest = hashlib.sha256()
+    magic = importlib.util.MAGIC_NUMBER.hex() if bytecode else None
+    digest.update("{0}:{1}:{2}\n".format(PACKAGER_VERSION, compresslevel, magic).encode("utf-8"))
+    for name, path in members:
+        digest.update("{0}:{1}\n".format(name, file_hash(path)).encode("utf-8"))
+    return digest.hexdigest()
+
+def load_manifest(destination):
+    """Returns the recorded input hash of each extension packaged into a directory. A missing or unreadable manifest is empty."""
+    try:
+        with open(os.path.join(destination, MANIFEST_NAME), mode='r', encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+def save_manifest(destination, manifest):
+    """Writes the recorded input hash of each extension packaged into a directory."""
+    path = os.path.join(destination, MANIFEST_NAME)
+    with open(path + ".tmp", mode='w', encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, sort_keys=True, indent=2)
+    os.replace(path + ".tmp", path)
+
+def zip_extension(source, destination, compresslevel=9, manifest=None, bytecode=False):
+    """Packages an extension into a new archive named after the extension.
+
+    The archive is written to a temporary file that replaces any existing archive once it is complete. Member data is streamed into the archive.
 
-def zip_extension(source, destination):
-    """short description
-    
-    long description
-    
     Args:
       source (string): The relative path to the source directory which contains the extension files.
       destination (string): The relative path to the destination directory where the zipfile will be placed.
-    
+      compresslevel (int): The deflate compression level from 0 (stored) to 9. Levels other than 0 and the default need Python 3.7 or newer.
+      manifest (dict): If provided the extension is skipped when its recorded input hash is unchanged and its archive exists. The new input hash is recorded in it.
+      bytecode (bool): If True a .pyc member is added beside every .py member. Needs Python 3.7 or newer.
+
+    Returns:
+      bool: True if the archive was written, False if it was unchanged and skipped.
+
+    Raises:
+      ValueError: If byte-code was asked for on an interpreter that cannot write it.
     """
     #if extension is not a directory then this won't work
     if not os.path.isdir(source):
-                raise NotADirectoryError("{0} is not a directory.".format(main_directory))
+                raise NotADirectoryError("{0} is not a directory.".format(source))
     extension_name = os.path.basename(os.path.normpath(source))
-    to_zip = []
-    #walk the full extension directory.
-    for dirpath, dirnames, filenames in os.walk(source):
-        if "__init__.py" not in filenames:
-            touch_init(dirpath)
-            to_zip.append(os.path.join(dirpath, "__init__.py"))
-        for zip_file in filenames:
-            to_zip.append(os.path.join(dirpath, zip_file))
-    #create and populate zipfile
-    with zipfile.ZipFile(os.path.join(destination, extension_name), 'a') as compressed_extension:
-        for ready_file in to_zip:
-            extension_path = os.path.relpath(ready_file, source)
-            compressed_extension.write(ready_file, extension_path)
-        
+    archive_path = os.path.join(destination, extension_name)
+    if bytecode and not bytecode_supported():
+        raise ValueError("Packaging byte-code needs Python 3.7 or newer.")
+    members = get_members(source)
+    digest = inputs_hash(members, compresslevel, bytecode)
+    if manifest is not None and manifest.get(extension_name) == digest and os.path.isfile(archive_path):
+        return False
+    compression = zipfile.ZIP_STORED if compresslevel == 0 else zipfile.ZIP_DEFLATED
+    options = {}
+    if compression == zipfile.ZIP_DEFLATED and sys.version_info >= (3, 7):
+        options["compresslevel"] = compresslevel
+    temp_path = archive_path + ".tmp"
+    try:
+        #create and populate zipfile
+        with zipfile.ZipFile(temp_path, 'w', compression, **options) as compressed_extension:
+            for name, path in members:
+                info = member_info(name, compression, options)
+                if sys.version_info >= (3, 6):
+                    with open(path, 'rb') as ready_file, compressed_extension.open(info, 'w') as member:
+                        shutil.copyfileobj(ready_file, member)
+                else:
+                    with open(path, 'rb') as ready_file:
+                        compressed_extension.writestr(info, ready_file.read())
+                if bytecode and name.endswith(".py"):
+                    compressed_extension.writestr(member_info(name + "c", compression, options),
+                                                  compile_bytecode(name, path, extension_name))
+        os.replace(temp_path, archive_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    if manifest is not None:
+        manifest[extension_name] = digest
+    return True
+
+def member_info(name, compression, options):
+    """Returns the ZipInfo of an archive member with a fixed timestamp and permissions."""
+    info = zipfile.ZipInfo(name, FIXED_DATE_TIME)
+    info.compress_type = compression
+    info.create_system = 3
+    info.external_attr = 0o644 << 16
+    if "compresslevel" in options:
+        #ZipFile.open() does not apply the archive's compression level to a ZipInfo it is given.
+        info._compresslevel = options["compresslevel"]
+    return info
 
 def touch_init(extension_dir):
     """ Touches the init file in each directory of an extension to make sure it exists.
@@ -87,17 +236,39 @@ def touch_init(extension_dir):
     Args:
       extension_dir (string): The path to a directory an __init__.py file should exist within.
     """
-    with open(os.path.join(extension_dir, "__init__.py"), 'a') as f:
-        os.utime("__init__.py")    
+    init_path = os.path.join(extension_dir, "__init__.py")
+    with open(init_path, 'a'):
+        os.utime(init_path)
     
-def zip_all():
+def zip_all(compresslevel=9, force=False, bytecode=False):
     """Zip's all extensions in the main commotion_client directory and moves them into the build directories resources folder.
+
+    Args:
+      compresslevel (int): The deflate compression level from 0 (stored) to 9.
+      force (bool): If True every extension is packaged even if its inputs have not changed.
+      bytecode (bool): If True byte-code for the running interpreter is packaged with the source.
     """
+    if bytecode and not bytecode_supported():
+        print("Packaging byte-code needs Python 3.7 or newer. Packaging source only.")
+        bytecode = False
     main_directory = os.path.join("commotion_client", "extensions")
     zip_directory = os.path.join("build", "resources")
+    if not os.path.isdir(zip_directory):
+        os.makedirs(zip_directory)
+    manifest = {} if force else load_manifest(zip_directory)
     extension_paths = get_extensions(main_directory)
     for extension_directory in extension_paths:
-        zip_extension(extension_directory, zip_directory)
+        name = os.path.basename(extension_directory)
+        if zip_extension(extension_directory, zip_directory, compresslevel, manifest, bytecode):
+            print("Packaged extension {0}.".format(name))
+        else:
+            print("Extension {0} is unchanged. Skipping it.".format(name))
+    save_manifest(zip_directory, manifest)
 
 if __name__ == "__main__":
-    zip_all()
+    parser = argparse.ArgumentParser(description="Package the Commotion extensions into build/resources.")
+    parser.add_argument("--compresslevel", type=int, default=9, choices=range(10), help="The deflate compression level. 0 stores members uncompressed.")
+    parser.add_argument("--force", action="store_true", help="Package every extension even if it has not changed.")
+    parser.add_argument("--bytecode", action="store_true", help="Package byte-code for this interpreter beside the source. Needs Python 3.7 or newer.")
+    args = parser.parse_args()
+    zip_all(args.compresslevel, args.force, args.bytecode)
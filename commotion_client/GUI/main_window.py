@@ -13,6 +13,7 @@ Key componenets handled within:
 """
 #Standard Library Imports
 import logging
+import collections
 
 #PyQt imports
 from PyQt4 import QtCore
@@ -24,7 +25,10 @@ from commotion_client.GUI.menu_bar import MenuBar
 from commotion_client.GUI.crash_report import CrashReport
 from commotion_client.GUI import welcome_page
 from commotion_client.GUI import toolbar_builder
+from commotion_client.GUI import preloader
 from commotion_client.utils import extension_manager
+from commotion_client.utils import library_watcher
+from commotion_client.utils import profiler
 
 
 class MainWindow(QtGui.QMainWindow):
@@ -36,6 +40,9 @@ class MainWindow(QtGui.QMainWindow):
     clean_up = QtCore.pyqtSignal()
     app_message = QtCore.pyqtSignal(str)
 
+    #The most viewports (and their toolbars) kept alive for quick switching.
+    viewport_pool_size = 5
+
     def __init__(self, parent=None):
         super().__init__()
         #Keep track of if the gui needs any clean up / saving.
@@ -43,12 +50,30 @@ class MainWindow(QtGui.QMainWindow):
         self.log = logging.getLogger("commotion_client."+__name__)
         self.translate = QtCore.QCoreApplication.translate
 
-        self.init_crash_reporter()
-        self.setup_menu_bar()
+        with profiler.phase("crash_reporter"):
+            self.init_crash_reporter()
+        with profiler.phase("menu_bar"):
+            self.setup_menu_bar()
         #Setup extension manager for viewports
         self.ext_manager = extension_manager.ExtensionManager()
+        #Keep the menu in step with extensions added to or removed from the libraries
+        with profiler.phase("library_watcher"):
+            self.library_watcher = library_watcher.LibraryWatcher(self.ext_manager, self)
+        self.library_watcher.extensions_changed.connect(self.menu_bar.refresh)
+        self.library_watcher.extensions_changed.connect(self.drop_viewports)
+        #Viewports are kept in a pool of pages keyed by extension name. The welcome page is keyed by None.
+        self.viewports = collections.OrderedDict()
+        #Names of pooled viewports whose extension changed while they were shown.
+        self.stale_viewports = set()
+        self._attached = None
+        self.viewport_stack = QtGui.QStackedWidget(self)
+        self.setCentralWidget(self.viewport_stack)
         self.viewport = welcome_page.ViewPort
-        self.apply_viewport(self.viewport)
+        with profiler.phase("welcome_viewport"):
+            self.apply_viewport(self.viewport)
+        #Warm the most used extensions once the window has been shown
+        self.preloader = preloader.ViewportPreloader(self)
+        self._preload_started = False
         
         #Default Paramiters #TODO to be replaced with paramiters saved between instances later
         try:
@@ -105,38 +130,129 @@ class MainWindow(QtGui.QMainWindow):
     def set_viewport(self):
         """Load and set viewport to next viewport and load viewport """
         self.log.info(self.next_extension)
-        next_view = self.next_extension
-        ext_viewport = self.ext_manager.load_user_interface(str(next_view), "main")
-        ext_toolbar = self.ext_manager.load_user_interface(str(next_view), "toolbar")
-        self.apply_viewport(ext_viewport, ext_toolbar)
+        next_view = str(self.next_extension)
+        self.preloader.record_use(next_view)
+        if next_view in self.stale_viewports:
+            self.remove_viewport(next_view)
+        if next_view in self.viewports:
+            self.show_viewport(next_view)
+            return
+        ext_viewport = self.ext_manager.load_user_interface(next_view, "main")
+        ext_toolbar = self.ext_manager.load_user_interface(next_view, "toolbar")
+        self.apply_viewport(ext_viewport, ext_toolbar, next_view)
         
-    def apply_viewport(self, viewport, toolbar=None):
-        """Apply current viewport to the central widget and set up proper signal's for communication. """
+    def apply_viewport(self, viewport, toolbar=None, name=None):
+        """Create a viewport and its toolbar, add them to the viewport pool, and show them.
+
+        Args:
+          viewport (class): The ViewPort class of an extension.
+          toolbar (class): The ToolBar class of an extension.
+          name (string): The name of the extension the viewport is from. None for the welcome page.
+        """
+        self.viewports[name] = self.build_viewport(viewport, toolbar)
+        self.show_viewport(name)
+
+    def build_viewport(self, viewport, toolbar=None):
+        """Create a viewport page without showing it.
+
+        Returns:
+          A tuple of the page's (splitter, viewport, toolbar, scroll area).
+        """
         #Create central widget (replaced due to splitter)
         #        self.central_widget = QtGui.QWidget(self)
-        self.central_widget = QtGui.QSplitter(QtCore.Qt.Vertical, self)
-        self.viewport = viewport(self.central_widget)
+        central_widget = QtGui.QSplitter(QtCore.Qt.Vertical, self.viewport_stack)
+        _viewport = viewport(central_widget)
         if not toolbar:
             toolbar = False
-        self.toolbar = self.init_toolbar(toolbar)
+        _toolbar = self.init_toolbar(toolbar, central_widget, _viewport)
 
         #Set up central layout (Replaced due to splitter)
         #self.central_layout = QtGui.QVBoxLayout(self.central_widget)
 
-        self.scroll_area = QtGui.QScrollArea(self.central_widget)
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setWidget(self.viewport)
+        scroll_area = QtGui.QScrollArea(central_widget)
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setWidget(_viewport)
 
         #add scroll area to central layout (replaced due to splitter)
         #self.central_layout.addWidget(self.scroll_area)
 
-        self.central_widget.addWidget(self.scroll_area)
-        self.central_widget.addWidget(self.toolbar)
-        
-        self.setCentralWidget(self.central_widget)
+        central_widget.addWidget(scroll_area)
+        central_widget.addWidget(_toolbar)
+
+        self.viewport_stack.addWidget(central_widget)
+        return (central_widget, _viewport, _toolbar, scroll_area)
+
+    def preload_viewport(self, name):
+        """Create an extension's viewport in the background so that switching to it later is instant.
+
+        Preloaded viewports are added as the least recently used page so they never push out a viewport the user has opened.
+
+        Args:
+          name (string): The name of the extension.
+
+        Returns:
+          bool: True if the viewport was created, False if it was already pooled or the pool is full.
+        """
+        if name in self.viewports or len(self.viewports) >= self.viewport_pool_size:
+            return False
+        ext_viewport = self.ext_manager.load_user_interface(name, "main")
+        ext_toolbar = self.ext_manager.load_user_interface(name, "toolbar")
+        self.viewports[name] = self.build_viewport(ext_viewport, ext_toolbar)
+        self.viewports.move_to_end(name, last=False)
+        return True
+
+    def show_viewport(self, name):
+        """Show a pooled viewport and move its crash reporter signals over to it.
+
+        Args:
+          name (string): The name of the extension whose viewport to show. None for the welcome page.
+        """
+        self.detach_viewport()
+        self.viewports.move_to_end(name)
+        self.central_widget, self.viewport, self.toolbar, self.scroll_area = self.viewports[name]
+        self.viewport_stack.setCurrentWidget(self.central_widget)
         self.init_viewport_signals()
         self.central_widget.show()
         self.viewport.show()
+        for stale in list(self.stale_viewports):
+            if stale != name:
+                self.remove_viewport(stale)
+        self.evict_viewports()
+
+    def evict_viewports(self):
+        """Delete the least recently used viewports until the pool is no larger than viewport_pool_size."""
+        while len(self.viewports) > max(1, self.viewport_pool_size):
+            self.remove_viewport(next(iter(self.viewports)))
+
+    def drop_viewports(self, names):
+        """Delete the pooled viewports of extensions that have changed so they are re-created on their next use.
+
+        The viewport currently shown is marked stale and kept until the user leaves it or opens its extension again.
+
+        Args:
+          names (list): The names of the extensions that changed.
+        """
+        for name in names:
+            page = self.viewports.get(name)
+            if page is None:
+                continue
+            if page[1] is self.viewport:
+                self.stale_viewports.add(name)
+            else:
+                self.remove_viewport(name)
+
+    def remove_viewport(self, name):
+        """Delete a pooled viewport page.
+
+        Args:
+          name (string): The name of the extension whose viewport to delete.
+        """
+        self.stale_viewports.discard(name)
+        page = self.viewports.pop(name, None)
+        if page is not None:
+            self.log.debug(self.translate("logs", "Removing the viewport of {0} from the viewport pool.".format(name)))
+            self.viewport_stack.removeWidget(page[0])
+            page[0].deleteLater()
 
     def init_viewport_signals(self):
         #connect viewport extension to crash reporter
@@ -148,10 +264,33 @@ class MainWindow(QtGui.QMainWindow):
 
         #Attach clean up signal
         self.clean_up.connect(self.viewport.clean_up)
+        self._attached = self.viewport
+
+    def detach_viewport(self):
+        """Disconnect the signals init_viewport_signals connected to the current viewport so it can be pooled."""
+        viewport = self._attached
+        if viewport is None:
+            return
+        self._attached = None
+        connections = [(viewport.data_report, self.crash_report.crash_info),
+                       (self.crash_report.crash_override, viewport.start_report_collection),
+                       (viewport.error_report, self.crash_report.alert_user),
+                       (self.clean_up, viewport.clean_up)]
+        if hasattr(viewport, "on_stop"):
+            #change_viewport waits on this when the viewport was dirty.
+            connections.append((viewport.on_stop, self.set_viewport))
+        for signal, slot in connections:
+            try:
+                signal.disconnect(slot)
+            except TypeError:
+                #The signal was not connected.
+                pass
 
     def change_viewport(self, viewport):
         """Prepare next viewport for loading and start loading process when ready."""
         self.log.debug(self.translate("logs", "Request to change viewport received."))
+        #The user is busy. Do not compete with them for the event loop.
+        self.preloader.cancel()
         self.next_extension = viewport
         if self.viewport.is_dirty:
             self.viewport.on_stop.connect(self.set_viewport)
@@ -159,10 +298,21 @@ class MainWindow(QtGui.QMainWindow):
         else:
             self.set_viewport()
 
-    def init_toolbar(self, ext_toolbar):
+    def init_toolbar(self, ext_toolbar, central_widget=None, viewport=None):
         """ """
-        toolbar = toolbar_builder.ToolBar(self.central_widget,  self.viewport, ext_toolbar,)
+        if central_widget is None:
+            central_widget = self.central_widget
+        if viewport is None:
+            viewport = self.viewport
+        toolbar = toolbar_builder.ToolBar(central_widget,  viewport, ext_toolbar,)
         return toolbar
+
+    def showEvent(self, event):
+        """Starts preloading the most used extensions the first time the main window is shown."""
+        super().showEvent(event)
+        if not self._preload_started:
+            self._preload_started = True
+            self.preloader.start()
         
             
     def purge(self):
@@ -170,7 +320,7 @@ class MainWindow(QtGui.QMainWindow):
         Closes the menu and sets its data up for immediate removal.
         """
         self.cleanup()
-        self.main.remove_on_close = True
+        self.remove_on_close = True
         self.close()
 
 
@@ -57,7 +57,8 @@ class MenuBar(QtGui.QWidget):
         Args:
         layout (QLayout): A QLayout object that needs to be cleared of all objects.
         """        
-        if not layout.isEmpty():
+        #isEmpty() is True for a layout of hidden widgets, so the items are counted instead.
+        if layout is not None and layout.count():
             while layout.count():
                 item = layout.takeAt(0)
                 widget = item.widget()
@@ -66,12 +67,20 @@ class MenuBar(QtGui.QWidget):
                 else:
                     self.clear_layout(item.layout())
 
-    def populate_menu(self):
-        """Resets and populates the menu using loaded extensions."""
-        if not self.layout.isEmpty():
-            self.clear_layout(self.layout)
+    def populate_menu(self, initialize=True):
+        """Resets and populates the menu using loaded extensions.
+
+        Args:
+          initialize (bool): If True and no extensions are installed the extension libraries are initialized first. If False the menu is left empty.
+        """
+        self.clear_layout(self.layout)
         menu_items = {}
         if not self.ext_mgr.check_installed():
+            if not initialize:
+                self.log.info(self.translate("logs", "No extensions are installed. The menu will be left empty."))
+                if QtGui.QWidget.layout(self) is None:
+                    self.setLayout(self.layout)
+                return
             self.ext_mgr.init_extension_libraries()
         extensions = self.ext_mgr.get_installed().keys()
         if extensions:
@@ -95,7 +104,24 @@ class MenuBar(QtGui.QWidget):
                 raise AttributeError(QtCore.QCoreApplication.translate("exception", "No menu items could be created from the extensions found. Please re-run the commotion client with full verbosity to identify what went wrong."))
         else:
             raise NameError(QtCore.QCoreApplication.translate("exception", "No extensions found. Please re-run the commotion_client with full verbosity to find out what went wrong."))
-        self.setLayout(self.layout)
+        #The menu is re-populated in place when extensions change, and a widget's layout can only be set once.
+        if QtGui.QWidget.layout(self) is None:
+            self.setLayout(self.layout)
+
+    def refresh(self, extensions=None):
+        """Re-populates the menu after installed extensions have changed.
+
+        The extension libraries have already been updated incrementally, so they are never re-initialized here. If the last extension was removed the menu is left empty.
+
+        Args:
+          extensions (list): The names of the extensions that changed. Only used for logging.
+        """
+        self.log.debug(self.translate("logs", "Refreshing the menu for changed extensions: {0}.".format(extensions)))
+        try:
+            self.populate_menu(initialize=False)
+        except (NameError, AttributeError) as _excpt:
+            self.log.info(self.translate("logs", "The Menu Bar could not populate the menu"))
+            self.log.exception(_excpt)
         
     def get_parents(self, extension_list):
         """Gets all unique parents from a list of extensions.
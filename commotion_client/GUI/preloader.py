@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+preloader
+
+Warms the viewports of the extensions a user is most likely to open next while the application is idle.
+
+Key componenets handled within:
+ * recording how often each extension's viewport is opened
+ * preloading extensions one at a time from the event loop in order of use
+ * stopping once a memory budget is spent or when cancelled
+
+"""
+#Standard Library Imports
+import logging
+import os
+
+#PyQt imports
+from PyQt4 import QtCore
+
+#Commotion Client Imports
+from commotion_client.utils import extension_archive
+
+
+class ViewportPreloader(QtCore.QObject):
+    """Preloads the most used extensions one at a time whenever the event loop is idle.
+
+    Each extension's user interface modules are imported. If there is room in the main window's viewport pool, the viewport and toolbar are created as well. Every preloaded extension's uncompressed archive size counts against the memory budget. Preloading stops once the budget would be exceeded.
+    """
+
+    #Emitted when preloading has finished or was cancelled.
+    finished = QtCore.pyqtSignal()
+
+    #The default memory budget in bytes.
+    default_budget = 32 * 1024 * 1024
+
+    def __init__(self, window, budget=None, preconstruct=True, interval=0):
+        """
+        Args:
+          window (MainWindow): The main window whose extension manager and viewport pool are warmed.
+          budget (int): The most bytes of extension archives to preload. Defaults to default_budget.
+          preconstruct (bool): If True viewports are created as well as imported.
+          interval (int): The milliseconds to wait between preloading each extension. 0 preloads whenever the event loop is idle.
+        """
+        super().__init__(window)
+        self.log = logging.getLogger("commotion_client."+__name__)
+        self.translate = QtCore.QCoreApplication.translate
+        self.window = window
+        self.ext_mgr = window.ext_manager
+        self.budget = self.default_budget if budget is None else budget
+        self.preconstruct = preconstruct
+        self.queue = []
+        self.used = 0
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.preload_next)
+
+    def get_usage(self):
+        """Returns a dictionary of how many times each extension's viewport has been opened."""
+        _settings = QtCore.QSettings()
+        _settings.beginGroup("extension_usage")
+        usage = {}
+        for name in _settings.childKeys():
+            try:
+                usage[name] = int(_settings.value(name, 0))
+            except (TypeError, ValueError):
+                continue
+        _settings.endGroup()
+        return usage
+
+    def record_use(self, name):
+        """Counts one more opening of an extension's viewport."""
+        _settings = QtCore.QSettings()
+        _settings.beginGroup("extension_usage")
+        try:
+            count = int(_settings.value(name, 0))
+        except (TypeError, ValueError):
+            count = 0
+        _settings.setValue(name, count + 1)
+        _settings.endGroup()
+
+    def ranked(self):
+        """Returns the names of the installed, initialized extensions that have been used, most used first."""
+        usage = self.get_usage()
+        names = [name for name in usage if usage[name] > 0 and self.ext_mgr.registry.value(name, "initialized")]
+        return sorted(names, key=lambda name: (-usage[name], name))
+
+    def start(self):
+        """Starts preloading the most used extensions that are not already loaded."""
+        self.queue = [name for name in self.ranked() if name not in self.window.viewports]
+        self.used = 0
+        self.log.debug(self.translate("logs", "Preloading extensions: [{0}].".format(", ".join(self.queue))))
+        if self.queue:
+            self.timer.start()
+        else:
+            self.finished.emit()
+
+    def cancel(self):
+        """Stops preloading. Extensions that were already preloaded stay loaded."""
+        if self.queue or self.timer.isActive():
+            self.log.debug(self.translate("logs", "Preloading cancelled with {0} extensions left.".format(len(self.queue))))
+            self.timer.stop()
+            self.queue = []
+            self.finished.emit()
+
+    @property
+    def is_active(self):
+        """True while extensions are waiting to be preloaded."""
+        return bool(self.queue)
+
+    def preload_next(self):
+        """Preloads the next extension in the queue and schedules the one after it."""
+        if not self.queue:
+            self.finished.emit()
+            return
+        name = self.queue.pop(0)
+        try:
+            _type = self.ext_mgr.registry.value(name, "type")
+            path = os.path.join(self.ext_mgr.libraries[_type], name)
+            size = extension_archive.open_archive(path).uncompressed_size
+            if self.used + size > self.budget:
+                self.log.info(self.translate("logs", "Preloading {0} would exceed the preloading memory budget. Stopping.".format(name)))
+                self.cancel()
+                return
+            self.preload(name, path)
+            self.used += size
+        except Exception as _excp:
+            self.log.warning(self.translate("logs", "Could not preload extension {0}.".format(name)))
+            self.log.debug(_excp)
+        if self.queue:
+            self.timer.start()
+        else:
+            self.finished.emit()
+
+    def preload(self, name, path):
+        """Imports an extension's user interfaces and creates its viewport if there is room in the viewport pool."""
+        if self.preconstruct and self.window.preload_viewport(name):
+            self.log.debug(self.translate("logs", "Preloaded the viewport of {0}.".format(name)))
+            return
+        modules = self.ext_mgr.modules
+        if path not in modules and len(modules.extensions) >= modules.size:
+            #Importing would evict an extension the user has actually opened.
+            self.log.debug(self.translate("logs", "The module cache is full. {0} will not be preloaded.".format(name)))
+            return
+        self.ext_mgr.load_user_interface(name, "main")
+        self.ext_mgr.load_user_interface(name, "toolbar")
+        self.log.debug(self.translate("logs", "Preloaded the user interfaces of {0}.".format(name)))
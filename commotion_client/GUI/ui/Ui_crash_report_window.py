@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'commotion_client/GUI/ui/crash_report_window.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt4 import QtCore, QtGui
+
+
+class Ui_crash_window(object):
+    def setupUi(self, crash_window):
+        crash_window.setObjectName("crash_window")
+        crash_window.setWindowModality(QtCore.Qt.ApplicationModal)
+        crash_window.resize(472, 523)
+        icon = QtGui.QIcon()
+        icon.addPixmap(QtGui.QPixmap(":/alert32.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
+        crash_window.setWindowIcon(icon)
+        self.verticalLayoutWidget = QtGui.QWidget(crash_window)
+        self.verticalLayoutWidget.setGeometry(QtCore.QRect(10, 10, 451, 501))
+        self.verticalLayoutWidget.setObjectName("verticalLayoutWidget")
+        self.verticalLayout = QtGui.QVBoxLayout(self.verticalLayoutWidget)
+        self.verticalLayout.setContentsMargins(0, 0, 0, 0)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.horizontalLayout_2 = QtGui.QHBoxLayout()
+        self.horizontalLayout_2.setObjectName("horizontalLayout_2")
+        self.alert_icon = QtGui.QLabel(self.verticalLayoutWidget)
+        self.alert_icon.setText("")
+        self.alert_icon.setPixmap(QtGui.QPixmap(":/alert48.png"))
+        self.alert_icon.setObjectName("alert_icon")
+        self.horizontalLayout_2.addWidget(self.alert_icon)
+        self.sorry_label = QtGui.QLabel(self.verticalLayoutWidget)
+        self.sorry_label.setScaledContents(False)
+        self.sorry_label.setWordWrap(True)
+        self.sorry_label.setObjectName("sorry_label")
+        self.horizontalLayout_2.addWidget(self.sorry_label)
+        spacerItem = QtGui.QSpacerItem(10, 20, QtGui.QSizePolicy.MinimumExpanding, QtGui.QSizePolicy.Minimum)
+        self.horizontalLayout_2.addItem(spacerItem)
+        self.verticalLayout.addLayout(self.horizontalLayout_2)
+        self.horizontalLayout_3 = QtGui.QHBoxLayout()
+        self.horizontalLayout_3.setSpacing(6)
+        self.horizontalLayout_3.setObjectName("horizontalLayout_3")
+        self.error_text = QtGui.QLabel(self.verticalLayoutWidget)
+        self.error_text.setMaximumSize(QtCore.QSize(420, 16777215))
+        self.error_text.setAlignment(QtCore.Qt.AlignLeading|QtCore.Qt.AlignLeft|QtCore.Qt.AlignTop)
+        self.error_text.setObjectName("error_text")
+        self.horizontalLayout_3.addWidget(self.error_text)
+        self.verticalLayout.addLayout(self.horizontalLayout_3)
+        self.horizontalLayout_5 = QtGui.QHBoxLayout()
+        self.horizontalLayout_5.setObjectName("horizontalLayout_5")
+        self.report_info = QtGui.QLabel(self.verticalLayoutWidget)
+        self.report_info.setMaximumSize(QtCore.QSize(420, 16777215))
+        self.report_info.setAlignment(QtCore.Qt.AlignLeading|QtCore.Qt.AlignLeft|QtCore.Qt.AlignTop)
+        self.report_info.setWordWrap(True)
+        self.report_info.setObjectName("report_info")
+        self.horizontalLayout_5.addWidget(self.report_info)
+        self.verticalLayout.addLayout(self.horizontalLayout_5)
+        self.send_report = QtGui.QCheckBox(self.verticalLayoutWidget)
+        self.send_report.setObjectName("send_report")
+        self.verticalLayout.addWidget(self.send_report)
+        self.tabWidget = QtGui.QTabWidget(self.verticalLayoutWidget)
+        self.tabWidget.setMinimumSize(QtCore.QSize(0, 220))
+        self.tabWidget.setObjectName("tabWidget")
+        self.tab = QtGui.QWidget()
+        self.tab.setObjectName("tab")
+        self.comment_field = QtGui.QPlainTextEdit(self.tab)
+        self.comment_field.setGeometry(QtCore.QRect(20, 10, 391, 161))
+        self.comment_field.setMaximumSize(QtCore.QSize(391, 16777215))
+        self.comment_field.setObjectName("comment_field")
+        self.tabWidget.addTab(self.tab, "")
+        self.tab_2 = QtGui.QWidget()
+        self.tab_2.setObjectName("tab_2")
+        self.crash_report = QtGui.QTextBrowser(self.tab_2)
+        self.crash_report.setGeometry(QtCore.QRect(20, 10, 391, 161))
+        self.crash_report.setMaximumSize(QtCore.QSize(391, 16777215))
+        self.crash_report.setObjectName("crash_report")
+        self.verticalLayoutWidget_2 = QtGui.QWidget(self.tab_2)
+        self.verticalLayoutWidget_2.setGeometry(QtCore.QRect(130, 50, 160, 80))
+        self.verticalLayoutWidget_2.setObjectName("verticalLayoutWidget_2")
+        self.report_gen_layout = QtGui.QVBoxLayout(self.verticalLayoutWidget_2)
+        self.report_gen_layout.setContentsMargins(0, 0, 0, 0)
+        self.report_gen_layout.setObjectName("report_gen_layout")
+        self.report_loading_label = QtGui.QLabel(self.verticalLayoutWidget_2)
+        self.report_loading_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.report_loading_label.setObjectName("report_loading_label")
+        self.report_gen_layout.addWidget(self.report_loading_label)
+        self.report_gen_countdown = QtGui.QLCDNumber(self.verticalLayoutWidget_2)
+        self.report_gen_countdown.setLayoutDirection(QtCore.Qt.LeftToRight)
+        self.report_gen_countdown.setFrameShape(QtGui.QFrame.NoFrame)
+        self.report_gen_countdown.setLineWidth(0)
+        self.report_gen_countdown.setNumDigits(1)
+        self.report_gen_countdown.setProperty("intValue", 5)
+        self.report_gen_countdown.setObjectName("report_gen_countdown")
+        self.report_gen_layout.addWidget(self.report_gen_countdown)
+        self.tabWidget.addTab(self.tab_2, "")
+        self.verticalLayout.addWidget(self.tabWidget)
+        self.horizontalLayout = QtGui.QHBoxLayout()
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        spacerItem1 = QtGui.QSpacerItem(40, 20, QtGui.QSizePolicy.Expanding, QtGui.QSizePolicy.Minimum)
+        self.horizontalLayout.addItem(spacerItem1)
+        self.quit_button = QtGui.QPushButton(self.verticalLayoutWidget)
+        self.quit_button.setObjectName("quit_button")
+        self.horizontalLayout.addWidget(self.quit_button)
+        self.restart_button = QtGui.QPushButton(self.verticalLayoutWidget)
+        self.restart_button.setObjectName("restart_button")
+        self.horizontalLayout.addWidget(self.restart_button)
+        self.verticalLayout.addLayout(self.horizontalLayout)
+        self.verticalLayout.setStretch(0, 1)
+        self.verticalLayout.setStretch(1, 1)
+        self.verticalLayout.setStretch(5, 1)
+
+        self.retranslateUi(crash_window)
+        self.tabWidget.setCurrentIndex(1)
+        self.quit_button.clicked.connect(crash_window.close) # type: ignore
+        self.restart_button.clicked.connect(crash_window.close) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(crash_window)
+
+    def retranslateUi(self, crash_window):
+        _translate = QtCore.QCoreApplication.translate
+        crash_window.setWindowTitle(_translate("crash_window", "Commotion Error"))
+        self.sorry_label.setText(_translate("crash_window", "Sorry!"))
+        self.error_text.setText(_translate("crash_window", "Commotion has experienced an unknown error."))
+        self.report_info.setText(_translate("crash_window", "We have created a crash report to allow the Commotion team to identify and address this problem. If you would be willing to be contated directly please include your e-mail in the comment section below."))
+        self.send_report.setText(_translate("crash_window", "Send a report to the commotion team."))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab), _translate("crash_window", "Add a Comment"))
+        self.report_loading_label.setText(_translate("crash_window", "Generating Report..."))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_2), _translate("crash_window", "View Crash Report"))
+        self.quit_button.setText(_translate("crash_window", "Quit Commotion"))
+        self.restart_button.setText(_translate("crash_window", "Restart Commotion"))
+import commotion_assets_rc
+
+class crash_window(QtGui.QDialog, Ui_crash_window):
+    def __init__(self, parent=None, f=QtCore.Qt.WindowFlags()):
+        QtGui.QDialog.__init__(self, parent, f)
+        self.setupUi(self)
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'commotion_client/GUI/ui/welcome_page.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt4 import QtCore, QtGui
+
+
+class Ui_ViewPort(object):
+    def setupUi(self, ViewPort):
+        ViewPort.setObjectName("ViewPort")
+        ViewPort.resize(640, 480)
+        self.widget = QtGui.QWidget(ViewPort)
+        self.widget.setGeometry(QtCore.QRect(240, 200, 144, 77))
+        self.widget.setObjectName("widget")
+        self.verticalLayout = QtGui.QVBoxLayout(self.widget)
+        self.verticalLayout.setContentsMargins(0, 0, 0, 0)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.commotion_logo = QtGui.QLabel(self.widget)
+        self.commotion_logo.setText("")
+        self.commotion_logo.setPixmap(QtGui.QPixmap(":/logo62.png"))
+        self.commotion_logo.setAlignment(QtCore.Qt.AlignCenter)
+        self.commotion_logo.setObjectName("commotion_logo")
+        self.verticalLayout.addWidget(self.commotion_logo)
+        self.commotion_title = QtGui.QLabel(self.widget)
+        self.commotion_title.setObjectName("commotion_title")
+        self.verticalLayout.addWidget(self.commotion_title)
+
+        self.retranslateUi(ViewPort)
+        QtCore.QMetaObject.connectSlotsByName(ViewPort)
+
+    def retranslateUi(self, ViewPort):
+        _translate = QtCore.QCoreApplication.translate
+        ViewPort.setWindowTitle(_translate("ViewPort", "Form"))
+        self.commotion_title.setText(_translate("ViewPort", "Commotion Computer"))
+import commotion_assets_rc
+
+class ViewPort(QtGui.QWidget, Ui_ViewPort):
+    def __init__(self, parent=None, f=QtCore.Qt.WindowFlags()):
+        QtGui.QWidget.__init__(self, parent, f)
+        self.setupUi(self)
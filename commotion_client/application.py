@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+application
+
+The Commotion client application. Only created once a process knows it is the primary Commotion client instance.
+
+Key componenets handled within:
+ * creation of main GUI
+ * initial logging settings
+ * client start, stop and restart
+
+"""
+
+import logging
+import time
+import os
+
+from PyQt4 import QtGui
+from PyQt4 import QtCore
+
+from commotion_client.utils import logger
+from commotion_client.utils import single_application
+from commotion_client.utils import extension_manager
+from commotion_client.utils import library_watcher
+from commotion_client.utils import commands
+from commotion_client.utils import restart
+from commotion_client.utils import profiler
+
+from commotion_client.GUI import main_window
+from commotion_client.GUI import system_tray
+
+#from controller import CommotionController #TODO Create Controller
+
+
+class CommotionClientApplication(single_application.SingleApplicationWithMessaging):
+    """
+    The final layer of the class onion that is the Commotion client. This class includes functions to enable the sub-processes and modules of the Commotion Client (GUI's and controllers). 
+    """
+
+    restarted = QtCore.pyqtSignal()
+    
+    def __init__(self, args, argv):
+        with profiler.phase("single_application"):
+            super().__init__(args['key'], argv)
+        status = args['status']
+        _logfile = args['logFile']
+        _loglevel = args['logLevel']
+        #A report file, True to only log the startup timing report, or False when startup is not profiled.
+        self.profile = args.get('profile', False)
+        with profiler.phase("logging"):
+            self.init_logging(_loglevel, _logfile)
+        #Set Application and Organization Information
+        self.setOrganizationName("The Open Technology Institute")
+        self.setOrganizationDomain("commotionwireless.net")
+        self.setApplicationName(self.translate("main", "Commotion Client")) #special translation case since we are outside of the main application
+        self.setWindowIcon(QtGui.QIcon(":logo48.png"))
+        self.setApplicationVersion("1.0") #TODO Generate this on build
+        self.translate = QtCore.QCoreApplication.translate
+        self.status = status
+        self.controller = False
+        self.main = False
+        self.sys_tray = False
+        #Watches the extension libraries when there is no main window to do it.
+        self.library_watcher = False
+        #The RestartSequence of the last restart.
+        self.restart = None
+        #Messages from other instances and the main window are run as commands.
+        self.commands = commands.CommandDispatcher(self)
+        self.init_commands()
+        self.started = time.monotonic()
+        self.init_controls()
+
+        #initialize client (GUI, controller, etc) upon event loop start so that exit/quit works on errors.
+        QtCore.QTimer.singleShot(0, self.init_client)
+
+
+#=================================================
+#               CLIENT LOGIC
+#=================================================
+
+    def init_client(self):
+        """
+        Start up client using current status to determine run_level. Halts the application if the client could not be started.
+        """
+        try:
+            self.start_client()
+        except Exception as _excp: #log failure here and exit
+            _catch_all = self.translate("logs", "Could not fully initialize applicaiton. Application must be halted.")
+            self.log.critical(_catch_all)
+            self.log.exception(_excp)
+            self.end(_catch_all)
+
+    def start_client(self):
+        """
+        Start the client components using current status to determine run_level.
+
+        @raise Exception Any error that kept a component from starting. It is left to the caller to decide if the application must be halted.
+        """
+        try:
+            with profiler.phase("init_client"):
+                if not self.status:
+                    self.start_full()
+                elif self.status == "daemon":
+                    self.start_daemon()
+        finally:
+            if self.profile:
+                profiler.finish(self.profile if self.profile is not True else None)
+                #Only the first start is profiled.
+                self.profile = False
+
+    def init_logging(self, level=None, logfile=None):
+        self.logger = logger.LogHandler("commotion_client", level, logfile)
+        self.log = self.logger.get_logger()
+    
+    def start_full(self):
+        """
+        Start or switch client over to full client.
+        """
+        with profiler.phase("extension_manager"):
+            extensions = extension_manager.ExtensionManager()
+        with profiler.phase("check_installed"):
+            installed = extensions.check_installed()
+        if not installed:
+            with profiler.phase("init_extension_libraries"):
+                extensions.init_extension_libraries()
+        if not self.main:
+            try:
+                with profiler.phase("main_window"):
+                    self.main = self.create_main_window()
+            except Exception as _excp:
+                self.log.critical(self.translate("logs", "Could not create Main Window."))
+                self.log.exception(_excp)
+                raise
+            else:
+                with profiler.phase("show_main_window"):
+                    self.init_main()
+            try:
+                with profiler.phase("sys_tray"):
+                    self.sys_tray = self.create_sys_tray()
+            except Exception as _excp:
+                self.log.critical(self.translate("logs", "Could not create system tray."))
+                self.log.exception(_excp)
+                raise
+            else:
+                self.init_sys_tray()
+
+    def start_daemon(self):
+        """
+        Start or switch client over to daemon mode. Daemon mode runs the taskbar without showing the main window.
+        """
+        try:
+            #Close main window without closing taskbar and system tray
+            if self.main:
+                self.hide_main_window(force=True, errors="strict")
+        except Exception as _excp:
+            self.log.critical(self.translate("logs", "Could not close down existing GUI componenets to switch to daemon mode."))
+            self.log.exception(_excp)
+            raise
+        try:
+            #create controller and sys tray
+            if not self.sys_tray:
+                self.sys_tray = self.create_sys_tray()
+            #if not self.controller: #TODO Actually create a stub controller file
+            #    self.controller = create_controller()
+        except Exception as _excp:
+            self.log.critical(self.translate("logs", "Could not start daemon. Application must be halted."))
+            self.log.exception(_excp)
+            raise
+        else:
+            self.init_sys_tray()
+
+    def stop_client(self, force_close=None):
+        """
+        Stops all running client processes.
+
+        @param force_close bool Whole application exit if clean close fails. See: close_controller() & close_main_window()
+        """
+        try:
+            self.close_main_window(force_close)
+            self.close_sys_tray(force_close)
+            self.close_controller(force_close)
+        except Exception as _excp:
+            if force_close:
+                _catch_all = self.translate("logs", "Could not cleanly close client. Application must be halted.")
+                self.log.critical(_catch_all)
+                self.log.exception(_excp)
+                self.end(_catch_all)
+            else:
+                self.log.error(self.translate("logs", "Client could not be closed."))
+                self.log.info(self.translate("logs", "It is reccomended that you restart the application."))
+                self.log.exception(_excp)
+
+    def restart_client(self, force_close=None):
+        """
+        Restarts the entire client stack according to current application status.
+
+        The restart runs from the event loop and finishes as soon as the old main window and system tray have been destroyed and the client has been started again. Commands that arrive in the meantime are run once it finishes. See restart.RestartSequence.
+
+        @param force_close bool Whole application exit if clean close fails. See: close_controller() & close_main_window()
+        @return RestartSequence The restart, whose wait() blocks until it has finished.
+        """
+        if self.restart is not None and not self.restart.done():
+            self.log.debug(self.translate("logs", "A restart was requested while the client is already restarting."))
+            return self.restart
+        #hold applicaiton state while restarting all other components.
+        self._quit_on_last_window = self.quitOnLastWindowClosed()
+        self.setQuitOnLastWindowClosed(False)
+        #Commands that arrive during the restart are run once it is complete.
+        self.commands.hold()
+        #A failed start is reported by the restart instead of halting the application here.
+        self.restart = restart.RestartSequence(lambda: self.stop_components(force_close), self.start_client, parent=self)
+        self.restart.finished.connect(lambda result: self.restart_finished(result, force_close))
+        self.restart.start()
+        return self.restart
+
+    def stop_components(self, force_close=None):
+        """
+        Stops the client for a restart.
+
+        @return list The components that will be destroyed once they have stopped.
+        """
+        components = [component for component in [self.main, self.sys_tray] if component]
+        self.stop_client(force_close)
+        return components
+
+    def restart_finished(self, result, force_close=None):
+        """
+        Releases the commands held during a restart and emits restarted if it completed.
+        """
+        self.setQuitOnLastWindowClosed(self._quit_on_last_window)
+        self.commands.release()
+        if result:
+            self.restarted.emit()
+        elif force_close:
+            _catch_all = self.translate("logs", "Client could not be restarted. Applicaiton will now be halted")
+            self.log.error(_catch_all)
+            self.end(_catch_all)
+        else:
+            self.log.error(self.translate("logs", "Client could not be restarted."))
+            self.log.info(self.translate("logs", "It is reccomended that you restart the application."))
+
+#=================================================
+#                 MAIN WINDOW
+#=================================================
+        
+    def create_main_window(self):
+        """
+        Will create a new main window or return existing main window if one is already created.
+        """
+        if self.main:
+            self.log.debug(self.translate("logs", "New window requested when one already exists. Returning existing main window."))
+            self.log.info(self.translate("logs", "If you would like to close the main window and re-open it please call close_main_window() first."))
+            return self.main
+        try:
+            _main = main_window.MainWindow()
+        except Exception as _excp:
+            self.log.critical(self.translate("logs", "Could not create Main Window. Application must be halted."))
+            raise
+        else:
+            return _main
+
+    def init_main(self):
+        """
+        Main window initializer that shows and connects the main window's messaging function to the app message processor.
+        """
+        try:
+            self.main.app_message.connect(self.process_message)
+            if self.sys_tray:
+                self.sys_tray.exit.triggered.connect(self.main.exitEvent)
+                self.sys_tray.show_main.connect(self.main.bring_front)
+        except Exception as _excp:
+            self.log.error(self.translate("logs", "Could not initialize connections between the main window and other application components."))
+            self.log.exception(_excp)
+            raise
+        try:
+            self.main.show()
+        except Exception as _excp:
+            self.log.error(self.translate("logs", "Could not show the main window."))
+            self.log.exception(_excp)
+            raise
+
+    def hide_main_window(self, force=None, errors=None):
+        """
+        Attempts to hide the main window without closing the task-bar.
+
+        @param force bool Force window reset if hiding is unsuccessful.
+        @param errors If set to "strict" errors found will be raised before returning the boolean result.
+        @return bool Return True if successful and false is unsuccessful.
+        """
+        try:
+            self.main.exit()
+        except Exception as _excp:
+            self.log.error(self.translate("logs", "Could not hide main window. Attempting to close all and only open taskbar."))
+            self.log.exception(_excp)
+            if force:
+                try:
+                    self.main.purge()
+                    self.main = None
+                    self.main = self.create_main_window()
+                except Exception as _excp:
+                    self.log.error(self.translate("logs", "Could not force main window restart."))
+                    self.log.exception(_excp)
+                    raise
+            elif errors == "strict":
+                raise
+            else:
+                return False
+        else:
+            return True
+        #force hide settings
+        try:
+            #if already open, then close first
+            if self.main:
+                self.close_main_window()
+            #re-open
+            self.main = main_window.MainWindow()
+            self.main.app_message.connect(self.process_message)
+        except:
+            self.log.error(self.translate("logs", "Could close and re-open the main window."))
+            self.log.exception(_excp)
+            if errors == "strict":
+                raise
+            else:
+                return False
+        else:
+            return True
+        return False
+
+    def close_main_window(self, force_close=None):
+        """
+        Closes the main window and task-bar. Only removes the GUI components without closing the application.
+
+        @param force_close bool If the application fails to kill the main window, the whole application should be shut down.
+        @return bool
+        """
+        if not self.main:
+            return
+        try:
+            self.main.purge()
+            self.main = False
+        except Exception as _excp:
+            self.log.error(self.translate("logs", "Could not close main window."))
+            if force_close:
+                self.log.info(self.translate("logs", "force_close activated. Closing application."))
+                try:
+                    self.main.deleteLater()
+                    self.main = False
+                except Exception as _excp:
+                    _catch_all = self.translate("logs", "Could not close main window using its internal mechanisms. Application will be halted.")
+                    self.log.critical(_catch_all)
+                    self.log.exception(_excp)
+                    self.end(_catch_all)
+            else:
+                self.log.error(self.translate("logs", "Could not close main window."))
+                self.log.info(self.translate("logs", "It is reccomended that you close the entire application."))
+                self.log.exception(_excp)
+                raise
+
+#=================================================
+#                 CONTROLLER
+#=================================================
+
+    def create_controller(self):
+        """
+        Creates a controller to act as the middleware between the GUI and the commotion core.
+        """
+        try:
+            pass #replace when controller is ready
+            #self.controller = CommotionController() #TODO Implement controller
+            #self.controller.init() #??????
+        except Exception as _excp:
+            self.log.critical(self.translate("logs", "Could not create controller. Application must be halted."))
+            self.log.exception(_excp)
+            raise
+
+    def init_controller(self):
+        pass
+
+    def close_controller(self, force_close=None):
+        """
+        Closes the controller process.
+
+        @param force_close bool If the application fails to kill the controller, the whole application should be shut down.
+        """
+        try:
+            pass #TODO Swap with below when controller close function is instantiated
+            #if self.controller.close():
+            #    self.controller = None
+        except Exception as _excp:
+            self.log.error(self.translate("logs", "Could not close controller."))
+            if force_close:
+                self.log.info(self.translate("logs", "force_close activated. Closing application."))
+                try:
+                    del self.controller
+                except Exception as _excp:
+                    _catch_all = self.translate("logs", "Could not close controller using its internal mechanisms. Application will be halted.")
+                    self.log.critical(_catch_all)
+                    self.log.exception(_excp)
+                    self.end(_catch_all)
+            else:
+                self.log.error(self.translate("logs", "Could not cleanly close controller."))
+                self.log.info(self.translate("logs", "It is reccomended that you close the entire application."))
+                self.log.exception(_excp)
+                raise
+
+
+#=================================================
+#                 SYSTEM TRAY
+#=================================================
+            
+    def init_sys_tray(self):
+        """
+        System Tray initializer that runs all processes required to connect the system tray to other application commponents
+        """
+        try:
+            if self.main:
+                self.sys_tray.exit.triggered.connect(self.main.exitEvent)
+                self.sys_tray.show_main.connect(self.main.bring_front)
+        except Exception as _excp:
+            self.log.error(self.translate("logs", "Could not initialize connections between the system tray and other application components."))
+            self.log.exception(_excp)
+            raise
+
+    def create_sys_tray(self):
+        """
+        Starts the system tray
+        """
+        try:
+            tray = system_tray.TrayIcon()
+        except Exception as _excp:
+            self.log.error(self.translate("logs", "Could not start system tray."))
+            self.log.exception(_excp)
+            raise
+        else:
+            return tray
+
+    def close_sys_tray(self, force_close=None):
+        """
+        Closes the system tray. Only removes the GUI components without closing the application.
+
+        @param force_close bool If the application fails to kill the main window, the whole application should be shut down.
+        @return bool 
+        """
+        if not self.sys_tray:
+            return
+        try:
+            self.sys_tray.close()
+            self.sys_tray.deleteLater()
+            self.sys_tray = False
+        except Exception as _excp:
+            self.log.error(self.translate("logs", "Could not close system tray."))
+            if force_close:
+                self.log.info(self.translate("logs", "force_close activated. Closing application."))
+                try:
+                    self.sys_tray.deleteLater()
+                    self.sys_tray.close()
+                except:
+                    _catch_all = self.translate("logs", "Could not close system tray using its internal mechanisms. Application will be halted.")
+                    self.log.critical(_catch_all)
+                    self.log.exception(_excp)
+                    self.end(_catch_all)
+            else:
+                self.log.error(self.translate("logs", "Could not close system tray."))
+                self.log.info(self.translate("logs", "It is reccomended that you close the entire application."))
+                self.log.exception(_excp)
+                raise
+
+#=================================================
+#               APPLICATION UTILS
+#=================================================
+
+    def init_commands(self):
+        """
+        Registers the handler of each command the client accepts in a message.
+        """
+        self.commands.register("showMain", self.show_main)
+        self.commands.register("restart", lambda: self.restart_client(force_close=True)) #TODO, might not want strict here post-development
+        self.commands.register("daemon", self.switch_to_daemon)
+        self.commands.register("full", self.switch_to_full)
+        self.commands.register("debug", lambda: self.logger.set_verbosity("DEBUG"))
+        self.commands.register("reload_extensions", self.reload_extensions)
+
+    def init_controls(self):
+        """
+        Registers the commands of the JSON control API. See SingleApplicationWithMessaging.handle_control.
+        """
+        self.register_control("status", self.control_status)
+        self.register_control("extensions", self.control_extensions)
+        self.register_control("log_level", self.control_log_level)
+        self.register_control("rescan", lambda args: self.reload_extensions())
+
+    def control_status(self, args):
+        """
+        Returns the state of the running client.
+
+            {"mode": "daemon", "pid": 4242, "uptime": 310.2, "main_window": false, "sys_tray": true,
+             "restarting": false, "queued_commands": [], "connections": 2}
+        """
+        return {"mode":"daemon" if self.status == "daemon" else "full",
+                "pid":os.getpid(),
+                "uptime":round(time.monotonic() - self.started, 3),
+                "main_window":bool(self.main),
+                "sys_tray":bool(self.sys_tray),
+                "restarting":self.commands.held(),
+                "queued_commands":list(self.commands.queued),
+                "connections":len(self._connections)}
+
+    def control_extensions(self, args):
+        """
+        Returns the installed extensions and the libraries they are installed from.
+
+            {"installed": {"config_editor": "global"}, "libraries": {"core": "/usr/share/...", ...}}
+        """
+        manager = extension_manager.ExtensionManager()
+        return {"installed":manager.get_installed(),
+                "libraries":dict(manager.libraries)}
+
+    def control_log_level(self, args):
+        """
+        Returns the logging level, first setting it to args["level"] if it is provided.
+
+        Raises:
+          ValueError: If the level is not a logging level name or a number from 1 (CRITICAL) to 5 (DEBUG).
+        """
+        level = args.get("level")
+        if level is not None:
+            if not isinstance(level, (str, int)) or not self.logger.set_verbosity(level):
+                raise ValueError("{0} is not a logging level.".format(level))
+            self.log.info(self.translate("logs", "Logging level set to {0} by a control command.".format(level)))
+        return self.logger.get_verbosity()
+
+    def process_message(self, message):
+        """
+        Process which processes messages an app receives and takes actions on valid requests.
+
+        Messages are queued as commands and run on the next pass of the event loop. See commands.CommandDispatcher.
+        """
+        self.commands.queue(message)
+
+    def show_main(self):
+        """
+        Brings the main window to the front if there is one.
+        """
+        if self.main != False:
+            self.main.show()
+            self.main.raise_()
+
+    def switch_to_daemon(self):
+        """
+        Switches a running full client over to daemon mode.
+        """
+        if self.status == "daemon":
+            self.log.debug(self.translate("logs", "The client is already running in daemon mode."))
+            return
+        self.log.info(self.translate("logs", "Switching to daemon mode."))
+        self.status = "daemon"
+        self.start_daemon()
+
+    def switch_to_full(self):
+        """
+        Switches a running daemon over to the full client.
+        """
+        if self.status != "daemon":
+            self.log.debug(self.translate("logs", "The full client is already running."))
+            self.show_main()
+            return
+        self.log.info(self.translate("logs", "Switching to the full client."))
+        self.status = None
+        if self.main:
+            self.show_main()
+        else:
+            self.start_full()
+
+    def reload_extensions(self):
+        """
+        Checks every extension library for added, removed, or changed extensions and applies them.
+
+        Returns:
+          A sorted list of the names of the extensions that were added, removed, or changed.
+        """
+        if self.main:
+            watcher = self.main.library_watcher
+        else:
+            if not self.library_watcher:
+                self.library_watcher = library_watcher.LibraryWatcher(parent=self)
+            watcher = self.library_watcher
+        names = watcher.rescan()
+        self.log.info(self.translate("logs", "Reloaded the extension libraries. {0} extensions changed.".format(len(names))))
+        return names
+
+    def end(self, message=None):
+        """
+        Handles properly exiting the application.
+
+        @param message string optional exit message to print to standard error on application close. This will FORCE the application to close in an unclean way.
+        """
+        if message:
+            self.log.error(self.translate("logs", message))
+            self.exit(1)
+        else:
+            self.quit()
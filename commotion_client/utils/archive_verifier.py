@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+archive_verifier
+
+Checks the integrity of extension archives before their code is run.
+
+Key componenets handled within:
+ * checking every member of an archive against its stored checksum
+ * checking archives against the digests in an optional signed library manifest
+ * remembering each result in the library index against the archive's content digest
+
+"""
+#Standard Library Imports
+import logging
+import os
+import json
+import hmac
+import hashlib
+import zipfile
+import threading
+
+#PyQt imports
+from PyQt4 import QtCore
+
+#Commotion Client Imports
+from commotion_client.utils import library_index
+
+#The name of the manifest file within an extension library.
+MANIFEST_NAME = "extension_manifest.json"
+
+
+def sign(archives, key):
+    """Returns the HMAC-SHA256 hex signature of a manifest's archive digests.
+
+    Args:
+      archives (dict): The sha256 hex digest of each archive keyed by archive name.
+      key (bytes): The signing key.
+    """
+    message = json.dumps(archives, sort_keys=True).encode("utf-8")
+    return hmac.new(key, message, hashlib.sha256).hexdigest()
+
+def build_manifest(library, key=None, index=None):
+    """Builds the manifest of every extension archive in a library.
+
+    Args:
+      library (string): The path to an extension library.
+      key (bytes): If provided the manifest is signed with this key.
+      index (LibraryIndex): The index to read archive digests through. An in-memory index is used if not provided.
+
+    Returns:
+      The manifest (dictionary). {"version": 1, "archives": {name: digest}, "signature": signature or None}
+    """
+    index = index if index is not None else library_index.LibraryIndex()
+    archives = {}
+    for path, entry in index.refresh(library):
+        if entry["archive"]:
+            archives[os.path.basename(path)] = index.digest(path)
+    return {"version":1,
+            "archives":archives,
+            "signature":sign(archives, key) if key else None}
+
+def write_manifest(library, key=None, index=None):
+    """Writes the manifest of a library into it. See build_manifest().
+
+    Returns:
+      The path to the manifest file.
+
+    Raises:
+      OSError: If the manifest could not be written.
+    """
+    path = os.path.join(library, MANIFEST_NAME)
+    temp_path = path + ".tmp"
+    with open(temp_path, mode='w', encoding="utf-8") as manifest_file:
+        json.dump(build_manifest(library, key, index), manifest_file, sort_keys=True, indent=2)
+    os.replace(temp_path, path)
+    return path
+
+
+class ArchiveVerifier(object):
+    """Verifies extension archives once per change.
+
+    Without a manifest an archive is verified by reading every member and checking it against the CRC stored in the archive. If the archive's library has a manifest, the archive's sha256 digest must also match the one listed for it. When a key is set the manifest must carry a valid signature. Archives are read a block at a time, so memory use does not grow with archive size.
+
+    Passing results are stored in the archive's library index entry as a token made from the archive's sha256 digest and its manifest's signature. The index is writable by the user, so an archive is hashed again every time it is verified and the stored result is only used if the token still matches. Only the member CRC check is skipped for an unchanged archive. When a key is set the token is an HMAC, so it cannot be written into the index by hand.
+    """
+
+    def __init__(self, index, key=None):
+        """
+        Args:
+          index (LibraryIndex): The index that verification results are kept in.
+          key (bytes): The key library manifests must be signed with. If not provided manifest signatures are not checked.
+        """
+        self.log = logging.getLogger("commotion_client."+__name__)
+        self.translate = QtCore.QCoreApplication.translate
+        self.index = index
+        self.key = key
+        #{manifest path : (sha256 digest of the manifest file, manifest)}
+        self._manifests = {}
+        self._lock = threading.Lock()
+
+    def manifest(self, library):
+        """Returns a library's manifest, only parsing and checking it again after its contents change.
+
+        Args:
+          library (string): The path to an extension library.
+
+        Returns:
+          The manifest (dictionary) {"archives": {name: digest}, "signature": signature or None}, or None if the library does not have a manifest.
+
+        Raises:
+          ValueError: If the manifest could not be read or its signature is not valid.
+        """
+        path = os.path.join(os.path.abspath(library), MANIFEST_NAME)
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, mode='rb') as manifest_file:
+                contents = manifest_file.read()
+        except OSError:
+            raise ValueError(self.translate("logs", "The extension manifest at {0} could not be read.".format(path)))
+        digest = hashlib.sha256(contents).hexdigest()
+        with self._lock:
+            cached = self._manifests.get(path)
+        if cached and cached[0] == digest:
+            return cached[1]
+        try:
+            data = json.loads(contents.decode("utf-8"))
+            manifest = {"archives":dict(data["archives"]),
+                        "signature":data.get("signature")}
+        except (TypeError, KeyError, ValueError):
+            raise ValueError(self.translate("logs", "The extension manifest at {0} could not be read.".format(path)))
+        if self.key is not None:
+            if not hmac.compare_digest(sign(manifest["archives"], self.key), str(manifest["signature"] or "")):
+                raise ValueError(self.translate("logs", "The extension manifest at {0} does not have a valid signature.".format(path)))
+        with self._lock:
+            self._manifests[path] = (digest, manifest)
+        return manifest
+
+    def token(self, digest, manifest=None):
+        """Returns the verification result to store for an archive.
+
+        Args:
+          digest (string): The sha256 hex digest of the archive.
+          manifest (dictionary): The manifest the archive was checked against, if any.
+
+        Returns:
+          A string that only matches for the same archive contents checked against the same manifest.
+        """
+        message = "{0}:{1}".format(digest, "crc" if manifest is None else "manifest:{0}".format(manifest["signature"]))
+        if self.key is not None:
+            return "hmac:" + hmac.new(self.key, message.encode("utf-8"), hashlib.sha256).hexdigest()
+        return "sha256:" + message
+
+    def verify(self, path):
+        """Checks that an extension archive is intact and matches its library's manifest.
+
+        Args:
+          path (string): The path to an extension archive.
+
+        Returns:
+          bool: True if the archive passed verification, False if it did not.
+        """
+        path = os.path.abspath(str(path))
+        entry = self.index.lookup(path)
+        if entry is None or not entry["archive"]:
+            self.log.warning(self.translate("logs", "{0} is not an extension archive and cannot be verified.".format(path)))
+            return False
+        try:
+            manifest = self.manifest(os.path.dirname(path))
+        except ValueError as _excp:
+            self.log.error(_excp)
+            return False
+        name = os.path.basename(path)
+        try:
+            digest = library_index.file_hash(path)
+        except OSError as _excp:
+            self.log.error(self.translate("logs", "Extension archive {0} could not be read.".format(path)))
+            self.log.debug(_excp)
+            return False
+        if manifest is not None:
+            if name not in manifest["archives"]:
+                self.log.error(self.translate("logs", "Extension archive {0} is not listed in its library's manifest.".format(path)))
+                return False
+            if not hmac.compare_digest(digest, str(manifest["archives"][name])):
+                self.log.error(self.translate("logs", "Extension archive {0} does not match the digest in its library's manifest.".format(path)))
+                return False
+        #The result is keyed by the archive's contents and what it was checked against.
+        token = self.token(digest, manifest)
+        if hmac.compare_digest(str(entry.get("verified") or ""), token):
+            return True
+        try:
+            with zipfile.ZipFile(path, 'r') as archive:
+                corrupt = archive.testzip()
+        except (OSError, zipfile.BadZipFile, RuntimeError) as _excp:
+            self.log.debug(_excp)
+            corrupt = name
+        if corrupt is not None:
+            self.log.error(self.translate("logs", "Extension archive {0} is corrupt. {1} does not match its checksum.".format(path, corrupt)))
+            return False
+        self.log.debug(self.translate("logs", "Extension archive {0} passed verification.".format(path)))
+        self.index.annotate(path, verified=token)
+        return True
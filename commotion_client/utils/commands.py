@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+commands
+
+Runs the commands the Commotion client receives from other instances and its own components.
+
+Key componenets handled within:
+ * a registry of the handler of each command
+ * coalescing duplicate commands into one run per pass of the event loop
+ * holding commands while the client is busy (e.g. restarting) and replaying them afterwards
+
+"""
+#Standard Library Imports
+import logging
+
+#PyQt imports
+from PyQt4 import QtCore
+
+
+class CommandDispatcher(QtCore.QObject):
+    """Queues commands and runs their handlers on the next pass of the event loop.
+
+    A command that is queued again before it has run is only run once. Ten launches that each send "showMain" raise the main window once. While the dispatcher is held, commands are kept in the order they arrived and are run once it is released.
+
+        dispatcher = CommandDispatcher()
+        dispatcher.register("showMain", main.bring_front)
+        dispatcher.queue("showMain")
+    """
+
+    #Emitted with the name of each command after its handler has run.
+    command_run = QtCore.pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.log = logging.getLogger("commotion_client."+__name__)
+        self.translate = QtCore.QCoreApplication.translate
+        #The handler of each command keyed by command name.
+        self.handlers = {}
+        #Command names waiting to be run, oldest first.
+        self.queued = []
+        self._holds = 0
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.run)
+
+    def register(self, name, handler):
+        """Sets the function a command runs. It replaces any existing handler of the command.
+
+        Args:
+          name (string): The name of the command.
+          handler (function): Called with no arguments when the command runs.
+        """
+        self.handlers[name] = handler
+
+    def queue(self, name):
+        """Queues a command to run on the next pass of the event loop.
+
+        Args:
+          name (string): The name of the command.
+
+        Returns:
+          bool: True if the command is queued. False if it does not have a handler.
+        """
+        if name not in self.handlers:
+            self.log.info(self.translate("logs", "message \"{0}\" not a supported type.".format(name)))
+            return False
+        if name in self.queued:
+            self.log.debug(self.translate("logs", "Command {0} is already queued and will only be run once.".format(name)))
+        else:
+            self.queued.append(name)
+        self.schedule()
+        return True
+
+    def schedule(self):
+        """Runs the queued commands on the next pass of the event loop unless the dispatcher is held."""
+        if self.queued and not self.held() and not self.timer.isActive():
+            self.timer.start()
+
+    def hold(self):
+        """Keeps queued commands from running until release() is called as many times as hold() was."""
+        self._holds += 1
+
+    def release(self):
+        """Releases one hold() and schedules the queued commands once none are left."""
+        if self._holds > 0:
+            self._holds -= 1
+        self.schedule()
+
+    def held(self):
+        """Returns True if queued commands are being held."""
+        return self._holds > 0
+
+    def run(self):
+        """Runs every command queued before this pass of the event loop. Commands queued by a handler run on the next pass. If a handler holds the dispatcher, the commands after it stay queued."""
+        batch, self.queued = self.queued, []
+        while batch and not self.held():
+            name = batch.pop(0)
+            try:
+                self.handlers[name]()
+            except Exception as _excp:
+                self.log.error(self.translate("logs", "Command {0} could not be completed.".format(name)))
+                self.log.exception(_excp)
+            else:
+                self.command_run.emit(name)
+        #Held commands keep their place ahead of anything queued since.
+        self.queued = batch + [name for name in self.queued if name not in batch]
+        self.schedule()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+extension_archive
+
+A single-pass view of an extension zip archive.
+
+Key componenets handled within:
+ * reading an archive's central directory once
+ * exposing the archive's members, config and a handle to it
+ * sharing one cached archive object per path across the application
+ * keeping only the most recently used archive handles open
+
+"""
+#Standard Library Imports
+import logging
+import os
+import json
+import zipfile
+import zipimport
+import threading
+import collections
+import importlib.util
+
+#PyQt imports
+from PyQt4 import QtCore
+
+log = logging.getLogger("commotion_client."+__name__)
+translate = QtCore.QCoreApplication.translate
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+#The most archive handles kept open at once. The least recently used handle is closed first.
+max_open_handles = 16
+#Archives with an open handle, least recently used first.
+_handles = collections.OrderedDict()
+_handles_lock = threading.Lock()
+
+try:
+    MAGIC_NUMBER = importlib.util.MAGIC_NUMBER
+except AttributeError:
+    #Python 3.3
+    import imp
+    MAGIC_NUMBER = imp.get_magic()
+
+
+class ExtensionArchive(object):
+    """An extension archive whose central directory has been read exactly once.
+
+    The member list, config, and sizes are kept once they have been read, so they never need the file again. Member reads share an open zip handle. Only the max_open_handles most recently used handles are kept open across all archives, so reading every archive in a large library does not hold a file descriptor (or a Windows file lock) on each of them. A closed handle is opened again the next time a member is read. Call close() when finished with it, or use open_archive() to share one instance per path.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+          path (string): The path to an extension archive.
+
+        Raises:
+          FileNotFoundError: If the archive does not exist.
+          ValueError: If the file is not a zip archive.
+        """
+        self.log = logging.getLogger("commotion_client."+__name__)
+        self.translate = QtCore.QCoreApplication.translate
+        self.path = os.path.abspath(str(path))
+        stat = os.stat(self.path)
+        self.size, self.mtime = stat.st_size, stat.st_mtime_ns
+        self._zip = None
+        self._lock = threading.Lock()
+        self._config_lock = threading.Lock()
+        with self._lock:
+            handle = self._open()
+            self.names = handle.namelist()
+            #The total size in bytes of the archive's members once extracted. Used as an estimate of the memory it takes to load the extension.
+            self.uncompressed_size = sum(info.file_size for info in handle.infolist())
+        self.members = frozenset(self.names)
+        self._config = None
+        self._config_loaded = False
+        self._importer = None
+        close_unused_handles()
+
+    def _open(self):
+        """Returns the archive's zip handle, opening it if it was closed. Must be called with the archive's lock held."""
+        if self._zip is None:
+            try:
+                self._zip = zipfile.ZipFile(self.path, 'r')
+            except zipfile.BadZipFile:
+                raise ValueError(self.translate("logs", "{0} is not an extension archive.".format(self.path)))
+        with _handles_lock:
+            _handles[self] = True
+            _handles.move_to_end(self)
+        return self._zip
+
+    @property
+    def handle(self):
+        """The zipfile.ZipFile for this archive. It may be closed once other archives are used, so do not keep it."""
+        with self._lock:
+            handle = self._open()
+        close_unused_handles()
+        return handle
+
+    @property
+    def is_open(self):
+        """True if the archive's zip handle is currently open."""
+        return self._zip is not None
+
+    @property
+    def config_name(self):
+        """The name of the archive's config member, or None if it does not have one."""
+        for name in self.names:
+            if name.endswith(".conf"):
+                return name
+        return None
+
+    @property
+    def config(self):
+        """The archive's parsed config (dictionary) or None if it is missing or invalid."""
+        with self._config_lock:
+            if not self._config_loaded:
+                self._config_loaded = True
+                config_name = self.config_name
+                if config_name:
+                    self.log.debug(self.translate("logs", "Config found in extension {0}.".format(self.path)))
+                    try:
+                        self._config = json.loads(self.read(config_name).decode('utf-8'))
+                    except ValueError:
+                        self.log.warning(self.translate("logs", "Failed to load {0} due to a non-json or otherwise invalid file type".format(self.path)))
+        return self._config
+
+    @property
+    def importer(self):
+        """A zipimporter for this archive, created the first time it is needed."""
+        if self._importer is None:
+            #A new ExtensionArchive is only created for a path when the file on disk changed.
+            forget_importer(self.path)
+            self._importer = zipimport.zipimporter(self.path)
+        return self._importer
+
+    @property
+    def bytecode(self):
+        """The names of the archive's byte-code (.pyc) members."""
+        return [name for name in self.names if name.endswith(".pyc")]
+
+    def bytecode_current(self):
+        """Returns True if the archive's byte-code was compiled for the running interpreter.
+
+        zipimport loads a module from its .pyc member when the member's magic number matches the running interpreter and from its .py member when it does not. Only the header of the first .pyc member is read.
+
+        Returns:
+          bool: True if the byte-code can be loaded. False if the archive has no byte-code or it is for another interpreter.
+        """
+        if not self.bytecode:
+            return False
+        with self._lock:
+            with self._open().open(self.bytecode[0]) as member:
+                magic = member.read(len(MAGIC_NUMBER))
+        close_unused_handles()
+        return magic == MAGIC_NUMBER
+
+    def has(self, name):
+        """Returns True if the archive contains a member with the given name."""
+        return str(name) in self.members
+
+    def read(self, name):
+        """Returns the bytes of a member of the archive, re-using its handle if it is still open."""
+        with self._lock:
+            data = self._open().read(name)
+        close_unused_handles()
+        return data
+
+    def is_current(self):
+        """Returns True if the archive on disk has not changed since it was read."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == (self.size, self.mtime)
+
+    def close(self):
+        """Closes the archive's handle. It is opened again if a member is read later."""
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+            with _handles_lock:
+                _handles.pop(self, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_archive(path):
+    """Returns the shared ExtensionArchive for a path, re-reading it only if the file changed.
+
+    Args:
+      path (string): The path to an extension archive.
+
+    Raises:
+      FileNotFoundError: If the archive does not exist.
+      ValueError: If the file is not a zip archive.
+    """
+    path = os.path.abspath(str(path))
+    with _cache_lock:
+        archive = _cache.get(path)
+    if archive is not None and archive.is_current():
+        return archive
+    if archive is not None:
+        log.debug(translate("logs", "Archive {0} changed on disk. Re-reading it.".format(path)))
+    #Archives are read outside of the lock so that different archives can be read at the same time.
+    new_archive = ExtensionArchive(path)
+    with _cache_lock:
+        current = _cache.get(path)
+        if current is not None and current is not archive and current.is_current():
+            #Another thread read the same archive first.
+            new_archive.close()
+            return current
+        _cache[path] = new_archive
+    if archive is not None:
+        archive.close()
+    return new_archive
+
+def close_unused_handles():
+    """Closes the least recently used archive handles until no more than max_open_handles are open."""
+    with _handles_lock:
+        unused = []
+        while len(_handles) > max(1, max_open_handles):
+            unused.append(_handles.popitem(last=False)[0])
+    #Archives are closed outside of the handle lock. An archive's own lock is always taken first.
+    for archive in unused:
+        archive.close()
+
+def forget_importer(path):
+    """Drops the table of contents zipimport keeps for an archive.
+
+    zipimport reads each archive's table of contents once per process and every zipimporter for the path reuses it, even after the file has been replaced. A module imported from a changed archive would then be read from the old member offsets.
+    """
+    path = os.path.abspath(str(path))
+    getattr(zipimport, "_zip_directory_cache", {}).pop(path, None)
+
+def close_archive(path):
+    """Closes and forgets the shared ExtensionArchive for a path if one is open."""
+    with _cache_lock:
+        archive = _cache.pop(os.path.abspath(str(path)), None)
+    if archive is not None:
+        archive.close()
+
+def close_all():
+    """Closes every shared ExtensionArchive."""
+    with _cache_lock:
+        archives = list(_cache.values())
+        _cache.clear()
+    for archive in archives:
+        archive.close()
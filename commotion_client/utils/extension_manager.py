@@ -40,9 +40,10 @@ import shutil
 import os
 import re
 import sys
-import zipfile
-import json
-import zipimport
+import time
+import threading
+import collections
+from concurrent import futures
 
 #PyQt imports
 from PyQt4 import QtCore
@@ -51,17 +52,83 @@ from PyQt4 import QtCore
 from commotion_client.utils import fs_utils
 from commotion_client.utils import validate
 from commotion_client.utils import settings
+from commotion_client.utils import extension_settings
+from commotion_client.utils import library_index
+from commotion_client.utils import extension_archive
+from commotion_client.utils import module_cache
+from commotion_client.utils import archive_verifier
+from commotion_client.utils import profiler
 from commotion_client import extensions
 
+#The extension state shared by every ExtensionManager in the process. Each part is built the first time it is used and is cleared by invalidate().
+_shared = {}
+_shared_lock = threading.RLock()
+_shared_parts = ("libraries", "user_settings", "index", "registry", "extensions", "modules", "verifier")
+_invalidate_callbacks = []
+
+def invalidate(*parts):
+    """Clears the shared extension state so that it is rebuilt the next time it is used.
+
+    Args:
+      parts (strings): The parts of the shared state to clear. [libraries, user_settings, index, registry, extensions, modules, verifier] If none are given, all of it is cleared.
+
+    Raises:
+      ValueError: If an unknown part is given.
+    """
+    parts = list(parts) or list(_shared_parts)
+    for part in parts:
+        if part not in _shared_parts:
+            raise ValueError(QtCore.QCoreApplication.translate("logs", "{0} is not a part of the shared extension state.".format(part)))
+    #The registry mirrors the user settings and has to be rebuilt with them.
+    if "user_settings" in parts and "registry" not in parts:
+        parts.append("registry")
+    #Verification results are kept in the index.
+    if "index" in parts and "verifier" not in parts:
+        parts.append("verifier")
+    with _shared_lock:
+        index = _shared.get("index") if "index" in parts else None
+        modules = _shared.get("modules") if "modules" in parts else None
+        for part in parts:
+            _shared.pop(part, None)
+        callbacks = list(_invalidate_callbacks)
+    if index is not None:
+        index.save()
+    if modules is not None:
+        modules.clear()
+    for callback in callbacks:
+        callback(parts)
+
+def on_invalidate(callback):
+    """Registers a callable to be called with the list of cleared parts whenever the shared extension state is invalidated."""
+    with _shared_lock:
+        if callback not in _invalidate_callbacks:
+            _invalidate_callbacks.append(callback)
+
+def remove_invalidate_callback(callback):
+    """Stops calling a callable registered with on_invalidate()."""
+    with _shared_lock:
+        if callback in _invalidate_callbacks:
+            _invalidate_callbacks.remove(callback)
+
+
 class ExtensionManager(object):
-    
+    """Manages the extension libraries and the installed extension settings.
+
+    Creating an ExtensionManager is cheap. The library paths, user settings, archive index, and installed extension registry are shared by every ExtensionManager in the process and are only built the first time they are used.
+    """
+
+    #The most archives that are read at the same time when loading the extension libraries.
+    load_workers = 4
+    #The most extensions whose user interface modules are kept loaded.
+    ui_cache_size = 8
+    #If True archives are verified before their code is first run. See archive_verifier.ArchiveVerifier.
+    verify_archives = True
+    #The key (bytes) library manifests must be signed with. If None manifest signatures are not checked.
+    manifest_key = None
+
     def __init__(self):
         self.log = logging.getLogger("commotion_client."+__name__)
         self.translate = QtCore.QCoreApplication.translate
-        self.extensions = {}
-        self.libraries = {}
-        self.set_library_defaults()
-        self.user_settings = self.get_user_settings()
         self.config_keys = ["name",
                             "main",
                             "menu_item",
@@ -73,6 +140,79 @@ class ExtensionManager(object):
                             "initialized",
                             "type",]
 
+    def _shared(self, part, build):
+        """Returns a part of the shared extension state, building it with build() if it does not exist yet."""
+        with _shared_lock:
+            if part not in _shared:
+                _shared[part] = build()
+            return _shared[part]
+
+    @property
+    def extensions(self):
+        """The ConfigManager of each loaded extension library keyed by extension type."""
+        return self._shared("extensions", dict)
+
+    @property
+    def libraries(self):
+        """The path of each extension library keyed by extension type."""
+        with _shared_lock:
+            if "libraries" not in _shared:
+                _shared["libraries"] = {}
+                try:
+                    self.set_library_defaults()
+                except Exception:
+                    del _shared["libraries"]
+                    raise
+            return _shared["libraries"]
+
+    @property
+    def user_settings(self):
+        """The current user's settings positioned at the extensions group."""
+        return self._shared("user_settings", self.get_user_settings)
+
+    @property
+    def index(self):
+        """The LibraryIndex that extension archives are read through."""
+        return self._shared("index", lambda: library_index.LibraryIndex(library_index.default_index_path()))
+
+    @property
+    def registry(self):
+        """The in-memory ExtensionSettings of the installed extensions."""
+        return self._shared("registry", lambda: extension_settings.ExtensionSettings(self.user_settings, self.config_keys))
+
+    @property
+    def modules(self):
+        """The ModuleCache that extension user interfaces are loaded through."""
+        return self._shared("modules", lambda: module_cache.ModuleCache(self.ui_cache_size))
+
+    @property
+    def verifier(self):
+        """The ArchiveVerifier that extension archives are checked with before their code is run."""
+        return self._shared("verifier", lambda: archive_verifier.ArchiveVerifier(self.index, self.manifest_key))
+
+    def invalidate(self, *parts):
+        """Clears the shared extension state so that it is rebuilt the next time it is used. See invalidate()."""
+        invalidate(*parts)
+
+    def get_configs(self, ext_type):
+        """Returns the configs of an extension library, loading the library the first time its configs are asked for.
+
+        Args:
+          ext_type (string): The extension type of the library. [global, user, or core]
+
+        Returns:
+          A list of config dictionaries. An empty list if the library has no extensions.
+
+        Raises:
+          ValueError: If the extension type passed is not either [core, global, or user]
+        """
+        if ext_type not in self.extensions:
+            self.init_extension_config(ext_type)
+        try:
+            return self.extensions[ext_type].configs
+        except KeyError:
+            return []
+
     def get_user_settings(self):
         """Get the currently logged in user settings object."""
         settings_manager = settings.UserSettingsManager()
@@ -98,16 +238,23 @@ class ExtensionManager(object):
         """This function bootstraps the Commotion client when the settings are not populated on first boot or due to error. It iterates through all extensions in the core client and loads them."""
         
         #create directory structures if needed
-        self.init_libraries()
+        with profiler.phase("init_libraries"):
+            self.init_libraries()
         #load core and move to global if needed
         self.log.debug(self.libraries)
-        self.load_core()
-        #Load all extension configs found in libraries
-        for name, path in self.libraries.items():
-            if QtCore.QDir(path).entryInfoList() != []:
-                self.init_extension_config(name)
+        with profiler.phase("load_core"):
+            self.load_core()
+        #Check every archive before anything is loaded so broken ones are reported together
+        with profiler.phase("preflight"):
+            self.preflight(['global', 'user'])
+        #Load all extension configs found in libraries that load_core has not already loaded
+        with profiler.phase("init_extension_config"):
+            for name, path in self.libraries.items():
+                if name not in self.extensions and QtCore.QDir(path).entryInfoList() != []:
+                    self.init_extension_config(name)
         #install all loaded config's with the existing settings
-        self.install_loaded()
+        with profiler.phase("install_loaded"):
+            self.install_loaded()
 
     def set_library_defaults(self):
         """Sets the default directories for core, user, and global extensions.
@@ -205,10 +352,14 @@ class ExtensionManager(object):
                 extension_types = [ext_type]
             else:
                 raise ValueError(self.translate("logs", "{0} is not an acceptable extension type.".format(ext_type)))
-        for type_ in extension_types:
+        #Each library is scanned on its own thread while the archives within them are read on a shared, bounded pool.
+        with futures.ThreadPoolExecutor(max_workers=self.load_workers) as archive_pool:
+            with futures.ThreadPoolExecutor(max_workers=len(extension_types)) as library_pool:
+                jobs = [(type_, library_pool.submit(self.load_library, type_, archive_pool)) for type_ in extension_types]
+        #Results are merged in the order of extension_types so that loading is deterministic.
+        for type_, job in jobs:
             try:
-                self.log.debug(self.translate("logs", "Creating  {0} config manager".format(type_)))
-                self.extensions[type_] = ConfigManager(self.libraries[type_])
+                self.extensions[type_] = job.result()
             except ValueError:
                 self.log.debug(self.translate("logs", "There were no extensions found for the {0} library.".format(type_)))
                 continue
@@ -216,6 +367,110 @@ class ExtensionManager(object):
                 self.log.debug(self.translate("logs", "There were no library path found for the {0} library.".format(type_)))
                 continue
             self.log.debug(self.translate("logs", "Configs for {0} extension library loaded..".format(type_)))
+        self.index.save()
+
+    def load_library(self, ext_type, executor=None):
+        """Creates a config manager for a single extension library and logs how long it took.
+
+        Args:
+          ext_type (string): The extension type of the library to load. [global, user, or core]
+          executor (concurrent.futures.Executor): An executor to read the library's archives on.
+
+        Returns:
+          A ConfigManager for the library.
+
+        Raises:
+          KeyError: If there is no library path for the extension type.
+          ValueError: If there were no extensions found in the library.
+        """
+        self.log.debug(self.translate("logs", "Creating  {0} config manager".format(ext_type)))
+        started = time.monotonic()
+        try:
+            return ConfigManager(self.libraries[ext_type], self.index, executor)
+        finally:
+            elapsed = (time.monotonic() - started) * 1000
+            self.log.info(self.translate("logs", "Loading the {0} extension library took {1:.1f} ms.".format(ext_type, elapsed)))
+
+    def update_library(self, ext_type):
+        """Applies the changes made to an extension library since it was last loaded.
+
+        Only archives that were added or whose stat data changed are read. The settings of installed user and global extensions are added, replaced, or removed to match the library.
+
+        Args:
+          ext_type (string): The extension type of the library that changed. [global, user, or core]
+
+        Returns:
+          A sorted list of the names of the extensions that were added, removed, or changed.
+
+        Raises:
+          ValueError: If the extension type passed is not either [core, global, or user]
+        """
+        if ext_type not in ['user', 'global', 'core']:
+            raise ValueError(self.translate("logs", "{0} is not an acceptable extension type.".format(ext_type)))
+        try:
+            configs = self.extensions[ext_type]
+        except KeyError:
+            #The library was empty or had not been loaded yet.
+            self.init_extension_config(ext_type)
+            configs = self.extensions.get(ext_type)
+            added, removed, changed = (list(configs.configs) if configs else []), [], []
+        else:
+            added, removed, changed = configs.update()
+            self.index.save()
+        return self.apply_library_changes(ext_type, added, removed, changed)
+
+    def apply_library_changes(self, ext_type, added, removed, changed):
+        """Brings the installed extension settings in line with configs that were added, removed, or changed in a library.
+
+        Args:
+          ext_type (string): The extension type of the library that changed. [global, user, or core]
+          added (list): The configs that were added to the library.
+          removed (list): The configs that were removed from the library.
+          changed (list): The configs whose archives changed.
+
+        Returns:
+          A sorted list of the names of the extensions that were added, removed, or changed.
+        """
+        if ext_type in ['user', 'global']:
+            #Core extensions are never installed directly.
+            for config in removed:
+                if self.registry.value(config['name'], "type") == ext_type:
+                    self.unload_user_interface(config['name'])
+                    self.remove_extension_settings(config['name'])
+            #An archive that was replaced, or removed and added back, refreshes the extension it installed.
+            updated = [config for config in added + changed if self.registry.value(config['name'], "type") == ext_type]
+            for config in updated:
+                self.unload_user_interface(config['name'])
+            self.update_extensions(updated, ext_type)
+            self.install_extensions([config for config in added + changed if config['name'] not in self.registry], ext_type)
+        names = sorted(set(config['name'] for config in added + removed + changed))
+        if names:
+            self.log.info(self.translate("logs", "The {0} extension library changed: added [{1}], removed [{2}], changed [{3}].".format(ext_type, ", ".join(c['name'] for c in added), ", ".join(c['name'] for c in removed), ", ".join(c['name'] for c in changed))))
+        return names
+
+    def preflight(self, ext_types=None):
+        """Validates every archive in the extension libraries before they are loaded.
+
+        Each library is validated in a single concurrent pass. Every archive that fails is logged with all of its errors. The results are cached, so installing the extensions afterwards does not validate them again.
+
+        Args:
+          ext_types (list): The extension types of the libraries to validate. [global, user, or core] If not provided, defaults to all.
+
+        Returns:
+          A dictionary of validate.LibraryReport's keyed by extension type for every library that exists.
+        """
+        reports = {}
+        for type_ in ext_types or ['core', 'global', 'user']:
+            path = self.libraries.get(type_)
+            if not path or not os.path.isdir(path):
+                continue
+            report = validate.validate_library(path, self.index, max_workers=self.load_workers)
+            for archive_path in report.rejected():
+                self.log.warning(self.translate("logs", "Extension archive {0} failed validation and will not be installed. {1}".format(archive_path, report.reports[archive_path])))
+            self.log.info(self.translate("logs", "Validated {0} archives in the {1} extension library. {2} were rejected.".format(len(report.reports), type_, len(report.rejected()))))
+            reports[type_] = report
+        self.index.save()
+        return reports
 
     def check_installed(self, name=None):
         """Checks if and extension is installed.
@@ -251,10 +506,9 @@ class ExtensionManager(object):
         """
         self.log.debug(self.translate("logs", "Getting installed extensions."))
         installed_extensions = {}
-        _settings = self.user_settings
-        extensions = _settings.childGroups()
+        extensions = self.registry.names()
         for ext in extensions:
-            _type = _settings.value(ext+"/type")
+            _type = self.registry.value(ext, "type")
             ext_dir = QtCore.QDir(self.libraries[_type])
             if ext_dir.exists(ext):
                 installed_extensions[ext] = _type
@@ -262,39 +516,72 @@ class ExtensionManager(object):
         return installed_extensions
             
     def load_core(self):
-        """Loads all core extensions into the globals library and re-initialized the global config.
+        """Syncs all core extensions into the globals library and updates the global config.
         
-        This function bootstraps global library from the core library. It iterates through all extensions in the core library and populates the global config with any extensions it does not already contain and then loads them into the global config.
+        This function bootstraps global library from the core library. Every core extension that is missing from the global library, or whose global copy differs from it, is copied into the global library. Only the global configs of the copied extensions are reloaded. Installed extensions they belong to are refreshed in place and keep their initialized state and user settings.
 
+        Returns:
+          A sorted list of the names of the core extensions that were copied into the global library.
         """
         #Core extensions are loaded from the global directory.
         #If a core extension has been deleted from the global directory it will be replaced from the core directory.
+        rejected = set()
+        for report in self.preflight(['core']).values():
+            rejected.update(report.rejected_names())
         self.init_extension_config('core')
-        _core_dir = QtCore.QDir(self.libraries['core'])
-        _global_dir = QtCore.QDir(self.libraries['global'])
-        _reload_globals = False
-        for ext in self.extensions['core'].configs:
+        if 'core' not in self.extensions:
+            self.log.debug(self.translate("logs", "There are no core extensions to load into the global library."))
+            return []
+        copied = []
+        for core_path, ext in self.extensions['core'].loaded.items():
+            if ext['name'] in rejected:
+                self.log.debug(self.translate("logs", "Core extension {0} failed validation and will not be copied into the global library.".format(ext['name'])))
+                continue
+            global_path = os.path.join(os.path.abspath(self.libraries['global']), ext['name'])
+            if not self.core_outdated(core_path, global_path):
+                self.log.debug(self.translate("logs", "Core extension {0} is already in the global extension directory.".format(ext['name'])))
+                continue
+            self.log.info(self.translate("logs", "Core extension {0} was missing or out of date in the global extension directory. Copying it into the global extension directory from the core now.".format(ext['name'])))
+            #An open handle on the global copy would keep it from being replaced on Windows.
+            extension_archive.close_archive(global_path)
             try:
-                #Check if the extension is in the globals
-                global_extensions = list(self.extensions['global'].configs.keys())
-                if ext['name'] in global_extensions:
-                    self.log.debug(self.translate("logs", "Core extension {0} was found in the global extension list.".format(ext['name'])))
-                    if not _global_dir.exists(ext['name']):
-                        raise KeyError(self.translate("Extension {0} was found in the extension list, but it did not exist in the actual library. Loading it to global.".format(ext['name'])))
-                    continue
-            except KeyError:
-                #If extension not loaded in globals it will raise a KeyError
-                _core_ext_path = _core_dir.absoluteFilePath(ext['name'])
-                _global_ext_path = _global_dir.absoluteFilePath(ext['name'])
-                self.log.info(self.translate("logs", "Core extension {0} was missing from the global extension directory. Copying it into the global extension directory from the core now.".format(ext['name'])))
-                #Copy extension into global directory
-                if QtCore.QFile(_core_ext_path).copy(_global_ext_path):
-                    self.log.debug(self.translate("logs", "Extension successfully copied."))
-                else:
-                    self.log.debug(self.translate("logs", "Extension was not copied."))
-                _reload_globals = True
-        if _reload_globals == True:
-            self.init_extension_config("global")
+                fs_utils.atomic_copy(core_path, global_path)
+            except OSError as _excp:
+                self.log.warning(self.translate("logs", "Core extension {0} could not be copied into the global extension directory.".format(ext['name'])))
+                self.log.debug(_excp)
+                continue
+            copied.append(global_path)
+        if copied:
+            if 'global' in self.extensions:
+                added, removed, changed = self.extensions['global'].update(copied)
+                self.index.save()
+                self.apply_library_changes('global', added, removed, changed)
+            else:
+                self.init_extension_config("global")
+        return sorted(os.path.basename(path) for path in copied)
+
+    def core_outdated(self, core_path, global_path):
+        """Checks if the global copy of a core extension needs to be replaced.
+
+        Archives with the same size and modification time are taken to be the same. Otherwise their content hashes are compared. Hashes are cached in the index against each archive's stat data, so an archive is only hashed again after it changes.
+
+        Args:
+          core_path (string): The path to a core extension archive.
+          global_path (string): The path the archive has in the global library.
+
+        Returns:
+          bool: True if the global copy is missing or its contents differ from the core archive.
+        """
+        try:
+            core_stat = os.stat(core_path)
+            global_stat = os.stat(global_path)
+        except OSError:
+            return True
+        if core_stat.st_size != global_stat.st_size:
+            return True
+        if core_stat.st_mtime_ns == global_stat.st_mtime_ns:
+            return False
+        return self.index.digest(core_path) != self.index.digest(global_path)
 
     def install_loaded(self, ext_type=None):
         """Installs loaded libraries by saving their settings into the application settings.
@@ -307,12 +594,10 @@ class ExtensionManager(object):
         Returns:
           List of names (strings) of extensions loaded  on success. Returns and empty list [] on failure.
         
-        Note on validation: Relies on save_settings to validate all fields.
+        Note on validation: Relies on settings_values to validate all fields. Each extension type is installed with a single settings write.
         Note on core: Core extensions are never "installed" they are used to populate the global library and then installed under global settings.
         
         """
-        _settings = self.user_settings
-        _keys = _settings.childKeys()
         extension_types = ['user', 'global']
         if ext_type and str(ext_type) in extension_types:
             extension_types = [ext_type]
@@ -326,14 +611,9 @@ class ExtensionManager(object):
             if not ext_configs: #Check if the type has been created and then emptied
                 self.log.info(self.translate("logs", "No extensions of type {0} are currently loaded.".format(type_)))
                 continue
-            for _config in ext_configs:
-                #Only install if not already installed in this section.
-                if _config['name'] not in _keys:
-                    #Attempt to save the extension.
-                    if not self.save_settings(_config, type_):
-                        self.log.warning(self.translate("logs", "Extension {0} could not be saved.".format(_config['name'])))
-                    else:
-                        saved.append(_config['name'])
+            #Only install if not already installed in this section.
+            pending = [_config for _config in ext_configs if _config['name'] not in self.registry]
+            saved.extend(self.install_extensions(pending, type_))
         return saved
 
     def get_extension_from_property(self, key, val):
@@ -352,19 +632,10 @@ class ExtensionManager(object):
         Raises:
           KeyError: If the value requested is non-standard.
         """
-        matching_extensions = []
         if key not in self.config_keys:
             _error = self.translate("logs", "{0} is not a valid extension config value.".format(key))
             raise KeyError(_error)
-        _settings = self.user_settings
-        all_exts = _settings.childGroups()
-        for current_extension in all_exts:
-            #enter extension settings
-            _settings.beginGroup(current_extension)
-            if _settings.value(key) == val:
-                matching_extensions.append(current_extension)
-            #exit extension
-            _settings.endGroup()
+        matching_extensions = self.registry.find(key, val)
         if matching_extensions:
             return matching_extensions
         else:
@@ -389,15 +660,11 @@ class ExtensionManager(object):
         if key not in self.config_keys:
             _error = self.translate("logs", "That is not a valid extension config value.")
             raise KeyError(_error)
-        _settings = self.user_settings
-        _settings.beginGroup(name)
-        setting_value = _settings.value(key)
-        if not setting_value:
+        setting_value = self.registry.value(name, key)
+        if setting_value is None or setting_value == "":
             _error = self.translate("logs", "The extension config does not contain that value.")
-            _settings.endGroup()
             raise KeyError(_error)
         else:
-            _settings.endGroup()
             return setting_value
 
     def load_user_interface(self, extension_name, gui):
@@ -417,7 +684,7 @@ class ExtensionManager(object):
             raise AttributeError(self.translate("logs", "Attempted to get a user interface of an invalid type."))
         _config = self.get_config(extension_name)
         try:
-            if _config['initialized'] != 'true':
+            if not _config['initialized']:
                 self.log.debug(self.translate("logs", "Extension manager attempted to load a user interface from uninitalized extension {0}. Uninitialized extensions cannot be loaded. Try installing/initalizing the extension first.".format(extension_name)))
                 raise AttributeError(self.translate("logs", "Attempted to load a user interface from an uninitialized extension."))
         except KeyError:
@@ -429,10 +696,14 @@ class ExtensionManager(object):
         extension_path = os.path.join(self.libraries[_type], extension_name)
         self.log.debug(extension_path)
         #Get the extension
-        extension = zipimport.zipimporter(extension_path)
-        #add extension to sys path so imported modules can access other modules in the extension.
-        sys.path.append(extension_path)
-        user_interface = extension.load_module(ui_file)
+        archive = extension_archive.open_archive(extension_path)
+        if not archive.has(str(ui_file)+".py"):
+            self.log.debug(self.translate("logs", "Extension {0} does not contain the {1} file listed in its settings.".format(extension_name, ui_file)))
+            raise AttributeError(self.translate("logs", "Attempted to load a user interface that does not exist in its extension."))
+        if self.verify_archives and extension_path not in self.modules and not self.verifier.verify(extension_path):
+            raise AttributeError(self.translate("logs", "Attempted to load a user interface from an extension that failed verification."))
+        #Recently used extensions are served from the module cache without re-running their code.
+        user_interface = self.modules.load(extension_path, str(ui_file))
         if gui == "toolbar":
             return user_interface.ToolBar
         elif gui == "main":
@@ -440,6 +711,20 @@ class ExtensionManager(object):
         elif gui == "settings":
             return user_interface.SettingsMenu
 
+    def unload_user_interface(self, extension_name):
+        """Unloads the modules of an extension's user interfaces so that they are loaded fresh the next time they are used.
+
+        Args:
+          extension_name (string): The extension to unload.
+
+        Returns:
+          bool: True if the extension was loaded, False if it was not.
+        """
+        _type = self.registry.value(extension_name, "type")
+        if _type is None:
+            return False
+        return self.modules.unload(os.path.join(self.libraries[_type], extension_name))
+
     def get_config(self, name):
         """Returns a config from an installed extension.
                 
@@ -452,17 +737,9 @@ class ExtensionManager(object):
         Raises:
           KeyError: If an installed extension of the specified name does not exist.
         """
-        config  = {}
-        _settings = self.user_settings
-        extensions  = _settings.childGroups()
-        if name not in extensions:
+        if name not in self.registry:
             raise KeyError(self.translate("logs", "No installed extension with the name {0} exists.".format(name)))
-        _settings.beginGroup(name)
-        extension_config = _settings.childKeys()
-        for key in extension_config:
-            config[key] = _settings.value(key)
-        _settings.endGroup()
-        return config
+        return self.registry.get(name)
 
     def remove_extension_settings(self, name):
         """Removes an extension and its core properties from the applications extension settings.
@@ -481,8 +758,7 @@ class ExtensionManager(object):
         #make sure that a string of "" is not passed to this function because that would remove all keys.
         self.reset_settings_group()
         if len(str(name)) > 0:
-            _settings = self.user_settings
-            _settings.remove(str(name))
+            self.registry.remove(str(name))
             return True
         else:
             self.log.debug(self.translate("logs", "A zero length string was passed as the name of an extension to be removed. This would delete all the extensions if it was allowed to succeed."))
@@ -501,7 +777,91 @@ class ExtensionManager(object):
         Returns:
           bool: True if successful, False on any failures
         """
-        _settings = self.user_settings
+        _values = self.settings_values(extension_config, extension_type)
+        if not _values:
+            return False
+        self.registry.set(_values["name"], _values)
+        return True
+
+    def install_extensions(self, configs, extension_type="global", strict=False):
+        """Installs a batch of extensions with a single settings write.
+
+        Every config is validated before anything is written. All valid extensions are then written together and flushed to disk once. If the write fails, every extension in the batch is rolled back.
+
+        Args:
+          configs (list): Extension configs in dictionary format.
+          extension_type (string): Type of extension "user" or "global". Defaults to global.
+          strict (bool): If True nothing is installed when any config is invalid. Otherwise invalid configs are skipped.
+
+        Returns:
+          List of names (strings) of the extensions installed. An empty list on failure.
+        """
+        batch = collections.OrderedDict()
+        for config in configs:
+            _values = self.settings_values(config, extension_type)
+            if not _values:
+                self.log.warning(self.translate("logs", "Extension {0} could not be saved.".format(config.get('name'))))
+                if strict:
+                    return []
+                continue
+            if _values["name"] in batch:
+                self.log.warning(self.translate("logs", "Extension {0} was found twice in the {1} library. Only the first will be installed.".format(_values["name"], extension_type)))
+                continue
+            batch[_values["name"]] = _values
+        if not batch:
+            return []
+        try:
+            self.registry.set_many(batch)
+        except IOError as _excp:
+            self.log.error(self.translate("logs", "No {0} extensions were installed.".format(extension_type)))
+            self.log.debug(_excp)
+            return []
+        return list(batch.keys())
+
+    def update_extensions(self, configs, extension_type="global"):
+        """Updates the settings of installed extensions whose configs changed with a single settings write.
+
+        Only the values that come from the config are changed. Whether an extension is initialized, and any other setting the user changed, is kept.
+
+        Args:
+          configs (list): The changed extension configs in dictionary format.
+          extension_type (string): Type of extension "user" or "global". Defaults to global.
+
+        Returns:
+          List of names (strings) of the extensions whose settings changed. An empty list on failure.
+        """
+        batch = collections.OrderedDict()
+        for config in configs:
+            _values = self.settings_values(config, extension_type)
+            if not _values:
+                self.log.warning(self.translate("logs", "Extension {0} could not be updated.".format(config.get('name'))))
+                continue
+            #The user decides if an extension is enabled.
+            del _values["initialized"]
+            current = self.registry.get(_values["name"])
+            changes = dict((key, value) for key, value in _values.items() if current.get(key) != self.registry.coerce(key, value))
+            if changes:
+                batch[_values["name"]] = changes
+        if not batch:
+            return []
+        try:
+            self.registry.set_many(batch, replace=False)
+        except IOError as _excp:
+            self.log.error(self.translate("logs", "No {0} extensions were updated.".format(extension_type)))
+            self.log.debug(_excp)
+            return []
+        return list(batch.keys())
+
+    def settings_values(self, extension_config, extension_type="global"):
+        """Validates an extension config and returns the settings that installing it would save.
+
+        Args:
+          extension_config (dict) An extension config in dictionary format.
+          extension_type (string): Type of extension "user" or "global". Defaults to global.
+
+        Returns:
+          dict: The extension's settings if the config is valid. False if it is not.
+        """
         #get extension dir
         try:
             extension_dir = self.libraries[extension_type]
@@ -519,99 +879,30 @@ class ExtensionManager(object):
             self.log.warning(self.translate("logs", "The extension was not found on the system and therefore cannot be saved."))
             self.log.debug(_excp)
             return False
-        #Extension Name
-        try:
-            extension_name = extension_config['name']
-            if config_validator.name():
-                _settings.beginGroup(extension_name)
-                _settings.setValue("name", extension_name)
-            else:
-                _error = self.translate("logs", "The extension's name is invalid and cannot be saved.")
-                self.log.error(_error)
-                return False
-        except KeyError:
-            _error = self.translate("logs", "The extension is missing a name value which is required.")
-            self.log.error(_error)
+        #Every value is checked at once and reported together.
+        report = config_validator.report()
+        for field, message in report.warnings.items():
+            self.log.info(self.translate("logs", "Extension {0}'s {1} value: {2}".format(report.name, field, message)))
+        #Gui files that fall back to their defaults do not stop an extension from being installed.
+        errors = [field for field in report.errors if field not in ["main", "settings", "toolbar"] or field in extension_config]
+        if errors:
+            self.log.error(self.translate("logs", "The config of extension {0} is invalid and cannot be saved. {1}".format(report.name, report)))
             return False
-        #Extension Main
-        try:
-            _main = extension_config['main']
-            if not config_validator.gui(_main):
-                _error = self.translate("logs", "The config's main value is invalid and cannot be saved.")
-                self.log.error(_error)
-                return False
-        except KeyError:
-            _main = "main" #Set this for later default values
-            if not config_validator.gui(_main):
-                _settings.setValue("main", _main)
-        else:
-            _settings.setValue("main", _main)
-        #Extension Settings & Toolbar
-        for val in ["settings", "toolbar"]:
-            try:
-                _config_value = extension_config[val]
-                if not config_validator.gui(val):
-                    _error = self.translate("logs", "The config's {0} value is invalid and cannot be saved.".format(val))
-                    self.log.error(_error)
-                    return False
-            except KeyError:
-                #Defaults to main, which was checked and set before
-                _settings.setValue(val, _main)
-            else:
-                _settings.setValue(val, _config_value)
-        #Extension Parent
-        try:
-            _parent = extension_config["parent"]
-            if config_validator.parent():
-                _settings.setValue("parent", _parent)
-            else:
-                _error = self.translate("logs", "The config's parent value is invalid and cannot be saved.")
-                self.log.error(_error)
-                return False
-        except KeyError:
-            self.log.debug(self.translate("logs", "Config for {0} does not contain a {1} value. Setting {1} to default value.".format(extension_name, "parent")))
-            _settings.setValue("parent", "Extensions")
-        #Extension Menu Item
-        try:
-            _menu_item = extension_config["menu_item"]
-            if config_validator.menu_item():
-                _settings.setValue("menu_item", _menu_item)
-            else:
-                _error = self.translate("logs", "The config's menu_item value is invalid and cannot be saved.")
-                self.log.error(_error)
-                return False
-        except KeyError:
-            self.log.debug(self.translate("logs", "Config for {0} does not contain a {1} value. Setting {1} to default value.".format(extension_name, "menu_item")))
-            _settings.setValue("menu_item", extension_name)
-        #Extension Menu Level
-        try:
-            _menu_level = extension_config["menu_level"]
-            if config_validator.menu_level():
-                _settings.setValue("menu_level", _menu_level)
-            else:
-                _error = self.translate("logs", "The config's menu_level value is invalid and cannot be saved.")
-                self.log.error(_error)
-                return False
-        except KeyError:
-            self.log.debug(self.translate("logs", "Config for {0} does not contain a {1} value. Setting {1} to default value.".format(extension_name, "menu_level")))
-            _settings.setValue("menu_level", 10)
-        #Extension Tests
-        try:
-            _tests = extension_config['tests']
-            if config_validator.tests():
-                _settings.setValue("tests", _tests)
-            else:
-                _error = self.translate("logs", "Extension {0} does not contain the {1} file listed in the config for its tests. Please either remove the listing to allow for the default value, or add the appropriate file.".format(extension_name, _config_value))
-                self.log.error(_error)
-                return False
-        except KeyError:
-            self.log.debug(self.translate("logs", "Config for {0} does not contain a {1} value. Setting {1} to default value.".format(extension_name, "tests")))
-            _settings.setValue("tests", "tests")
-        #Write extension type
-        _settings.setValue("type", extension_type)
-        _settings.setValue("initialized", 'true')
-        _settings.endGroup()
-        return True
+        extension_name = extension_config['name']
+        _main = extension_config.get('main', "main")
+        #Missing values are set to their defaults. Settings and toolbar default to main.
+        _values = {"name":extension_name,
+                   "settings":extension_config.get("settings", _main),
+                   "toolbar":extension_config.get("toolbar", _main),
+                   "parent":extension_config.get("parent", "Extensions"),
+                   "menu_item":extension_config.get("menu_item", extension_name),
+                   "menu_level":extension_config.get("menu_level", 10),
+                   "tests":extension_config.get("tests", "tests"),
+                   "type":extension_type,
+                   "initialized":'true'}
+        if "main" in extension_config or "main" in report.errors:
+            _values["main"] = _main
+        return _values
 
 class ConfigManager(object):
     """A object for loading config data from a library.
@@ -619,28 +910,86 @@ class ConfigManager(object):
     This object should only be used to load configs and saving/checking those values against the users settings. Any value checking should take place in the users settings.
     """
 
-    def __init__(self, path=None):
+    def __init__(self, path=None, index=None, executor=None):
         """
         Args:
           path (string): The path to an extension library.
+          index (LibraryIndex): An archive index to read configs through. If not provided an in-memory index is used.
+          executor (concurrent.futures.Executor): If provided, the library's archives are read on this executor.
         """
         #set function logger
         self.log = logging.getLogger("commotion_client."+__name__)
         self.translate = QtCore.QCoreApplication.translate
         self.log.debug(self.translate("logs", "Initalizing ConfigManager"))
+        self.index = index if index is not None else library_index.LibraryIndex()
         self.configs = []
+        #The config loaded from each path, in the same order as configs.
+        self.loaded = {}
         self.directory = None
         self.paths = []
         if path:
             self.directory = path
             try:
-                self.paths = self.get_paths(path)
+                self.paths = self.get_paths(path, executor)
             except TypeError:
                 self.log.debug(self.translate("logs", "No extensions found in the {0} directory. You must first populate the folder with extensions to init a ConfigManager in that folder. You can create a ConfigManager without a location specified, but you will have to add extensions before getting paths.".format(path)))
                 raise ValueError(self.translate("logs", "The path {0} is empty. ConfigManager could not be created".format(path)))
             else:
                 self.log.info(self.translate("logs", "Extensions found in the {0} directory. Attempting to load extension configs.".format(path)))
-                self.configs = list(self.get())
+                self.loaded = self.load_paths(self.paths)
+                self.configs = list(self.loaded.values())
+
+    def load_paths(self, paths):
+        """Returns an ordered dictionary of the configs that could be loaded from a list of paths keyed by their path."""
+        loaded = collections.OrderedDict()
+        for path in paths:
+            if fs_utils.is_file(path):
+                config = self.load(path)
+                if config:
+                    loaded[path] = config
+        return loaded
+
+    def update(self, paths=None):
+        """Brings the loaded configs up to date with the library.
+
+        The library is re-scanned through the index, so only archives that are new or whose stat data changed are read.
+
+        Args:
+          paths (list): The paths of the only archives known to have changed. If provided the library is not re-scanned and every other config is kept as it is. A loaded archive in paths is reported as changed even if its config is the same.
+
+        Returns:
+          A tuple of three lists of configs (added, removed, changed).
+        """
+        replaced = set()
+        if paths is not None:
+            current = collections.OrderedDict(self.loaded)
+            replaced = set(os.path.abspath(str(path)) for path in paths)
+            for path in replaced:
+                config = self.load(path) if fs_utils.is_file(path) else False
+                if config:
+                    current[path] = config
+                else:
+                    current.pop(path, None)
+            current = collections.OrderedDict(sorted(current.items()))
+            self.paths = list(current.keys())
+        elif not self.directory:
+            return [], [], []
+        else:
+            try:
+                self.paths = self.get_paths(self.directory)
+            except (TypeError, ValueError, NotADirectoryError):
+                self.paths = []
+            current = self.load_paths(self.paths)
+        added = [config for path, config in current.items() if path not in self.loaded]
+        removed = [config for path, config in self.loaded.items() if path not in current]
+        changed = [config for path, config in current.items() if path in self.loaded and (path in replaced or self.loaded[path] != config)]
+        #Removed archives must not keep an open handle on the old file. Changed archives were re-read through open_archive, which closed the old handle.
+        for path in self.loaded:
+            if path not in current:
+                extension_archive.close_archive(path)
+        self.loaded = current
+        self.configs = list(current.values())
+        return added, removed, changed
 
     def has_configs(self):
         """Provides the status of a ConfigManagers config files.
@@ -674,19 +1023,21 @@ class ConfigManager(object):
             self.log.error(self.translate("logs", "No config of the chosed type named {0} found".format(name)))
             return False
 
-    def get_paths(self, directory):
+    def get_paths(self, directory, executor=None):
         """Returns the paths to all extensions with config files within a directory.
         
         Args:
           directory (string): The path to the folder that extension's are within. Extensions can be up to one level below the directory given.
+          executor (concurrent.futures.Executor): If provided, changed archives are read on this executor.
         
         Returns:
           config_files (array): An array of paths to all extension objects with config files that were found.
         
         Raises:
           TypeError: If no extensions exist within the directory requested.
-          AssertionError: If the directory path does not exist.
-        
+          ValueError: If the directory path does not exist.
+          NotADirectoryError: If the path is not a directory. Raised by fs_utils.scan_files while the library is indexed, logged, and raised again.
+
         """
         #Check the directory and raise value error if not there
         dir_obj = QtCore.QDir(str(directory))
@@ -697,20 +1048,12 @@ class ConfigManager(object):
 
         config_files = []
         try:
-            for root, dirs, files in fs_utils.walklevel(path):
-                for file_name in files:
-                    if zipfile.is_zipfile(os.path.join(root, file_name)):
-                        ext_zip = zipfile.ZipFile(os.path.join(root, file_name), 'r')
-                        ext_names = ext_zip.namelist()
-                        for member_name in ext_names:
-                            if member_name.endswith(".conf"):
-                                config_files.append(os.path.join(root, file_name))
-        except AssertionError:
+            for file_path, entry in self.index.refresh(path, executor=executor):
+                if any(member.endswith(".conf") for member in entry["members"]):
+                    config_files.append(file_path)
+        except NotADirectoryError:
             self.log.warn(self.translate("logs", "Extension library at path {0} does not exist. No Config files identified.".format(path)))
             raise
-        except TypeError:
-            self.log.warn(self.translate("logs", "No extensions found at path {0}. No Config files identified.".format(path)))
-            raise
         if config_files:
             return config_files
         else:
@@ -749,25 +1092,16 @@ class ConfigManager(object):
           (bool): On failure returns False
         
         """
-        config = None
-        data = None
         myfile = QtCore.QFile(str(path))
         if not myfile.exists():
             return False
-        if not zipfile.is_zipfile(str(path)):
+        entry = self.index.lookup(path)
+        if not entry or not entry["archive"]:
             return False
-        with zipfile.ZipFile(path, 'r') as zip_ext:
-            for file_name in zip_ext.namelist():
-                if file_name.endswith(".conf"):
-                    config = zip_ext.read(file_name)
-                    self.log.debug(self.translate("logs", "Config found in extension {0}.".format(path)))
-        if config:
-            try:
-                data = json.loads(config.decode('utf-8'))
-                self.log.info(self.translate("logs", "Successfully loaded {0}'s config file.".format(path)))
-            except ValueError:
-                self.log.warning(self.translate("logs", "Failed to load {0} due to a non-json or otherwise invalid file type".format(path)))
-                return False
+        data = None
+        if entry["config"]:
+            data = dict(entry["config"])
+            self.log.info(self.translate("logs", "Successfully loaded {0}'s config file.".format(path)))
         if data:
             self.log.debug(self.translate("logs", "Config file loaded.".format(path)))
             return data
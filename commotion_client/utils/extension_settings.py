@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+extension_settings
+
+An in-memory mirror of the installed extension settings.
+
+Key componenets handled within:
+ * loading installed extension settings from QSettings once
+ * writing changes through to QSettings
+ * constant time lookups by extension name and by commonly queried properties
+
+"""
+#Standard Library Imports
+import logging
+
+#PyQt imports
+from PyQt4 import QtCore
+
+
+def to_bool(value):
+    """Converts a QSettings boolean, which may have come back from disk as a string, into a bool."""
+    if isinstance(value, str):
+        return value.lower() in ["true", "1", "yes"]
+    return bool(value)
+
+def to_int(value):
+    """Converts a QSettings integer, which may have come back from disk as a string, into an int."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+class ExtensionSettings(object):
+    """A typed, in-memory copy of every installed extension's settings.
+
+    The settings object passed in must already be positioned at the extensions group. Every installed extension is read from it once on load. After that all reads are served from memory and all writes go to both the mirror and QSettings.
+
+    An inverted index maps every (key, value) pair of the indexed keys to the names of the extensions that have it. It is updated incrementally whenever an extension is set or removed.
+    """
+
+    #Values that are converted to a python type when read.
+    types = {"menu_level":to_int,
+             "initialized":to_bool}
+
+    def __init__(self, settings, indexed_keys=None):
+        """
+        Args:
+          settings (QSettings): The user settings, positioned at the extensions group.
+          indexed_keys (list): The setting keys to keep in the inverted index. Defaults to parent, type, and initialized.
+        """
+        self.log = logging.getLogger("commotion_client."+__name__)
+        self.translate = QtCore.QCoreApplication.translate
+        self.settings = settings
+        self.indexed_keys = set(indexed_keys or ["parent", "type", "initialized"])
+        self.records = {}
+        self.index = {}
+        self.key_values = {}
+        self.load()
+
+    def load(self):
+        """(Re)loads every installed extension from QSettings into memory."""
+        self.records = {}
+        for name in self.settings.childGroups():
+            self.records[name] = dict((key, self.coerce(key, value)) for key, value in self._read(name).items())
+        self.build_indexes()
+        self.log.debug(self.translate("logs", "Loaded the settings of {0} installed extensions.".format(len(self.records))))
+
+    def _read(self, name):
+        """Returns an extension's settings exactly as QSettings holds them, or None if it has no settings."""
+        if name not in self.settings.childGroups():
+            return None
+        self.settings.beginGroup(name)
+        try:
+            return dict((key, self.settings.value(key)) for key in self.settings.childKeys())
+        finally:
+            self.settings.endGroup()
+
+    def coerce(self, key, value):
+        """Returns a settings value converted to the python type used for its key."""
+        if key in self.types and value is not None:
+            return self.types[key](value)
+        return value
+
+    def build_indexes(self):
+        """Rebuilds the inverted index from the in-memory records."""
+        self.index = {}
+        self.key_values = {}
+        for name, record in self.records.items():
+            self._index(name, record)
+
+    def _index_keys(self, record):
+        """Yields the (key, value) index entries for a record. Values that cannot be hashed are left out of the index."""
+        for key, value in record.items():
+            if key in self.indexed_keys:
+                try:
+                    hash(value)
+                except TypeError:
+                    continue
+                yield (key, value)
+
+    def _index(self, name, record):
+        for pair in self._index_keys(record):
+            self.index.setdefault(pair, set()).add(name)
+            self.key_values.setdefault(pair[0], set()).add(pair[1])
+
+    def _unindex(self, name, record):
+        for pair in self._index_keys(record):
+            names = self.index.get(pair)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self.index[pair]
+                    self.key_values[pair[0]].discard(pair[1])
+                    if not self.key_values[pair[0]]:
+                        del self.key_values[pair[0]]
+
+    def names(self):
+        """Returns a list of the names of all installed extensions."""
+        return list(self.records.keys())
+
+    def values(self, key):
+        """Returns the distinct values the installed extensions have for an indexed key."""
+        return sorted(self.key_values.get(key, []), key=str)
+
+    def __contains__(self, name):
+        return name in self.records
+
+    def get(self, name):
+        """Returns a copy of an installed extension's settings.
+
+        Raises:
+          KeyError: If no extension with that name is installed.
+        """
+        return dict(self.records[name])
+
+    def value(self, name, key, default=None):
+        """Returns a single setting of an installed extension, or the default if it is not set."""
+        try:
+            return self.records[name].get(key, default)
+        except KeyError:
+            return default
+
+    def find(self, key, value):
+        """Returns the sorted names of all installed extensions whose key setting equals value."""
+        value = self.coerce(key, value)
+        if key in self.indexed_keys:
+            try:
+                return sorted(self.index.get((key, value), []))
+            except TypeError:
+                pass
+        return sorted(name for name, record in self.records.items() if record.get(key) == value)
+
+    def set(self, name, values):
+        """Replaces an extension's settings with the values given, writing them through to QSettings.
+
+        Args:
+          name (string): The extension's name.
+          values (dictionary): Every setting the extension should have.
+        """
+        self._write(name, values)
+        self._replace(name, dict((key, self.coerce(key, value)) for key, value in values.items()))
+
+    def set_many(self, records, replace=True):
+        """Replaces the settings of several extensions in a single write and flushes them to disk once.
+
+        If any write fails, or the settings cannot be flushed, every extension in the batch is put back the way it was before the batch and nothing in memory is changed. The values put back are the ones QSettings held, not their typed copies in memory, so a rollback never changes how a value is stored.
+
+        Args:
+          records (dictionary): The settings each extension should have keyed by extension name.
+          replace (bool): If False the values given are merged into each extension's existing settings and every other setting is kept.
+
+        Raises:
+          IOError: If the settings could not be written. The batch has been rolled back.
+        """
+        previous = dict((name, self._read(name)) for name in records)
+        try:
+            for name, values in records.items():
+                self._write(name, values, replace)
+            self.settings.sync()
+            if self.settings.status() != QtCore.QSettings.NoError:
+                raise IOError(self.translate("logs", "The extension settings could not be written to disk."))
+        except Exception as _excp:
+            self.log.error(self.translate("logs", "Writing the settings of {0} extensions failed. Rolling them back.".format(len(records))))
+            self.log.debug(_excp)
+            for name, record in previous.items():
+                if record is None:
+                    self.settings.remove(name)
+                else:
+                    self._write(name, record)
+            self.settings.sync()
+            if isinstance(_excp, IOError):
+                raise
+            raise IOError(self.translate("logs", "The extension settings could not be written: {0}".format(_excp)))
+        for name, values in records.items():
+            record = {} if replace else dict(self.records.get(name, {}))
+            record.update((key, self.coerce(key, value)) for key, value in values.items())
+            self._replace(name, record)
+
+    def _write(self, name, values, replace=True):
+        """Writes an extension's group in QSettings without touching the in-memory mirror. The group is cleared first unless replace is False."""
+        if replace:
+            self.settings.remove(name)
+        self.settings.beginGroup(name)
+        try:
+            for key, value in values.items():
+                self.settings.setValue(key, value)
+        finally:
+            self.settings.endGroup()
+
+    def set_value(self, name, key, value):
+        """Sets a single setting of an installed extension, writing it through to QSettings.
+
+        Raises:
+          KeyError: If no extension with that name is installed.
+        """
+        record = dict(self.records[name])
+        self.settings.setValue(name+"/"+key, value)
+        record[key] = self.coerce(key, value)
+        self._replace(name, record)
+
+    def remove(self, name):
+        """Removes an extension's settings from memory and from QSettings."""
+        self.settings.remove(name)
+        self._replace(name, None)
+
+    def _replace(self, name, record):
+        old = self.records.pop(name, None)
+        if old is not None:
+            self._unindex(name, old)
+        if record is not None:
+            self.records[name] = record
+            self._index(name, record)
+
+    def sync(self):
+        """Flushes any pending writes to disk."""
+        self.settings.sync()
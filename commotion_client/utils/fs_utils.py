@@ -12,9 +12,11 @@ from PyQt4 import QtCore
 
 #Standard Library Imports
 import os
+import stat
 import logging
 import uuid
 import json
+import shutil
 
 translate = QtCore.QCoreApplication.translate
 log = logging.getLogger("commotion_client."+__name__)
@@ -52,6 +54,75 @@ def walklevel(some_dir, level=1):
         if num_sep + level <= num_sep_this:
             del dirs[:]
 
+def scan_files(some_dir, level=1):
+    """Yields every regular file in a directory along with its stat result.
+
+    Walks the same files as walklevel in a single pass. Directory entries from os.scandir tell files and directories apart without a stat call, and each file's stat result comes from its entry. Falls back to listdir/stat on pythons without os.scandir.
+
+    Args:
+      some_dir (string): The path to the directory to scan.
+      level (int): How many directories below some_dir to descend into.
+
+    Yields:
+      A tuple of the files absolute path (string) and its os.stat_result.
+
+    Raises:
+      NotADirectoryError: If some_dir is not a directory.
+    """
+    some_dir = os.path.abspath(some_dir)
+    if not os.path.isdir(some_dir):
+        raise NotADirectoryError(translate("logs", "{0} is not a directory. Can only 'scan' through directories.".format(some_dir)))
+    directories = [(some_dir, 0)]
+    while directories:
+        current, depth = directories.pop(0)
+        try:
+            entries = list_entries(current)
+        except OSError as _excp:
+            log.debug(translate("logs", "Could not scan directory {0}: {1}".format(current, _excp)))
+            continue
+        for path, file_stat in entries:
+            if file_stat is None:
+                if depth < level:
+                    directories.append((path, depth + 1))
+            else:
+                yield path, file_stat
+
+def list_entries(directory):
+    """Lists the directories and regular files within a directory.
+
+    Args:
+      directory (string): The path to the directory to list.
+
+    Returns:
+      A list of (path, os.stat_result) tuples sorted by name. The stat result is None for directories. Anything that is neither is left out.
+
+    Raises:
+      OSError: If the directory could not be listed.
+    """
+    entries = []
+    if hasattr(os, "scandir"):
+        for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+            try:
+                if entry.is_dir():
+                    entries.append((entry.path, None))
+                elif entry.is_file():
+                    entries.append((entry.path, entry.stat()))
+            except OSError:
+                log.debug(translate("logs", "Could not stat {0}. Skipping it.".format(entry.path)))
+        return entries
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            log.debug(translate("logs", "Could not stat {0}. Skipping it.".format(path)))
+            continue
+        if stat.S_ISDIR(file_stat.st_mode):
+            entries.append((path, None))
+        elif stat.S_ISREG(file_stat.st_mode):
+            entries.append((path, file_stat))
+    return entries
+
 def make_temp_dir(new=None):
     """Makes a temporary directory and returns the QDir object.
 
@@ -109,6 +180,27 @@ def copy_contents(start, end):
             raise IOError(_error)
     return True
 
+def atomic_copy(source, destination):
+    """Copies a file so that the destination is only ever the complete old file or the complete new one.
+
+    The source is copied to a temporary file beside the destination which then replaces the destination in a single rename. The copy keeps the source's modification time.
+
+    Args:
+      source (string): The path to the file to copy.
+      destination (string): The path to copy the file to.
+
+    Raises:
+      OSError: If the file could not be copied.
+    """
+    temp_path = "{0}.{1}.tmp".format(destination, uuid.uuid4().hex)
+    try:
+        shutil.copy2(source, temp_path)
+        os.replace(temp_path, destination)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
 def json_load(path):
     """This function loads a JSON file and returns a formatted dictionary.
     
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+library_index
+
+A persistent index of the extension archives within the extension libraries.
+
+Key componenets handled within:
+ * caching each archive's parsed config and member list on disk
+ * revalidating the cache with a single stat pass over a library
+ * only re-opening archives whose size or modification time has changed
+
+"""
+#Standard Library Imports
+import logging
+import os
+import json
+import hashlib
+import threading
+
+#PyQt imports
+from PyQt4 import QtCore
+
+#Commotion Client Imports
+from commotion_client.utils import fs_utils
+from commotion_client.utils import settings
+from commotion_client.utils import extension_archive
+
+
+def default_index_path():
+    """Returns the path of the index file that sits alongside the current user's settings file."""
+    settings_file = settings.UserSettingsManager().get().fileName()
+    return os.path.join(os.path.dirname(settings_file), "extension_index.json")
+
+def file_hash(path, block_size=65536):
+    """Returns the sha256 hex digest of a file, reading it block_size bytes at a time."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as _file:
+        for block in iter(lambda: _file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class LibraryIndex(object):
+    """An index of extension archives keyed by their absolute path.
+
+    Each entry holds the size and modification time of the archive when it was read, its member list, and its parsed config. An entry is only rebuilt when the stat data of its archive no longer matches.
+
+    Entries look like:
+
+        {"size": 136809, "mtime": 1403712000000000000, "hash": None,
+         "archive": True, "members": ["main.py", "test.conf", ...],
+         "config": {"name": "unit_test_mock", ...}}
+    """
+
+    version = 1
+
+    def __init__(self, path=None, use_hash=False):
+        """
+        Args:
+          path (string): The file the index is persisted to. If not provided the index only lives in memory.
+          use_hash (bool): If True archives whose stat data has changed are hashed and only re-opened if their content hash also changed.
+        """
+        self.log = logging.getLogger("commotion_client."+__name__)
+        self.translate = QtCore.QCoreApplication.translate
+        self.path = path
+        self.use_hash = use_hash
+        self.entries = {}
+        self._dirty = False
+        self._lock = threading.RLock()
+        if self.path:
+            self.load()
+
+    def load(self):
+        """Loads the index from its file. A missing or unreadable index leaves the index empty."""
+        self.entries = {}
+        try:
+            with open(self.path, mode='r', encoding="utf-8") as index_file:
+                data = json.load(index_file)
+        except (OSError, ValueError) as _excp:
+            self.log.debug(self.translate("logs", "No usable extension index found at {0}. Starting with an empty index.".format(self.path)))
+            return
+        if data.get("version") != self.version:
+            self.log.info(self.translate("logs", "The extension index at {0} is from a different version and will be rebuilt.".format(self.path)))
+            self._dirty = True
+            return
+        self.entries = data.get("archives", {})
+        self.log.debug(self.translate("logs", "Loaded {0} archives from the extension index.".format(len(self.entries))))
+
+    def save(self):
+        """Writes the index to its file if it has changed since it was loaded.
+
+        Returns:
+          bool: True if the index was written, False if nothing needed to be written.
+        """
+        if not self.path or not self._dirty:
+            return False
+        index_dir = os.path.dirname(self.path)
+        temp_path = self.path + ".tmp"
+        with self._lock:
+            entries = dict(self.entries)
+        try:
+            if index_dir and not os.path.isdir(index_dir):
+                os.makedirs(index_dir)
+            with open(temp_path, mode='w', encoding="utf-8") as index_file:
+                json.dump({"version":self.version, "archives":entries}, index_file)
+            os.replace(temp_path, self.path)
+        except OSError as _excp:
+            self.log.warning(self.translate("logs", "Could not save the extension index to {0}.".format(self.path)))
+            self.log.debug(_excp)
+            return False
+        self._dirty = False
+        return True
+
+    def refresh(self, directory, level=1, executor=None):
+        """Revalidates every archive in a library and returns their entries.
+
+        Stats every file in the library (and up to level directories below it) once, re-reading only the archives that are new or whose stat data has changed. Entries for archives that no longer exist are dropped.
+
+        Args:
+          directory (string): The path to an extension library.
+          level (int): How many directories below the library to look for archives.
+          executor (concurrent.futures.Executor): If provided, changed archives are read on this executor instead of one after another.
+
+        Returns:
+          A list of (path, entry) tuples sorted by path for every file found.
+        """
+        directory = os.path.abspath(directory)
+        files = list(fs_utils.scan_files(directory, level))
+        if executor:
+            entries = list(executor.map(lambda found: self._validate(*found), files))
+        else:
+            entries = [self._validate(path, stat) for path, stat in files]
+        found = list(zip([path for path, _ in files], entries))
+        seen = set(path for path, _ in files)
+        prefix = os.path.join(directory, "")
+        with self._lock:
+            for path in [p for p in self.entries if p.startswith(prefix) and p not in seen]:
+                self.log.debug(self.translate("logs", "Archive {0} no longer exists. Removing it from the extension index.".format(path)))
+                del self.entries[path]
+                self._dirty = True
+        return found
+
+    def lookup(self, path):
+        """Returns the entry for a single archive, revalidating it against its current stat data.
+
+        Args:
+          path (string): The path to an extension archive.
+
+        Returns:
+          The entry (dictionary) for the archive or None if the file does not exist.
+        """
+        path = os.path.abspath(str(path))
+        try:
+            stat = os.stat(path)
+        except OSError:
+            with self._lock:
+                if self.entries.pop(path, None) is not None:
+                    self._dirty = True
+            return None
+        return self._validate(path, stat)
+
+    def annotate(self, path, **values):
+        """Stores extra values in the entry of an archive. They are dropped along with the entry when the archive changes.
+
+        Args:
+          path (string): The path to an extension archive.
+          values: The values to store in the archive's entry.
+
+        Returns:
+          bool: True if the archive had an entry to store the values in, False if it did not.
+        """
+        path = os.path.abspath(str(path))
+        with self._lock:
+            entry = self.entries.get(path)
+            if entry is None:
+                return False
+            entry.update(values)
+            self._dirty = True
+        return True
+
+    def digest(self, path):
+        """Returns the content hash of an archive, only hashing it again when its stat data has changed.
+
+        Args:
+          path (string): The path to an extension archive.
+
+        Returns:
+          The sha256 hex digest (string) of the archive or None if the file does not exist.
+        """
+        path = os.path.abspath(str(path))
+        entry = self.lookup(path)
+        if entry is None:
+            return None
+        if entry.get("hash") is None:
+            digest = file_hash(path)
+            with self._lock:
+                entry["hash"] = digest
+                self._dirty = True
+        return entry["hash"]
+
+    def _validate(self, path, stat):
+        """Returns a current entry for an archive, only re-reading it if its stat data changed.
+
+        Safe to call from several threads at once. Archives are hashed and read outside of the index lock.
+        """
+        size, mtime = stat.st_size, stat.st_mtime_ns
+        with self._lock:
+            entry = self.entries.get(path)
+        if entry and entry["size"] == size and entry["mtime"] == mtime:
+            return entry
+        digest = None
+        if self.use_hash:
+            digest = file_hash(path)
+            if entry and entry.get("hash") == digest:
+                self.log.debug(self.translate("logs", "Archive {0} was touched but its contents are unchanged.".format(path)))
+                entry = dict(entry, size=size, mtime=mtime)
+                with self._lock:
+                    self.entries[path] = entry
+                    self._dirty = True
+                return entry
+        self.log.debug(self.translate("logs", "Reading archive {0} into the extension index.".format(path)))
+        entry = self._read(path)
+        entry.update({"size":size, "mtime":mtime, "hash":digest})
+        with self._lock:
+            self.entries[path] = entry
+            self._dirty = True
+        return entry
+
+    def _read(self, path):
+        """Pulls the member list and config of an archive from its shared ExtensionArchive."""
+        entry = {"archive":False, "members":[], "config":None}
+        try:
+            archive = extension_archive.open_archive(path)
+        except (ValueError, OSError):
+            return entry
+        entry["archive"] = True
+        entry["members"] = archive.names
+        entry["config"] = archive.config
+        return entry
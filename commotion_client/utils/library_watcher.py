@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+library_watcher
+
+Watches the extension libraries for archives being added, removed, or changed.
+
+Key componenets handled within:
+ * watching the core, global, and user libraries and the archives within them
+ * collecting bursts of file system events into a single update per library
+ * applying each change incrementally through the ExtensionManager
+
+"""
+#Standard Library Imports
+import logging
+import os
+
+#PyQt imports
+from PyQt4 import QtCore
+
+#Commotion Client Imports
+from commotion_client.utils import fs_utils
+from commotion_client.utils import extension_manager
+
+
+class LibraryWatcher(QtCore.QObject):
+    """Keeps the loaded configs and installed extension settings in step with the extension libraries on disk.
+
+    File system events are collected for a short delay before they are applied so that an archive that is still being copied into a library is only read once it is complete.
+    """
+
+    #Emitted with the names of the extensions that were added, removed, or changed.
+    extensions_changed = QtCore.pyqtSignal(list)
+
+    def __init__(self, manager=None, parent=None, delay=250):
+        """
+        Args:
+          manager (ExtensionManager): The extension manager to apply changes through. One is created if not provided.
+          parent (QObject): The parent of the watcher.
+          delay (int): The number of milliseconds to wait for file system events to settle before applying them.
+        """
+        super().__init__(parent)
+        self.log = logging.getLogger("commotion_client."+__name__)
+        self.translate = QtCore.QCoreApplication.translate
+        self.ext_mgr = manager or extension_manager.ExtensionManager()
+        self.pending = set()
+        self.watcher = QtCore.QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.queue_change)
+        self.watcher.fileChanged.connect(self.queue_change)
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.apply_changes)
+        self.watch()
+
+    def watch(self):
+        """(Re)starts watching every existing extension library and the archives within it."""
+        watched = self.watcher.directories() + self.watcher.files()
+        if watched:
+            self.watcher.removePaths(watched)
+        for ext_type, library in self.ext_mgr.libraries.items():
+            if not os.path.isdir(library):
+                self.log.debug(self.translate("logs", "The {0} extension library does not exist and will not be watched.".format(ext_type)))
+                continue
+            self.watcher.addPath(library)
+            #Archives that are overwritten in place do not change their library's directory entry.
+            archives = [path for path, _ in fs_utils.scan_files(library)]
+            if archives:
+                self.watcher.addPaths(archives)
+
+    def queue_change(self, path):
+        """Records a changed path and (re)starts the delay before changes are applied."""
+        self.log.debug(self.translate("logs", "Extension library change detected at {0}.".format(path)))
+        self.pending.add(os.path.abspath(path))
+        self.timer.start()
+
+    def library_of(self, path):
+        """Returns the extension type of the library a path is in, or None if it is not in a library."""
+        for ext_type, library in self.ext_mgr.libraries.items():
+            library = os.path.abspath(library)
+            if path == library or path.startswith(os.path.join(library, "")):
+                return ext_type
+        return None
+
+    def rescan(self):
+        """Checks every extension library for changes now instead of waiting for a file system event.
+
+        Returns:
+          A sorted list of the names of the extensions that were added, removed, or changed.
+        """
+        self.pending.update(os.path.abspath(library) for library in self.ext_mgr.libraries.values())
+        self.timer.stop()
+        return self.apply_changes()
+
+    def apply_changes(self):
+        """Applies every pending change, updating each changed library once.
+
+        Returns:
+          A sorted list of the names of the extensions that were added, removed, or changed.
+        """
+        changed_types = set(self.library_of(path) for path in self.pending)
+        changed_types.discard(None)
+        self.pending.clear()
+        names = []
+        #Libraries are updated in the same order they are loaded in.
+        for ext_type in [type_ for type_ in ['user', 'global', 'core'] if type_ in changed_types]:
+            try:
+                names.extend(self.ext_mgr.update_library(ext_type))
+            except (ValueError, KeyError) as _excp:
+                self.log.warning(self.translate("logs", "The changes to the {0} extension library could not be applied.".format(ext_type)))
+                self.log.debug(_excp)
+        #New archives need to be watched and replaced archives need to be watched again.
+        self.watch()
+        names = sorted(set(names))
+        if names:
+            self.extensions_changed.emit(names)
+        return names
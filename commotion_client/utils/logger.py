@@ -163,5 +163,10 @@ class LogHandler(object):
             self.logger.addHandler(self.file_handler)
         return True
 
+    def get_verbosity(self):
+        """Returns the name of the level the application is logging at. e.g. "ERROR"."""
+        handler = self.stream or self.file_handler
+        return logging.getLevelName(handler.level) if handler else None
+
     def get_logger(self):
         return self.logger
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+messaging
+
+The protocol Commotion client instances talk to each other with over a local socket.
+
+Key componenets handled within:
+ * length prefixed framing of messages
+ * request and acknowledgement encoding
+ * a persistent client connection to the running Commotion client
+ * calling the running client's JSON control API
+
+Every frame is a four byte big-endian payload length followed by the payload. Payloads are UTF-8 JSON objects. Each request {"id": 1, "message": "showMain"} is answered with an acknowledgement {"id": 1, "ack": true} or {"id": 1, "ack": false, "error": "..."}. Any number of requests can be sent over one connection. Control API requests {"id": 2, "command": "status", "args": {}} are answered with {"id": 2, "ok": true, "result": ...} or {"id": 2, "ok": false, "error": "..."}.
+
+Only QtCore and QtNetwork are used so that a second instance can forward its message before any GUI module is imported.
+"""
+
+import logging
+import json
+import struct
+import itertools
+
+from PyQt4 import QtCore
+from PyQt4 import QtNetwork
+
+#The header of every frame: the length of the payload that follows it.
+HEADER = struct.Struct(">I")
+#The largest payload (bytes) a running client will accept in one frame.
+MAX_FRAME_SIZE = 1024 * 1024
+
+
+def encode_frame(payload):
+    """Returns a payload (bytes) with its length prefixed."""
+    return HEADER.pack(len(payload)) + payload
+
+def encode(obj):
+    """Returns a JSON object as a frame."""
+    return encode_frame(json.dumps(obj).encode("utf-8"))
+
+def decode(payload):
+    """Returns the JSON object in a frame's payload.
+
+    Raises:
+      ValueError: If the payload is not a UTF-8 JSON object.
+    """
+    obj = json.loads(payload.decode("utf-8"))
+    if not isinstance(obj, dict):
+        raise ValueError("A message must be a JSON object.")
+    return obj
+
+
+class FrameBuffer(object):
+    """Collects the bytes read from a socket and splits them into complete frames."""
+
+    def __init__(self, max_size=None):
+        """
+        Args:
+          max_size (int): The largest payload (bytes) a frame may announce. Any size is accepted if not provided.
+        """
+        self.data = bytearray()
+        self.max_size = max_size
+
+    def feed(self, data):
+        """Adds bytes read from a socket to the end of the buffer."""
+        self.data.extend(data)
+
+    def frames(self):
+        """Yields the payload (bytes) of every complete frame in the buffer, removing it. Partial frames are kept until the rest arrives.
+
+        Raises:
+          ValueError: If a frame announces a payload larger than max_size. The frame is not read, so it is raised before its payload is buffered.
+        """
+        while len(self.data) >= HEADER.size:
+            (length,) = HEADER.unpack_from(self.data)
+            if self.max_size is not None and length > self.max_size:
+                raise ValueError("A frame of {0} bytes is larger than the limit of {1} bytes.".format(length, self.max_size))
+            end = HEADER.size + length
+            if len(self.data) < end:
+                return
+            payload = bytes(self.data[HEADER.size:end])
+            del self.data[:end]
+            yield payload
+
+    def pending(self):
+        """Returns the number of bytes waiting for the rest of their frame."""
+        return len(self.data)
+
+
+class MessageClient(object):
+    """A persistent connection to a running Commotion client.
+
+    Requests are written as frames and block until their acknowledgement arrives. Several requests can be written before their acknowledgements are read with send_many().
+
+        with MessageClient("commotionRocks") as client:
+            client.send("showMain")
+    """
+
+    def __init__(self, key, timeout=1000):
+        """
+        Args:
+          key (string): The unique application key of the running client.
+          timeout (int): The milliseconds to wait to connect and for each acknowledgement.
+        """
+        self.log = logging.getLogger("commotion_client."+__name__)
+        self.translate = QtCore.QCoreApplication.translate
+        self.key = key
+        self.timeout = timeout
+        self.socket = None
+        self.buffer = FrameBuffer()
+        self._ids = itertools.count(1)
+
+    def connect(self):
+        """Connects to the running client.
+
+        Returns:
+          bool: True if connected. False if no client is listening on the key.
+        """
+        if self.socket is not None and self.socket.state() == QtNetwork.QLocalSocket.ConnectedState:
+            return True
+        self.socket = QtNetwork.QLocalSocket()
+        self.socket.connectToServer(self.key)
+        if not self.socket.waitForConnected(self.timeout):
+            self.log.debug(self.translate("logs", "No Commotion client is listening for messages. {0}".format(self.socket.errorString())))
+            self.socket = None
+            return False
+        return True
+
+    def request(self, obj):
+        """Sends a request and returns its acknowledgement.
+
+        Args:
+          obj (dict): The request. An "id" is added if it does not have one.
+
+        Returns:
+          The acknowledgement (dictionary).
+
+        Raises:
+          IOError: If the client is not connected or the acknowledgement did not arrive in time.
+        """
+        return self.request_many([obj])[0]
+
+    def request_many(self, objs):
+        """Writes several requests before waiting for any of their acknowledgements.
+
+        Returns:
+          A list of the acknowledgements (dictionaries) in the order the requests were given.
+
+        Raises:
+          IOError: If the client is not connected or an acknowledgement did not arrive in time.
+        """
+        if not self.connect():
+            raise IOError(self.translate("logs", "Could not connect to the running Commotion client."))
+        waiting = []
+        for obj in objs:
+            obj = dict(obj)
+            obj.setdefault("id", next(self._ids))
+            waiting.append(obj["id"])
+            self.socket.write(encode(obj))
+        responses = {}
+        while len(responses) < len(waiting):
+            for payload in self.buffer.frames():
+                response = decode(payload)
+                responses[response.get("id")] = response
+            if len(responses) >= len(waiting):
+                break
+            if self.socket.bytesAvailable() == 0 and not self.socket.waitForReadyRead(self.timeout):
+                error = self.socket.errorString()
+                self.close()
+                raise IOError(self.translate("logs", "The running Commotion client did not acknowledge a message. {0}".format(error)))
+            self.buffer.feed(bytes(self.socket.readAll().data()))
+        return [responses.get(request_id, {"id":request_id, "ack":False, "error":"No acknowledgement."}) for request_id in waiting]
+
+    def send(self, message):
+        """Sends a message and waits for it to be acknowledged.
+
+        Returns:
+          bool: True if the running client acknowledged the message.
+        """
+        return self.send_many([message])[0]
+
+    def send_many(self, messages):
+        """Sends several messages over the connection, then waits for all of them to be acknowledged.
+
+        Returns:
+          A list of bools, True for each message the running client acknowledged.
+        """
+        try:
+            responses = self.request_many([{"message":str(message)} for message in messages])
+        except IOError as _excp:
+            self.log.error(_excp)
+            return [False for message in messages]
+        return [bool(response.get("ack")) for response in responses]
+
+    def call(self, command, args=None):
+        """Calls a command of the running client's control API.
+
+            with MessageClient("commotionRocks") as client:
+                installed = client.call("extensions")
+
+        Args:
+          command (string): The name of the command.
+          args (dict): The arguments of the command.
+
+        Returns:
+          The result of the command.
+
+        Raises:
+          IOError: If the client is not connected or did not answer in time.
+          ValueError: If the running client could not complete the command.
+        """
+        return self.call_many([(command, args)])[0]
+
+    def call_many(self, calls):
+        """Writes several control API requests before waiting for any of their responses.
+
+        Args:
+          calls (list): (command, args) tuples.
+
+        Returns:
+          A list of the results in the order the calls were given.
+
+        Raises:
+          IOError: If the client is not connected or did not answer in time.
+          ValueError: If the running client could not complete one of the commands.
+        """
+        responses = self.request_many([{"command":command, "args":args or {}} for command, args in calls])
+        for response in responses:
+            if not response.get("ok"):
+                raise ValueError(response.get("error") or "The control command failed.")
+        return [response.get("result") for response in responses]
+
+    def close(self):
+        """Disconnects from the running client."""
+        if self.socket is not None:
+            self.socket.disconnectFromServer()
+            self.socket = None
+        self.buffer = FrameBuffer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def send_message(key, message, timeout=1000):
+    """Sends a message to the Commotion client listening on a key.
+
+    Args:
+      key (string): The unique application key of the running client.
+      message (string): The message to send.
+      timeout (int): The milliseconds to wait to connect and for the message to be acknowledged.
+
+    Returns:
+      bool: True if a running client acknowledged the message. False if no client is listening or the message was not acknowledged.
+    """
+    with MessageClient(key, timeout) as client:
+        if not client.connect():
+            return False
+        return client.send(message)
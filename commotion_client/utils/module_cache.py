@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+module_cache
+
+A least recently used cache of the modules loaded from extension archives.
+
+Key componenets handled within:
+ * loading each extension module from its archive once
+ * keeping a single sys.path entry per loaded extension
+ * unloading the least recently used extensions and their modules
+
+"""
+#Standard Library Imports
+import logging
+import os
+import sys
+import collections
+import threading
+
+#PyQt imports
+from PyQt4 import QtCore
+
+#Commotion Client Imports
+from commotion_client.utils import extension_archive
+
+
+class ModuleCache(object):
+    """The modules loaded from recently used extensions.
+
+    Each extension gets one sys.path entry while it is loaded so that its modules can import the other modules in its archive. When more than size extensions are loaded the least recently used extension is unloaded. Its sys.path entry is removed and every module imported from its archive is dropped from sys.modules.
+
+    An extension is also unloaded and re-read when its archive changes on disk.
+    """
+
+    def __init__(self, size=8):
+        """
+        Args:
+          size (int): The most extensions to keep loaded at one time.
+        """
+        self.log = logging.getLogger("commotion_client."+__name__)
+        self.translate = QtCore.QCoreApplication.translate
+        self.size = max(1, int(size))
+        #{archive path : {"archive":ExtensionArchive, "modules":{module name : module}}}
+        self.extensions = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def load(self, path, name):
+        """Returns a module from an extension archive, only executing the module the first time it is asked for.
+
+        Args:
+          path (string): The path to an extension archive.
+          name (string): The name of a module within the archive.
+
+        Raises:
+          FileNotFoundError: If the archive does not exist.
+          ValueError: If the file is not a zip archive.
+          ImportError: If the module could not be loaded from the archive.
+        """
+        archive = extension_archive.open_archive(path)
+        with self._lock:
+            record = self.extensions.get(archive.path)
+            if record is not None and record["archive"] is not archive:
+                self.log.debug(self.translate("logs", "Extension {0} changed on disk. Reloading its modules.".format(archive.path)))
+                self.unload(archive.path)
+                record = None
+            if record is None:
+                if archive.bytecode and not archive.bytecode_current():
+                    self.log.debug(self.translate("logs", "The byte-code in extension {0} is for another interpreter. Its modules will be compiled from source.".format(archive.path)))
+                record = {"archive":archive, "modules":{}}
+                self.extensions[archive.path] = record
+                #add extension to sys path so imported modules can access other modules in the extension.
+                if archive.path not in sys.path:
+                    sys.path.append(archive.path)
+            self.extensions.move_to_end(archive.path)
+            module = record["modules"].get(name)
+            if module is None:
+                self.log.debug(self.translate("logs", "Loading module {0} from extension {1}.".format(name, archive.path)))
+                #Extensions share module names (main, ui, ...). Loading into another extension's module would overwrite it.
+                loaded = sys.modules.get(name)
+                if loaded is not None and not str(getattr(loaded, "__file__", None) or "").startswith(os.path.join(archive.path, "")):
+                    del sys.modules[name]
+                module = archive.importer.load_module(name)
+                record["modules"][name] = module
+            self.evict()
+            return module
+
+    def evict(self):
+        """Unloads the least recently used extensions until no more than size are loaded."""
+        with self._lock:
+            while len(self.extensions) > self.size:
+                path = next(iter(self.extensions))
+                self.log.debug(self.translate("logs", "Unloading least recently used extension {0}.".format(path)))
+                self.unload(path)
+
+    def unload(self, path):
+        """Unloads an extension's modules and removes it from sys.path.
+
+        Args:
+          path (string): The path to an extension archive.
+
+        Returns:
+          bool: True if the extension was loaded, False if it was not.
+        """
+        path = os.path.abspath(str(path))
+        with self._lock:
+            record = self.extensions.pop(path, None)
+            if record is None:
+                return False
+            prefix = os.path.join(path, "")
+            for name, module in list(sys.modules.items()):
+                if str(getattr(module, "__file__", None) or "").startswith(prefix):
+                    del sys.modules[name]
+            while path in sys.path:
+                sys.path.remove(path)
+            #Packages within the archive have their own importer cache entries.
+            for entry in list(sys.path_importer_cache.keys()):
+                if entry == path or str(entry).startswith(prefix):
+                    del sys.path_importer_cache[entry]
+            extension_archive.forget_importer(path)
+        return True
+
+    def clear(self):
+        """Unloads every extension."""
+        with self._lock:
+            for path in list(self.extensions.keys()):
+                self.unload(path)
+
+    def __contains__(self, path):
+        return os.path.abspath(str(path)) in self.extensions
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+profiler
+
+Records how long each phase of starting the Commotion client takes.
+
+Key componenets handled within:
+ * timing nested startup phases with a monotonic clock
+ * a single application wide profiler that does nothing until it is enabled
+ * a structured JSON report of every phase
+
+"""
+#Standard Library Imports
+import logging
+import time
+import json
+import contextlib
+import threading
+
+#PyQt imports
+from PyQt4 import QtCore
+
+#The version of the report layout. Bump it when the layout changes so old reports can be told apart.
+REPORT_VERSION = 1
+
+_lock = threading.Lock()
+_profiler = None
+
+
+class StartupProfiler(object):
+    """Records the start and end of nested phases against a monotonic clock.
+
+    Phases started while another phase is running on the same thread are recorded as its children. Times in the report are in milliseconds from when the profiler was created.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        """
+        Args:
+          clock (function): Returns the current time in seconds. It must never go backwards.
+        """
+        self.clock = clock
+        self.started = clock()
+        self.finished = None
+        self.phases = []
+        self._stack = threading.local()
+        self._lock = threading.Lock()
+
+    def _open_phases(self):
+        if not hasattr(self._stack, "phases"):
+            self._stack.phases = []
+        return self._stack.phases
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Times the code run within the context as a phase named name."""
+        record = {"name":name, "start":self.clock(), "end":None, "phases":[]}
+        open_phases = self._open_phases()
+        with self._lock:
+            (open_phases[-1]["phases"] if open_phases else self.phases).append(record)
+        open_phases.append(record)
+        try:
+            yield record
+        finally:
+            record["end"] = self.clock()
+            open_phases.pop()
+
+    def finish(self):
+        """Marks the end of startup. Later calls do nothing."""
+        if self.finished is None:
+            self.finished = self.clock()
+
+    def _report_phase(self, record):
+        end = record["end"] if record["end"] is not None else self.clock()
+        return {"name":record["name"],
+                "start_ms":round((record["start"] - self.started) * 1000, 3),
+                "duration_ms":round((end - record["start"]) * 1000, 3),
+                "complete":record["end"] is not None,
+                "phases":[self._report_phase(child) for child in record["phases"]]}
+
+    def report(self):
+        """Returns the timing report as a dictionary that can be serialized to JSON.
+
+            {"version": 1, "total_ms": 812.4, "finished": True,
+             "phases": [{"name": "init_client", "start_ms": 3.2, "duration_ms": 790.1, "complete": True,
+                         "phases": [...]}, ...]}
+        """
+        end = self.finished if self.finished is not None else self.clock()
+        with self._lock:
+            phases = [self._report_phase(record) for record in self.phases]
+        return {"version":REPORT_VERSION,
+                "total_ms":round((end - self.started) * 1000, 3),
+                "finished":self.finished is not None,
+                "phases":phases}
+
+
+def enable(clock=time.monotonic):
+    """Starts profiling the application. The profiler's clock starts now.
+
+    Returns:
+      The application's StartupProfiler.
+    """
+    global _profiler
+    with _lock:
+        _profiler = StartupProfiler(clock)
+        return _profiler
+
+def disable():
+    """Stops profiling the application and drops what was recorded."""
+    global _profiler
+    with _lock:
+        _profiler = None
+
+def enabled():
+    """Returns True if the application is being profiled."""
+    return _profiler is not None
+
+def phase(name):
+    """Times the code run within the context as a phase of startup. Does nothing unless profiling is enabled.
+
+        with profiler.phase("init_extension_libraries"):
+            extensions.init_extension_libraries()
+    """
+    profiler = _profiler
+    if profiler is None:
+        return _no_phase()
+    return profiler.phase(name)
+
+@contextlib.contextmanager
+def _no_phase():
+    yield None
+
+def report():
+    """Returns the application's timing report or None if profiling is not enabled. See StartupProfiler.report()."""
+    profiler = _profiler
+    return profiler.report() if profiler is not None else None
+
+def finish(path=None):
+    """Ends startup profiling and logs the JSON timing report. Does nothing unless profiling is enabled.
+
+    Args:
+      path (string): If provided the report is also written to this file.
+
+    Returns:
+      The report (dictionary) or None if profiling is not enabled.
+    """
+    profiler = _profiler
+    if profiler is None:
+        return None
+    log = logging.getLogger("commotion_client."+__name__)
+    translate = QtCore.QCoreApplication.translate
+    profiler.finish()
+    timing = profiler.report()
+    log.info(translate("logs", "Startup timing report: {0}".format(json.dumps(timing, sort_keys=True))))
+    if path:
+        try:
+            with open(path, mode='w', encoding="utf-8") as report_file:
+                json.dump(timing, report_file, sort_keys=True, indent=2)
+        except OSError as _excp:
+            log.warning(translate("logs", "Could not write the startup timing report to {0}.".format(path)))
+            log.debug(_excp)
+    return timing
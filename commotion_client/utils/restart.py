@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+restart
+
+Restarts the components of the Commotion client without blocking the event loop.
+
+Key componenets handled within:
+ * stopping components and waiting for each of them to report it has stopped
+ * starting components again once every old one is gone
+ * timing each phase of a restart
+
+"""
+#Standard Library Imports
+import logging
+import time
+
+#PyQt imports
+from PyQt4 import QtCore
+
+
+class RestartSequence(QtCore.QObject):
+    """Stops a set of components, waits for them to be destroyed, and then starts them again.
+
+    The restart moves through the phases stop, wait, and start. It never sleeps or polls. The wait phase ends as soon as the last stopped component emits destroyed, or once the timeout passes if one never does. Each phase runs from the event loop, so messages and other events are handled while the restart is in progress.
+
+        sequence = RestartSequence(app.stop_components, app.start_client)
+        sequence.finished.connect(app.restart_finished)
+        sequence.start()
+    """
+
+    #Emitted with the name of each phase as it begins.
+    phase_started = QtCore.pyqtSignal(str)
+    #Emitted with True once the components have been started again, or False if a phase failed.
+    finished = QtCore.pyqtSignal(bool)
+
+    def __init__(self, stop, start, timeout=5000, clock=time.monotonic, parent=None):
+        """
+        Args:
+          stop (function): Stops the components. Returns the QObjects that will be destroyed once they have stopped.
+          start (function): Starts the components again.
+          timeout (int): The most milliseconds to wait for stopped components to be destroyed.
+          clock (function): Returns the current time in seconds. It must never go backwards.
+        """
+        super().__init__(parent)
+        self.log = logging.getLogger("commotion_client."+__name__)
+        self.translate = QtCore.QCoreApplication.translate
+        self.stop = stop
+        self.start_components = start
+        self.clock = clock
+        self.phase = None
+        self.result = None
+        #The duration of each completed phase in milliseconds keyed by phase name.
+        self.timings = {}
+        self._phase_started = None
+        #(component, slot) of each stopped component that has not been destroyed yet, keyed by id(component).
+        self._waiting = {}
+        self.wait_timer = QtCore.QTimer(self)
+        self.wait_timer.setSingleShot(True)
+        self.wait_timer.setInterval(timeout)
+        self.wait_timer.timeout.connect(self.wait_timed_out)
+        #Components are started from the event loop rather than from within an object's destruction.
+        self.start_timer = QtCore.QTimer(self)
+        self.start_timer.setSingleShot(True)
+        self.start_timer.setInterval(0)
+        self.start_timer.timeout.connect(self.restart_components)
+
+    def begin_phase(self, name):
+        """Ends the running phase, recording its duration, and begins the next one."""
+        now = self.clock()
+        if self.phase is not None:
+            self.timings[self.phase] = round((now - self._phase_started) * 1000, 3)
+        self.phase = name
+        self._phase_started = now
+        if name is not None:
+            self.log.debug(self.translate("logs", "Restart phase {0} started.".format(name)))
+            self.phase_started.emit(name)
+
+    def start(self):
+        """Stops the components and begins waiting for them to be destroyed."""
+        self.begin_phase("stop")
+        try:
+            components = [component for component in (self.stop() or []) if component]
+        except Exception as _excp:
+            self.log.error(self.translate("logs", "The client's components could not be stopped."))
+            self.log.exception(_excp)
+            self.complete(False)
+            return
+        self.begin_phase("wait")
+        for component in components:
+            slot = lambda obj=None, key=id(component): self.component_stopped(key)
+            self._waiting[id(component)] = (component, slot)
+            component.destroyed.connect(slot)
+        if self._waiting:
+            self.wait_timer.start()
+        else:
+            self.start_timer.start()
+
+    def component_stopped(self, key):
+        """Records that a component was destroyed and starts the components again once none are left."""
+        self._waiting.pop(key, None)
+        if not self._waiting and self.phase == "wait":
+            self.wait_timer.stop()
+            self.start_timer.start()
+
+    def wait_timed_out(self):
+        """Starts the components again even though some of the old ones were never destroyed."""
+        self.log.warning(self.translate("logs", "{0} components did not report they had stopped in time. Restarting anyway.".format(len(self._waiting))))
+        for component, slot in self._waiting.values():
+            component.destroyed.disconnect(slot)
+        self._waiting.clear()
+        self.restart_components()
+
+    def restart_components(self):
+        """Starts the components again."""
+        if self.phase != "wait":
+            return
+        self.begin_phase("start")
+        try:
+            self.start_components()
+        except Exception as _excp:
+            self.log.error(self.translate("logs", "The client's components could not be started again."))
+            self.log.exception(_excp)
+            self.complete(False)
+            return
+        self.complete(True)
+
+    def complete(self, result):
+        """Ends the restart, logs how long each phase took, and emits finished."""
+        self.begin_phase(None)
+        self.result = result
+        self.log.info(self.translate("logs", "Restart {0} in {1:.1f} ms (stop {2:.1f} ms, wait {3:.1f} ms, start {4:.1f} ms).".format(
+            "completed" if result else "failed", sum(self.timings.values()),
+            self.timings.get("stop", 0), self.timings.get("wait", 0), self.timings.get("start", 0))))
+        self.finished.emit(result)
+
+    def done(self):
+        """Returns True once the restart has finished."""
+        return self.result is not None
+
+    def wait(self, timeout=None):
+        """Runs a local event loop until the restart has finished. For callers that cannot carry on until the client is back up.
+
+        Args:
+          timeout (int): The most milliseconds to wait. Waits until the restart finishes if not provided.
+
+        Returns:
+          True if the restart completed, False if it failed, or None if it had not finished in time.
+        """
+        if self.done():
+            return self.result
+        loop = QtCore.QEventLoop()
+        self.finished.connect(loop.quit)
+        #The timer belongs to the loop so that it cannot fire once the loop is gone.
+        timer = QtCore.QTimer(loop)
+        timer.setSingleShot(True)
+        timer.timeout.connect(loop.quit)
+        if timeout is not None:
+            timer.start(timeout)
+        loop.exec_()
+        timer.stop()
+        self.finished.disconnect(loop.quit)
+        return self.result
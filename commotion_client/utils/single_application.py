@@ -9,6 +9,7 @@ The single application handler classes the commotion client inherets its cross p
 Key componenets handled within:
  * singleApplication mode
  * cross instance messaging
+ * the JSON control API
 
 """
 
@@ -18,6 +19,8 @@ from PyQt4 import QtGui
 from PyQt4 import QtCore
 from PyQt4 import QtNetwork
 
+from commotion_client.utils import messaging
+
 
 class SingleApplication(QtGui.QApplication):
     """
@@ -50,6 +53,111 @@ class SingleApplication(QtGui.QApplication):
         return self._is_running
 
 
+class ClientConnection(QtCore.QObject):
+    """
+    The state of one messaging connection to the running client.
+
+    Bytes are buffered as they arrive until a full frame has been read, which is then decoded and emitted in request_received. Nothing here waits on the socket, so a slow client only ever costs the event loop the time it takes to copy the bytes it has sent. A client that stops part way through a frame for longer than stall_timeout, or that announces a frame larger than max_size, is disconnected.
+    """
+
+    #Emitted with the connection and the decoded request (dictionary) for every complete frame.
+    request_received = QtCore.pyqtSignal(object, dict)
+    #Emitted with the connection once its client has disconnected or been dropped.
+    closed = QtCore.pyqtSignal(object)
+
+    def __init__(self, socket, stall_timeout=5000, max_size=messaging.MAX_FRAME_SIZE, parent=None):
+        """
+        Args:
+          socket (QLocalSocket): A connected socket accepted by the messaging server.
+          stall_timeout (int): The milliseconds a partial frame may wait for the rest of its bytes.
+          max_size (int): The largest payload (bytes) accepted in one frame.
+        """
+        super().__init__(parent)
+        self.log = logging.getLogger("commotion_client."+__name__)
+        self.translate = QtCore.QCoreApplication.translate
+        self.socket = socket
+        self.buffer = messaging.FrameBuffer(max_size)
+        self.stall_timer = QtCore.QTimer(self)
+        self.stall_timer.setSingleShot(True)
+        self.stall_timer.setInterval(stall_timeout)
+        self.stall_timer.timeout.connect(self.stalled)
+        self._closed = False
+        self._disconnecting = False
+        socket.readyRead.connect(self.read)
+        socket.disconnected.connect(self.close)
+
+    def read(self):
+        """
+        Buffers the bytes that have arrived and emits request_received with each complete frame. A frame that is not a valid request is answered with an error.
+        """
+        if self._closed or self._disconnecting:
+            return
+        self.buffer.feed(bytes(self.socket.readAll().data()))
+        try:
+            for payload in self.buffer.frames():
+                try:
+                    request = messaging.decode(payload)
+                except ValueError as _excp:
+                    self.log.error(self.translate("logs", "Received a message that could not be read. {0}".format(_excp)))
+                    self.respond({"id":None, "ack":False, "error":"Invalid message."})
+                    continue
+                self.request_received.emit(self, request)
+                if self._closed:
+                    return
+        except ValueError as _excp:
+            self.log.warning(self.translate("logs", "Dropping a messaging connection. {0}".format(_excp)))
+            self.respond({"id":None, "ack":False, "error":"Message too large."})
+            self.disconnect_client()
+            return
+        #Only a partial frame can stall. The timer is restarted whenever more of it arrives.
+        if self.buffer.pending():
+            self.stall_timer.start()
+        else:
+            self.stall_timer.stop()
+
+    def respond(self, response):
+        """
+        Queues a response (dictionary) to be written to the client. Qt writes it once the event loop runs, so this never blocks.
+        """
+        if not self._closed:
+            self.socket.write(messaging.encode(response))
+
+    def stalled(self):
+        """
+        Drops a client that stopped part way through a frame.
+        """
+        self.log.warning(self.translate("logs", "Dropping a messaging connection that stalled with {0} bytes of a message unread.".format(self.buffer.pending())))
+        self.abort()
+
+    def disconnect_client(self):
+        """
+        Stops reading from the client and disconnects it once queued responses have been written. The connection is closed when the socket reports it has disconnected.
+        """
+        if not self._closed and not self._disconnecting:
+            self._disconnecting = True
+            self.stall_timer.stop()
+            self.socket.disconnectFromServer()
+
+    def abort(self):
+        """
+        Disconnects the client without waiting for queued responses to be written.
+        """
+        if not self._closed:
+            self.socket.abort()
+            self.close()
+
+    def close(self):
+        """
+        Releases the connection and emits closed. Later calls do nothing.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self.stall_timer.stop()
+        self.socket.deleteLater()
+        self.closed.emit(self)
+
+
 class SingleApplicationWithMessaging(SingleApplication):
     """
     The interprocess messaging class for the Commotion Client. This class extends the single application to allow for instantiations of the Commotion Client to pass messages to the existing client if it is already running. When a second instance of a Commotion Client is run without a message specified it will reaise the earler clients main window to the front and then close itself.
@@ -58,50 +166,132 @@ class SingleApplicationWithMessaging(SingleApplication):
     python3.3 CommotionClient.py --message "COMMAND"
     """
     
+    #Emitted with each message received from another instance.
+    messageAvailable = QtCore.pyqtSignal(str)
+
     def __init__(self, key, argv):
         super().__init__(key, argv)
 
         self._key = key
         self._timeout = 1000
+        #The ClientConnection of each connected client.
+        self._connections = set()
+        #The handler of each control API command. See register_control().
+        self.controls = {}
+        self.register_control("controls", lambda args: sorted(self.controls.keys()))
         #create server to listen for messages
         self._server = QtNetwork.QLocalServer(self)
-        #Connect to messageAvailable signal created by handle_message.
-        self.connect(self, QtCore.SIGNAL('messageAvailable'), self.process_message)
+        #Connect to messageAvailable signal created by handle_request.
+        self.messageAvailable.connect(self.process_message)
 
         if not self.is_running():
-            bytes.decode
             self._server.newConnection.connect(self.handle_message)
             self._server.listen(self._key)
 
     def handle_message(self):
         """
-        Server side implementation of the messaging functions. This function waits for signals it receives and then emits a SIGNAL "messageAvailable" with the decoded message.
+        Server side implementation of the messaging functions. Accepts every pending connection and gives it a ClientConnection that reads its messages as they arrive.
+
+        Connections stay open so that a client can send any number of messages over one connection. Nothing here waits on a socket.
+        """
+        while self._server.hasPendingConnections():
+            connection = ClientConnection(self._server.nextPendingConnection(), self._timeout * 5, parent=self)
+            connection.request_received.connect(self.handle_request)
+            connection.closed.connect(self.close_connection)
+            self._connections.add(connection)
+            self.log.debug(self.translate("logs", "Accepted a messaging connection."))
+            #Bytes can arrive before readyRead is connected.
+            if connection.socket.bytesAvailable():
+                connection.read()
+
+    def handle_request(self, connection, request):
+        """
+        Answers a request read from a messaging connection.
+
+        A request with a "command" is a control API request. See handle_control. A request with a "message" is emitted in messageAvailable and acknowledged.
         
         (Emits a signal instead of just calling a function in case we decide we would like to allow other components or extensions to listen for messages from new instances.)
         """
-        socket = self._server.nextPendingConnection()
-        if socket.waitForReadyRead(self._timeout):
-            self.emit(QtCore.SIGNAL("messageAvailable"), bytes(socket.readAll().data()).decode('utf-8'))
-            socket.disconnectFromServer()
-            self.log.debug(self.translate("logs", "message received and emitted in a messageAvailable signal"))
-        else:
-            self.log.error(socket.errorString())
+        if "command" in request:
+            self.handle_control(connection, request)
+            return
+        if "message" not in request:
+            self.log.error(self.translate("logs", "Received a request without a message."))
+            connection.respond({"id":request.get("id"), "ack":False, "error":"Invalid message."})
+            return
+        self.messageAvailable.emit(str(request["message"]))
+        self.log.debug(self.translate("logs", "message received and emitted in a messageAvailable signal"))
+        connection.respond({"id":request.get("id"), "ack":True})
+
+    def register_control(self, command, handler):
+        """
+        Adds a command to the control API, replacing any existing handler of the command.
+
+        Args:
+          command (string): The name of the command.
+          handler (function): Called with the request's "args" (dictionary). Returns the result, which must be serializable to JSON. Raises ValueError if the arguments are not valid.
+        """
+        self.controls[command] = handler
+
+    def handle_control(self, connection, request):
+        """
+        Runs a control API request and writes its response.
+
+        Requests and responses are JSON objects:
+
+            {"id": 4, "command": "log_level", "args": {"level": "DEBUG"}}
+            {"id": 4, "ok": true, "result": "DEBUG"}
+            {"id": 5, "ok": false, "error": "pineapple is not a control command."}
+
+        Every command is answered as soon as it is read, so any number of clients can query the running client at once without going through the GUI.
+        """
+        request_id = request.get("id")
+        command = request["command"]
+        args = request.get("args") or {}
+        if not isinstance(command, str):
+            connection.respond({"id":request_id, "ok":False, "error":"The command of a control request must be a JSON string."})
+            return
+        handler = self.controls.get(command)
+        if handler is None:
+            connection.respond({"id":request_id, "ok":False, "error":"{0} is not a control command.".format(command)})
+            return
+        if not isinstance(args, dict):
+            connection.respond({"id":request_id, "ok":False, "error":"The args of a control command must be a JSON object."})
+            return
+        try:
+            result = handler(args)
+        except ValueError as _excp:
+            connection.respond({"id":request_id, "ok":False, "error":str(_excp)})
+            return
+        except Exception as _excp:
+            self.log.error(self.translate("logs", "Control command {0} could not be completed.".format(command)))
+            self.log.exception(_excp)
+            connection.respond({"id":request_id, "ok":False, "error":"{0} could not be completed.".format(command)})
+            return
+        try:
+            connection.respond({"id":request_id, "ok":True, "result":result})
+        except (TypeError, ValueError) as _excp:
+            #The result could not be serialized to JSON. Nothing was written.
+            self.log.error(self.translate("logs", "The result of control command {0} could not be sent. {1}".format(command, _excp)))
+            connection.respond({"id":request_id, "ok":False, "error":"The result of {0} could not be sent.".format(command)})
+            return
+        self.log.debug(self.translate("logs", "Answered control command {0}.".format(command)))
+
+    def close_connection(self, connection):
+        """
+        Forgets a messaging connection once its client has disconnected.
+        """
+        self._connections.discard(connection)
+        connection.deleteLater()
 
     def send_message(self, message):
         """
         Message sending function. Connected to local socket specified by shared key and if successful writes the message to it and returns.
         """
         if self.is_running():
-            socket = QtNetwork.QLocalSocket(self)
-            socket.connectToServer(self._key, QtCore.QIODevice.WriteOnly)
-            if not socket.waitForConnected(self._timeout):
-                self.log.error(socket.errorString())
-                return False
-            socket.write(str(message).encode("utf-8"))
-            if not socket.waitForBytesWritten(self._timeout):
-                self.log.error(socket.errorString())
+            if not messaging.send_message(self._key, message, self._timeout):
+                self.log.error(self.translate("logs", "Could not send a message to the running commotion client application."))
                 return False
-            socket.disconnectFromServer()
             return True
         self.log.debug(self.translate("logs", "Attempted to send message when commotion client application was not currently running."))
         return False
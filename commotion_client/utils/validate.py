@@ -18,20 +18,50 @@ import re
 import ipaddress
 import os
 import zipfile
+import json
+import hashlib
+import threading
+import collections
+from concurrent import futures
 
 #PyQt imports
 from PyQt4 import QtCore
 
 #Commotion Client Imports
 from commotion_client.utils import fs_utils
+from commotion_client.utils import extension_archive
+from commotion_client.utils import library_index
+from commotion_client.utils import archive_verifier
+
+#File name characters each platform does not allow.
+RESERVED_CHARACTERS = {"cygwin" : re.compile(r'[|\\?*<":>+\[\]/]'),
+                       "win32" : re.compile(r'[|\\?*<":>+\[\]/]'),
+                       "darwin" : re.compile(r'[:]'),
+                       "linux" : re.compile(r'[/\x00]')}
+#Whether each platform limits the length of file names or of full paths, and the longest it allows.
+PATH_LIMITS = {"linux" : ("name", 259),
+               "darwin" : ("name", 259),
+               "win32" : ("path", 255),
+               "cygwin" : ("path", 255)}
+#The shortest and longest menu text allowed.
+MENU_TEXT_LENGTH = (4, 39)
+#The lowest and highest menu level allowed.
+MENU_LEVEL_RANGE = (1, 100)
+
+#Validation reports keyed by config contents, archive stat data, and platform.
+REPORT_CACHE_SIZE = 256
+_reports = collections.OrderedDict()
+_reports_lock = threading.Lock()
+
 
 class ClientConfig(object):
 
-    def __init__(self, config, directory=None):
+    def __init__(self, config, directory=None, archive=None):
         """
         Args:
           config (dictionary): The config for the extension.
           directory (string): Absolute Path to the directory containing the extension zipfile. If not specified the validator will ONLY check the validity of the config passed to it.
+          archive (ExtensionArchive): An already opened archive for the extension. If not specified the archive is opened from the directory the first time its files are checked.
         """
         self.config_values = ["name",
                               "main",
@@ -45,9 +75,13 @@ class ClientConfig(object):
         self.log = logging.getLogger("commotion_client."+__name__)
         self.translate = QtCore.QCoreApplication.translate
         self.config = config
+        self._extension_path = None
+        self._archive = archive
         if directory:
             #set extension directory to point at config zipfile in that directory
             self.extension_path = directory
+        elif archive:
+            self._extension_path = archive.path
         self.errors = None
 
     @property
@@ -89,6 +123,13 @@ class ClientConfig(object):
         path = os.path.join(value, self.config['name'])
         self._extension_path = path
 
+    @property
+    def archive(self):
+        """The ExtensionArchive for the extension being validated. Its central directory is only read once no matter how many files are checked."""
+        if self._archive is None and self.extension_path:
+            self._archive = extension_archive.open_archive(self.extension_path)
+        return self._archive
+
     def validate_all(self):
         """Run all validation functions on an uncompressed extension.
         
@@ -98,140 +139,156 @@ class ClientConfig(object):
         self.errors = None
         if not self.config:
             raise NameError(self.translate("logs", "ClientConfig validator requires at least a config has been specified"))            
-        errors = []
-        if not self.name():
-            errors.append("name")
-            self.log.info(self.translate("logs", "The name of extension {0} is invalid.".format(self.config['name'])))
-        if not self.tests():
-            errors.append("tests")
-            self.log.info(self.translate("logs", "The extension {0}'s tests is invalid.".format(self.config['name'])))
-        if not self.menu_level():
-            errors.append("menu_level")
-            self.log.info(self.translate("logs", "The extension {0}'s menu_level is invalid.".format(self.config['name'])))
-        if not self.menu_item():
-            errors.append("menu_item")
-            self.log.info(self.translate("logs", "The extension {0}'s menu_item is invalid.".format(self.config['name'])))
-        if not self.parent():
-            errors.append("parent")
-            self.log.info(self.translate("logs", "The extension {0}'s parent is invalid.".format(self.config['name'])))
-        else:
-            for gui_name in ['main', 'settings', 'toolbar']:
-                if not self.gui(gui_name):
-                    self.log.info(self.translate("logs", "The extension {0}'s {1} is invalid.".format(self.config['name'], gui_name)))
-                    errors.append(gui_name)
-        if errors:
-            self.errors = errors
+        report = self.report()
+        for field, message in report.errors.items():
+            self.log.info(self.translate("logs", "The extension {0}'s {1} is invalid: {2}".format(self.config['name'], field, message)))
+        if report.errors:
+            self.errors = list(report.errors.keys())
             return False
         else:
             return True
 
+    def report(self):
+        """Validates every value in the config and returns the results as one report.
+
+        Reports are cached per config contents, archive stat data, and platform. Validating the same config against the same archive again does not repeat any checks.
+
+        Returns:
+          A ValidationReport for the config.
+        """
+        key = self.report_key()
+        with _reports_lock:
+            report = _reports.get(key)
+            if report is not None:
+                _reports.move_to_end(key)
+                return report
+        report = self.build_report()
+        with _reports_lock:
+            _reports[key] = report
+            while len(_reports) > REPORT_CACHE_SIZE:
+                _reports.popitem(last=False)
+        return report
+
+    def report_key(self):
+        """Returns the key a config's report is cached under."""
+        config_hash = hashlib.sha1(json.dumps(self.config, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        archive = None
+        if self.extension_path:
+            archive = (self.archive.path, self.archive.size, self.archive.mtime)
+        return (config_hash, archive, sys.platform)
+
+    def build_report(self):
+        """Runs every check on the config without using the report cache.
+
+        Returns:
+          A ValidationReport for the config.
+        """
+        config = self.config
+        report = ValidationReport(config.get('name'))
+        #Extension Name
+        name = str(config['name'])
+        error = self.path_error(name)
+        if error:
+            report.error("name", error)
+        #Extension Tests
+        tests_file = str(config.get("tests", "tests")) + ".py"
+        error = self.path_error(tests_file)
+        if error:
+            report.error("tests", error)
+        elif not self.file_exists(tests_file):
+            report.warn("tests", self.translate("logs", "The extensions 'tests' file does not exist. But tests are not required. Shame on you though, SHAME!."))
+        #Extension Menu Level
+        if "menu_level" in config:
+            try:
+                level = int(config["menu_level"])
+            except (TypeError, ValueError):
+                report.error("menu_level", self.translate("logs", "The 'menu_level' value set in the config is not a number and is therefore invalid."))
+            else:
+                if not MENU_LEVEL_RANGE[0] <= level <= MENU_LEVEL_RANGE[1]:
+                    report.error("menu_level", self.translate("logs", "The menu_level is invalid. Choose a number between 1 and 100"))
+        #Extension Menu Item
+        if "menu_item" in config:
+            error = self.menu_text_error(config["menu_item"])
+        elif "name" in report.errors:
+            error = self.translate("logs", "The name value is the default for a menu_item if none is specified. You don't have a menu_item specified and the name value in this config is invalid.")
+        else:
+            error = self.menu_text_error(name)
+        if error:
+            report.error("menu_item", error)
+        #Extension Parent
+        if "parent" in config:
+            error = self.menu_text_error(config["parent"])
+            if error:
+                report.error("parent", error)
+        #Extension Main, Settings & Toolbar
+        for gui_name in ['main', 'settings', 'toolbar']:
+            file_name = self.gui_file(gui_name)
+            error = self.path_error(file_name)
+            if not error and not self.file_exists(file_name):
+                error = self.translate("logs", "The specified file '{0}' does not exist.".format(file_name))
+            if error:
+                report.error(gui_name, error)
+        return report
+
+    def gui_file(self, gui_name):
+        """Returns the file name of one of the gui objects. Settings and toolbar default to main, which defaults to main.py."""
+        default = str(self.config.get("main", "main"))
+        return str(self.config.get(gui_name, default)) + ".py"
 
     def gui(self, gui_name):
         """Validate of one of the gui objects config values. (main, settings, or toolbar)
 
         @param gui_name string "main", "settings", or "toolbar"
         """
-        try:
-            val = str(self.config[gui_name])
-        except KeyError:
-            if gui_name != "main":
-                try:
-                    val = str(self.config["main"])
-                except KeyError:
-                    val = str('main')
-            else:
-                val = str('main')
-        file_name = val + ".py"
-        if not self.check_path(file_name):
-            self.log.warning(self.translate("logs", "The extensions {0} file name is invalid for this system.".format(gui_name)))
-            return False
-        if not self.check_exists(file_name):
-            self.log.warning(self.translate("logs", "The extensions {0} file does not exist.".format(gui_name)))
-            return False
-        return True
+        if gui_name not in ['main', 'settings', 'toolbar']:
+            #Callers have passed the value of main (which is usually "main") as the gui name.
+            gui_name = "main"
+        return gui_name not in self.report().errors
 
     def name(self):
-        try:
-            name_val = str(self.config['name'])
-        except KeyError:
-            self.log.warning(self.translate("logs", "There is no name value in the config file. This value is required."))
-            return False
-        if not self.check_path_length(name_val):
-            self.log.warning(self.translate("logs", "This value is too long for your system."))
-            return False
-        if not self.check_path_chars(name_val):
-            self.log.warning(self.translate("logs", "This value uses invalid characters for your system."))
-            return False
-        return True
+        return "name" not in self.report().errors
 
     def menu_item(self):
         """Validate a  menu item value."""
-        try:
-            val = str(self.config["menu_item"])
-        except KeyError:
-            if self.name():
-                val = str(self.config["name"])
-            else:
-                self.log.warning(self.translate("logs", "The name value is the default for a menu_item if none is specified. You don't have a menu_item specified and the name value in this config is invalid."))
-                return False
-        if not self.check_menu_text(val):
-            self.log.warning(self.translate("logs", "The menu_item value is invalid"))
-            return False
-        return True
+        return "menu_item" not in self.report().errors
 
     def parent(self):
         """Validate a  parent value."""
-        try:
-            val = str(self.config["parent"])
-        except KeyError:
-            self.log.info(self.translate("logs", "There is no 'parent' value set in the config. As such the default value of 'Extensions' will be used."))
-            return True
-        if not self.check_menu_text(val):
-            self.log.warning(self.translate("logs", "The parent value is invalid"))
-            return False
-        return True
+        return "parent" not in self.report().errors
 
     def menu_level(self):
         """Validate a Menu Level Config item."""
-        try:
-            val = int(self.config["menu_level"])
-        except KeyError:
-            self.log.info(self.translate("logs", "There is no 'menu_level' value set in the config. As such the default value of 10 will be used."))
-            return True
-        except ValueError:
-            self.log.info(self.translate("logs", "The 'menu_level' value set in the config is not a number and is therefore invalid."))
-            return False
-        if not 0 < val > 100:
-            self.log.warning(self.translate("logs", "The menu_level is invalid. Choose a number between 1 and 100"))
-            return False
-        return True
+        return "menu_level" not in self.report().errors
 
     def tests(self):
         """Validate a tests config menu item."""
-        try:
-            val = str(self.config["tests"])
-        except KeyError:
-            val = str('tests')
-        file_name = val + ".py"
-        if not self.check_path(file_name):
-            self.log.warning(self.translate("logs", "The extensions 'tests' file name is invalid for this system."))
-            return False
-        if not self.check_exists(file_name):
-            self.log.info(self.translate("logs", "The extensions 'tests' file does not exist. But tests are not required. Shame on you though, SHAME!."))
-        return True
-        
+        return "tests" not in self.report().errors
+
+    def menu_text_error(self, menu_text):
+        """Returns why a menu text is invalid, or None if it is valid."""
+        if not MENU_TEXT_LENGTH[0] <= len(str(menu_text)) <= MENU_TEXT_LENGTH[1]:
+            return self.translate("logs", "Menu items must be between 3 and 40 chars long. Becuase it looks prettier that way.")
+        return None
+
     def check_menu_text(self, menu_text):
         """
         Checks that menu text fits within the accepted string length bounds.
 
         @param menu_text string The text that will appear in the menu.
         """
-        if not 3 < len(str(menu_text)) < 40:
-            self.log.warning(self.translate("logs", "Menu items must be between 3 and 40 chars long. Becuase it looks prettier that way."))
+        error = self.menu_text_error(menu_text)
+        if error:
+            self.log.warning(error)
             return False
         else:
             return True
-            
+
+    def file_exists(self, file_name):
+        """Returns True if a file exists within the extension or if there is no extension to check."""
+        if not self.extension_path:
+            return True
+        return self.archive.has(file_name)
+
     def check_exists(self, file_name):
         """Checks if a specified file exists within an extension.
 
@@ -240,49 +297,67 @@ class ClientConfig(object):
         if not self.extension_path:
             self.log.debug(self.translate("logs", "No extension directory was specified so file checking was skipped."))
             return True
-        ext_zip = zipfile.ZipFile(self.extension_path, 'r')
-        files = ext_zip.namelist()
-        if not str(file_name) in files:
+        if not self.file_exists(file_name):
             self.log.warning(self.translate("logs", "The specified file '{0}' does not exist.".format(file_name)))
             return False
         else:
             return True
-            
+
+    def path_error(self, file_name):
+        """Returns why a file name is invalid on this system, or None if it is valid."""
+        return self.path_length_error(file_name) or self.path_chars_error(file_name)
+
     def check_path(self, file_name):
         """Runs all path checking functions on a string.
 
         @param file_name string  The string to check for validity.
         """
-        if not self.check_path_length(file_name):
-            self.log.warning(self.translate("logs", "This value is too long for your system."))
-            return False
-        if not self.check_path_chars(file_name):
-            self.log.warning(self.translate("logs", "This value uses invalid characters for your system."))
+        error = self.path_error(file_name)
+        if error:
+            self.log.warning(error)
             return False
         return True
 
+    def path_chars_error(self, file_name):
+        """Returns why a file name uses characters this system does not allow, or None if it does not."""
+        reserved = RESERVED_CHARACTERS.get(sys.platform)
+        if reserved is None:
+            return None
+        if reserved.search(str(file_name)):
+            return self.translate("logs", "This value uses invalid characters for your system.")
+        return None
+
     def check_path_chars(self, file_name):
         """Checks if a string is a valid file name on this system.
 
         @param file_name string The string to check for validity
         """
-        # file length limit
-        platform = sys.platform
-        reserved = {"cygwin" : r"[|\?*<\":>+[]/]",
-                    "win32" : r"[|\?*<\":>+[]/]",
-                    "darwin" : "[:]",
-                    "linux" : "[/\x00]"}
-        if platform and reserved[platform]:
-            if re.search(file_name, reserved[platform]):
-                self.log.warning(self.translate("logs", "The extension's config file contains an invalid main value."))
-                return False
-            else:
-                return True
+        if sys.platform not in RESERVED_CHARACTERS:
+            self.log.warning(self.translate("logs", "Your system, {0} is not recognized. This may cause instability if file uses chars that your system does not allow.").format(sys.platform))
+            return True
+        error = self.path_chars_error(file_name)
+        if error:
+            self.log.warning(error)
+            return False
         else:
-            self.log.warning(self.translate("logs", "Your system, {0} is not recognized. This may cause instability if file uses chars that your system does not allow.").format(platform))
             return True
-                
-            
+
+    def path_length_error(self, file_name):
+        """Returns why a file name is too long for this system, or None if it is not."""
+        if not self.extension_path:
+            return None
+        limit = PATH_LIMITS.get(sys.platform)
+        if limit is None:
+            return None
+        limit_type, length = limit
+        if limit_type == "path":
+            full_path = os.path.join(QtCore.QDir.currentPath(), "extensions", str(file_name))
+            if len(full_path) > length:
+                return self.translate("logs", "The full extension path cannot be greater than 260 chars")
+        elif len(str(file_name)) > length:
+            return self.translate("logs", "File names can not be greater than 260 chars on your system")
+        return None
+
     def check_path_length(self, file_name=None):
         """Checks if a string will be of a valid length for a file name and full path on this system.
 
@@ -291,30 +366,163 @@ class ClientConfig(object):
         if not self.extension_path:
             self.log.debug(self.translate("logs", "No extension directory was specified so file checking was skipped."))
             return True
-        # file length limit
-        platform = sys.platform
-        # OSX(name<=255),  linux(name<=255)
-        name_limit = ['linux', 'darwin']
-        # Win(name+path<=260),
-        path_limit = ['win32', 'cygwin']
-        if platform in path_limit:
-            extension_path = os.path.join(QtCore.QDir.currentPath(), "extensions")
-            full_path = os.path.join(extension_path, file_name)
-            if len(str(full_path)) > 255:
-                self.log.warning(self.translate("logs", "The full extension path cannot be greater than 260 chars"))
-                return False
-            else:
-                return True
-        elif platform in name_limit:
-            if len(str(file_name)) >= 260:
-                self.log.warning(self.translate("logs", "File names can not be greater than 260 chars on your system"))
-                return False
-            else:
-                return True
+        if sys.platform not in PATH_LIMITS:
+            self.log.warning(self.translate("logs", "Your system, {0} is not recognized. This may cause instability if file or path names are longer than your system allows.").format(sys.platform))
+            return True
+        error = self.path_length_error(file_name)
+        if error:
+            self.log.warning(error)
+            return False
         else:
-            self.log.warning(self.translate("logs", "Your system, {0} is not recognized. This may cause instability if file or path names are longer than your system allows.").format(platform))
             return True
 
+
+class ValidationReport(object):
+    """The result of validating an extension config.
+
+    Errors make a config invalid. Warnings are problems that do not stop an extension from being installed. Both are kept in the order they were found keyed by the config value they are about.
+    """
+
+    def __init__(self, name=None):
+        """
+        Args:
+          name (string): The name of the extension the report is for.
+        """
+        self.name = name
+        self.errors = collections.OrderedDict()
+        self.warnings = collections.OrderedDict()
+
+    def error(self, field, message):
+        """Records that a config value is invalid."""
+        self.errors[field] = str(message)
+
+    def warn(self, field, message):
+        """Records a problem with a config value that does not make it invalid."""
+        self.warnings[field] = str(message)
+
+    @property
+    def valid(self):
+        """True if no errors were found."""
+        return not self.errors
+
+    def as_dict(self):
+        """Returns the report as a dictionary that can be serialized to JSON.
+
+            {"name": "unit_test_mock", "valid": False,
+             "errors": [{"field": "menu_level", "message": "..."}],
+             "warnings": []}
+        """
+        return {"name":self.name,
+                "valid":self.valid,
+                "errors":[{"field":field, "message":message} for field, message in self.errors.items()],
+                "warnings":[{"field":field, "message":message} for field, message in self.warnings.items()]}
+
+    def __str__(self):
+        if self.valid:
+            return "{0}: valid".format(self.name)
+        return "{0}: {1}".format(self.name, "; ".join("{0}: {1}".format(field, message) for field, message in self.errors.items()))
+
+
+class LibraryReport(object):
+    """The results of validating every archive in an extension library."""
+
+    def __init__(self, path):
+        """
+        Args:
+          path (string): The path to the extension library.
+        """
+        self.path = path
+        #ValidationReports keyed by archive path, in path order.
+        self.reports = collections.OrderedDict()
+
+    @property
+    def valid(self):
+        """True if every archive in the library is valid."""
+        return all(report.valid for report in self.reports.values())
+
+    def rejected(self):
+        """Returns the paths of the archives that failed validation."""
+        return [path for path, report in self.reports.items() if not report.valid]
+
+    def rejected_names(self):
+        """Returns the names of the extensions that failed validation."""
+        return [report.name for report in self.reports.values() if not report.valid]
+
+    def as_dict(self):
+        """Returns the report as a dictionary that can be serialized to JSON.
+
+            {"library": "/usr/share/Commotion/extension_data", "valid": False,
+             "rejected": ["/usr/share/Commotion/extension_data/broken"],
+             "archives": [{"path": "...", "name": "...", "valid": True, "errors": [], "warnings": []}, ...]}
+        """
+        archives = []
+        for path, report in self.reports.items():
+            archive = report.as_dict()
+            archive["path"] = path
+            archives.append(archive)
+        return {"library":self.path,
+                "valid":self.valid,
+                "rejected":self.rejected(),
+                "archives":archives}
+
+
+def validate_archive(path):
+    """Validates a single extension archive without installing it.
+
+    Args:
+      path (string): The path to an extension archive.
+
+    Returns:
+      A ValidationReport for the archive. The report is named after the archive if its config could not be read.
+    """
+    translate = QtCore.QCoreApplication.translate
+    report = ValidationReport(os.path.basename(path))
+    try:
+        archive = extension_archive.open_archive(path)
+    except (ValueError, OSError):
+        report.error("archive", translate("logs", "{0} is not an extension archive.".format(path)))
+        return report
+    config = archive.config
+    if not isinstance(config, dict):
+        report.error("config", translate("logs", "The extension does not contain a valid config file."))
+        return report
+    if config.get('name') != os.path.basename(archive.path):
+        report.name = config.get('name', report.name)
+        report.error("name", translate("logs", "The extension's archive must have the same name as the extension. {0} is named {1}.".format(config.get('name'), os.path.basename(archive.path))))
+        return report
+    try:
+        validator = ClientConfig(config, os.path.dirname(archive.path))
+    except (KeyError, FileNotFoundError) as _excp:
+        report.error("config", str(_excp))
+        return report
+    return validator.report()
+
+def validate_library(path, index=None, executor=None, max_workers=4):
+    """Validates every archive in an extension library without installing any of them.
+
+    Args:
+      path (string): The path to an extension library.
+      index (LibraryIndex): The index to find the library's archives through. An in-memory index is used if not provided.
+      executor (concurrent.futures.Executor): The executor to validate archives on. If not provided one is created for the call.
+      max_workers (int): The most archives validated at the same time when no executor is provided.
+
+    Returns:
+      A LibraryReport for the library.
+
+    Raises:
+      NotADirectoryError: If the library does not exist.
+    """
+    index = index if index is not None else library_index.LibraryIndex()
+    report = LibraryReport(os.path.abspath(path))
+    if executor is None:
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return validate_library(path, index, pool)
+    paths = [archive_path for archive_path, entry in index.refresh(path, executor=executor) if os.path.basename(archive_path) != archive_verifier.MANIFEST_NAME]
+    for archive_path, archive_report in zip(paths, executor.map(validate_archive, paths)):
+        report.reports[archive_path] = archive_report
+    return report
+
+
 class Networking(object):
     def __init__(self):
         self.log = logging.getLogger("commotion_client."+__name__)
@@ -0,0 +1,152 @@
+"""
+
+This program is a part of The Commotion Client
+
+Copyright (C) 2014  Seamus Tuohy s2e@opentechinstitute.org
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+
+"""
+Unit Tests for commotion_client/GUI/main_window.py
+"""
+
+
+from PyQt4 import QtCore
+from PyQt4 import QtGui
+
+
+import unittest
+import logging
+import collections
+from unittest import mock
+
+
+from commotion_client.GUI import main_window
+
+class MockViewPort(QtGui.QWidget):
+
+    start_report_collection = QtCore.pyqtSignal()
+    data_report = QtCore.pyqtSignal(str, dict)
+    error_report = QtCore.pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.is_dirty = False
+
+    def clean_up(self):
+        pass
+
+class MockCrashReport(QtCore.QObject):
+
+    crash_override = QtCore.pyqtSignal()
+    crash_info = QtCore.pyqtSignal(str, dict)
+    alert_user = QtCore.pyqtSignal(str)
+
+class PoolWindow(main_window.MainWindow):
+    """A main window with only its viewport pool. The menu, crash reporter, and extension libraries are mocked."""
+
+    viewport_pool_size = 2
+
+    def __init__(self):
+        QtGui.QMainWindow.__init__(self)
+        self.log = logging.getLogger("commotion_client."+__name__)
+        self.translate = QtCore.QCoreApplication.translate
+        self.crash_report = MockCrashReport()
+        self.ext_manager = mock.Mock()
+        self.ext_manager.load_user_interface.side_effect = lambda name, gui: MockViewPort if gui == "main" else None
+        self.preloader = mock.Mock()
+        self.viewports = collections.OrderedDict()
+        self.stale_viewports = set()
+        self._attached = None
+        self.viewport_stack = QtGui.QStackedWidget(self)
+        self.setCentralWidget(self.viewport_stack)
+        self.apply_viewport(MockViewPort)
+
+    def init_toolbar(self, ext_toolbar, central_widget=None, viewport=None):
+        return QtGui.QWidget(central_widget)
+
+class ViewportPoolTests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication([])
+        self.window = PoolWindow()
+
+    def tearDown(self):
+        self.window.deleteLater()
+        self.app.deleteLater()
+        del self.app
+        self.app = None
+
+    def open(self, name):
+        self.window.next_extension = name
+        self.window.set_viewport()
+
+    def test_pool(self):
+        #the least recently used viewport is evicted once the pool is full
+        self.open("first")
+        self.assertEqual(list(self.window.viewports.keys()), [None, "first"])
+        self.open("second")
+        self.assertEqual(list(self.window.viewports.keys()), ["first", "second"])
+        self.assertEqual(self.window.viewport_stack.count(), 2)
+        #a pooled viewport is shown again without being rebuilt
+        with mock.patch.object(self.window, "build_viewport", wraps=self.window.build_viewport) as build:
+            first = self.window.viewports["first"][1]
+            self.open("first")
+            self.assertFalse(build.called)
+            self.assertIs(self.window.viewport, first)
+            self.assertIs(self.window.viewport_stack.currentWidget(), self.window.viewports["first"][0])
+            self.assertEqual(list(self.window.viewports.keys()), ["second", "first"])
+            self.open("third")
+            self.assertEqual(build.call_count, 1)
+        self.assertEqual(list(self.window.viewports.keys()), ["first", "third"])
+
+    def test_changed(self):
+        self.open("first")
+        first = self.window.viewport
+        self.open("second")
+        #a changed viewport that is not shown is dropped at once
+        self.window.drop_viewports(["first"])
+        self.assertEqual(list(self.window.viewports.keys()), ["second"])
+        #the shown viewport is kept until the user leaves it
+        second = self.window.viewport
+        self.window.drop_viewports(["second"])
+        self.assertIs(self.window.viewports["second"][1], second)
+        self.open("first")
+        self.assertIsNot(self.window.viewport, first)
+        self.assertEqual(list(self.window.viewports.keys()), ["first"])
+        self.assertEqual(self.window.viewport_stack.count(), 1)
+        #a shown viewport that changed is rebuilt when its extension is opened again
+        self.window.drop_viewports(["first"])
+        first = self.window.viewport
+        self.open("first")
+        self.assertIsNot(self.window.viewport, first)
+        self.assertEqual(self.window.stale_viewports, set())
+        self.assertEqual(self.window.viewport_stack.count(), 1)
+
+    def test_signals(self):
+        alerts = []
+        self.window.crash_report.alert_user.connect(alerts.append)
+        self.open("first")
+        first = self.window.viewport
+        self.open("second")
+        #only the viewport that is shown reports to the crash reporter
+        first.error_report.emit("first")
+        self.window.viewport.error_report.emit("second")
+        self.assertEqual(alerts, ["second"])
+        self.open("first")
+        first.error_report.emit("first again")
+        self.assertEqual(alerts, ["second", "first again"])
@@ -0,0 +1,64 @@
+"""
+
+This program is a part of The Commotion Client
+
+Copyright (C) 2014  Seamus Tuohy s2e@opentechinstitute.org
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+
+"""
+Unit Tests for commotion_client/GUI/menu_bar.py
+"""
+
+
+from PyQt4 import QtCore
+from PyQt4 import QtGui
+
+
+import unittest
+from unittest import mock
+
+
+from commotion_client.GUI import menu_bar
+
+class MenuBarTests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication([])
+        self.ext_mgr = mock.Mock()
+        with mock.patch.object(menu_bar, "ExtensionManager", return_value=self.ext_mgr):
+            with mock.patch.object(menu_bar.MenuBar, "populate_menu"):
+                self.menu = menu_bar.MenuBar()
+
+    def tearDown(self):
+        self.menu.deleteLater()
+        self.app.deleteLater()
+        del self.app
+        self.app = None
+
+    def test_refresh_empty(self):
+        #removing the last extension leaves the menu empty instead of re-initializing the libraries
+        self.menu.layout.addWidget(QtGui.QLabel("removed extension"))
+        self.ext_mgr.check_installed.return_value = False
+        self.menu.refresh(["unit_test_mock"])
+        self.assertFalse(self.ext_mgr.init_extension_libraries.called)
+        self.assertEqual(self.menu.layout.count(), 0)
+        #the first population still initializes empty libraries
+        with self.assertRaises(NameError):
+            self.ext_mgr.get_installed.return_value = {}
+            self.menu.populate_menu()
+        self.assertTrue(self.ext_mgr.init_extension_libraries.called)
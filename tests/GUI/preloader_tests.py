@@ -0,0 +1,117 @@
+"""
+
+This program is a part of The Commotion Client
+
+Copyright (C) 2014  Seamus Tuohy s2e@opentechinstitute.org
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+
+"""
+Unit Tests for commotion_client/GUI/preloader.py
+"""
+
+
+from PyQt4 import QtCore
+from PyQt4 import QtGui
+
+
+import unittest
+from unittest import mock
+
+
+from commotion_client.GUI import preloader
+
+class MockWindow(QtCore.QObject):
+    """The parts of the main window the preloader uses."""
+
+    def __init__(self):
+        super().__init__()
+        self.viewports = {}
+        self.preloaded = []
+        self.ext_manager = mock.Mock()
+        self.ext_manager.libraries = {"global":"/global"}
+        self.ext_manager.registry.value.side_effect = lambda name, key: {"type":"global", "initialized":True}[key]
+
+    def preload_viewport(self, name):
+        self.preloaded.append(name)
+        return True
+
+class ViewportPreloaderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication([])
+        self.app.setOrganizationName("test_case");
+        self.app.setApplicationName("testing_app");
+        self.clear_usage()
+        self.window = MockWindow()
+        self.preloader = preloader.ViewportPreloader(self.window, budget=250)
+        self.finished = []
+        self.preloader.finished.connect(lambda: self.finished.append(True))
+
+    def tearDown(self):
+        self.clear_usage()
+        self.app.deleteLater()
+        del self.app
+        self.app = None
+
+    def clear_usage(self):
+        _settings = QtCore.QSettings()
+        _settings.remove("extension_usage")
+        _settings.sync()
+
+    def use(self, counts):
+        for name, count in counts.items():
+            for _ in range(count):
+                self.preloader.record_use(name)
+
+    def test_ranked(self):
+        #extensions are ranked by how often they have been opened, ties by name
+        self.use({"config_editor":1, "mesh":3, "apps":1})
+        self.assertEqual(self.preloader.get_usage(), {"config_editor":1, "mesh":3, "apps":1})
+        self.assertEqual(self.preloader.ranked(), ["mesh", "apps", "config_editor"])
+        #extensions that are not initialized are never preloaded
+        self.window.ext_manager.registry.value.side_effect = lambda name, key: name != "mesh" if key == "initialized" else "global"
+        self.assertEqual(self.preloader.ranked(), ["apps", "config_editor"])
+
+    def test_budget(self):
+        self.use({"first":3, "second":2, "third":1})
+        archive = mock.Mock(uncompressed_size=100)
+        with mock.patch.object(preloader.extension_archive, "open_archive", return_value=archive):
+            self.preloader.start()
+            self.assertTrue(self.preloader.is_active)
+            for _ in range(3):
+                self.preloader.preload_next()
+        #the third extension would take 300 bytes of a 250 byte budget
+        self.assertEqual(self.window.preloaded, ["first", "second"])
+        self.assertEqual(self.preloader.used, 200)
+        self.assertFalse(self.preloader.is_active)
+        self.assertEqual(self.finished, [True])
+
+    def test_cancel(self):
+        self.use({"first":2, "second":1})
+        #already pooled viewports are skipped
+        self.window.viewports["second"] = None
+        self.preloader.start()
+        self.assertEqual(self.preloader.queue, ["first"])
+        self.assertTrue(self.preloader.timer.isActive())
+        self.preloader.cancel()
+        self.assertFalse(self.preloader.timer.isActive())
+        self.assertFalse(self.preloader.is_active)
+        self.assertEqual(self.finished, [True])
+        #nothing is preloaded once cancelled
+        self.app.processEvents()
+        self.assertEqual(self.window.preloaded, [])
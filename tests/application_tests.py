@@ -0,0 +1,85 @@
+"""
+
+This program is a part of The Commotion Client
+
+Copyright (C) 2014  Seamus Tuohy s2e@opentechinstitute.org
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+
+"""
+Unit Tests for commotion_client/application.py
+"""
+
+
+from PyQt4 import QtCore
+from PyQt4 import QtGui
+
+
+import unittest
+import logging
+import time
+from unittest import mock
+
+
+from commotion_client import application
+
+class RestartTests(unittest.TestCase):
+
+    def setUp(self):
+        #the client is started by each test rather than from the event loop, and logs are not written to disk
+        patches = [mock.patch.object(application.CommotionClientApplication, "init_client"),
+                   mock.patch.object(application.CommotionClientApplication, "init_logging",
+                                     lambda app, level=None, logfile=None: setattr(app, "log", logging.getLogger("commotion_client"))),]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.app = application.CommotionClientApplication({"key":"commotion_unit_test_restart", "status":None, "logFile":None, "logLevel":None}, [])
+        self.app.end = mock.Mock()
+        self.restarted = []
+        self.app.restarted.connect(lambda: self.restarted.append(True))
+
+    def tearDown(self):
+        self.app.deleteLater()
+        del self.app
+        self.app = None
+
+    def restart(self, force_close=None):
+        sequence = self.app.restart_client(force_close)
+        end = time.time() + 5
+        while not sequence.done() and time.time() < end:
+            self.app.processEvents()
+        return sequence.result
+
+    def test_restart(self):
+        with mock.patch.object(self.app, "start_full") as start:
+            self.assertTrue(self.restart())
+            self.assertTrue(start.called)
+        self.assertEqual(self.restarted, [True])
+        self.assertFalse(self.app.commands.held())
+
+    def test_failed_restart(self):
+        #a client that cannot be started again fails the restart
+        with mock.patch.object(self.app, "start_full", side_effect=RuntimeError("could not start")):
+            self.assertFalse(self.restart())
+        self.assertEqual(self.restarted, [])
+        self.assertFalse(self.app.end.called)
+        self.assertFalse(self.app.commands.held())
+        #and halts the application when the restart was forced
+        with mock.patch.object(self.app, "start_full", side_effect=RuntimeError("could not start")):
+            self.assertFalse(self.restart(force_close=True))
+        self.assertEqual(self.restarted, [])
+        self.assertTrue(self.app.end.called)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+This program is a part of The Commotion Client
+
+Copyright (C) 2014  Seamus Tuohy s2e@opentechinstitute.org
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+"""
+archive_benchmark.py
+
+Counts the file opens and zip central-directory parses needed to find, load, and validate one extension archive.
+
+It compares the access pattern the ConfigManager and ClientConfig used before the ExtensionArchive existed (get_paths, load, and one check_exists per gui/tests file each opening the archive again) with the current single-pass path.
+
+Run from the root of the repository:
+
+    python3 -m tests.benchmarks.archive_benchmark [library_directory]
+"""
+
+import builtins
+import io
+import json
+import os
+import sys
+import zipfile
+
+from PyQt4 import QtCore
+
+from commotion_client.utils import extension_archive
+from commotion_client.utils import extension_manager
+from commotion_client.utils import validate
+
+
+class Counter(object):
+    """Counts calls to open() and to zipfile's central directory parser."""
+
+    def __init__(self):
+        self.opens = 0
+        self.parses = 0
+        self._open = io.open
+        self._parse = zipfile.ZipFile._RealGetContents
+
+    def __enter__(self):
+        counter = self
+        def counting_open(*args, **kwargs):
+            counter.opens += 1
+            return counter._open(*args, **kwargs)
+        def counting_parse(zip_self):
+            counter.parses += 1
+            return counter._parse(zip_self)
+        builtins.open = io.open = counting_open
+        zipfile.ZipFile._RealGetContents = counting_parse
+        return self
+
+    def __exit__(self, *exc):
+        builtins.open = io.open = self._open
+        zipfile.ZipFile._RealGetContents = self._parse
+
+
+def legacy_pass(library):
+    """The archive access pattern of get_paths(), load() and check_exists() before ExtensionArchive."""
+    paths = []
+    for root, dirs, files in os.walk(library):
+        for file_name in files:
+            path = os.path.join(root, file_name)
+            if zipfile.is_zipfile(path):
+                ext_zip = zipfile.ZipFile(path, 'r')
+                if [name for name in ext_zip.namelist() if name.endswith(".conf")]:
+                    paths.append(path)
+        break
+    for path in paths:
+        config = None
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path, 'r') as zip_ext:
+                for file_name in zip_ext.namelist():
+                    if file_name.endswith(".conf"):
+                        config = json.loads(zip_ext.read(file_name).decode('utf-8'))
+        #validate_all checks the tests file and the main, settings, and toolbar files.
+        for gui in ["tests", "main", "settings", "toolbar"]:
+            file_name = str(config.get(gui, "main")) + ".py"
+            zipfile.ZipFile(path, 'r').namelist().count(file_name)
+    return len(paths)
+
+def current_pass(library):
+    """The same work done through ConfigManager, LibraryIndex, and a shared ExtensionArchive."""
+    configs = extension_manager.ConfigManager(library)
+    for path, config in zip(configs.paths, configs.configs):
+        validator = validate.ClientConfig(config, archive=extension_archive.open_archive(path))
+        validator.validate_all()
+    extension_archive.close_all()
+    return len(configs.configs)
+
+def main(library):
+    app = QtCore.QCoreApplication([])
+    with Counter() as legacy:
+        extensions = legacy_pass(library)
+    with Counter() as current:
+        current_pass(library)
+    print("Extensions inspected: {0}".format(extensions))
+    print("{0:<10} {1:>12} {2:>24}".format("", "file opens", "central-dir parses"))
+    for name, count in [("before", legacy), ("after", current)]:
+        print("{0:<10} {1:>12} {2:>24}".format(name, count.opens, count.parses))
+    if extensions:
+        print("Saved per extension: {0:.1f} opens, {1:.1f} parses".format(
+            (legacy.opens - current.opens) / extensions,
+            (legacy.parses - current.parses) / extensions))
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else os.path.join("tests", "mock", "extensions"))
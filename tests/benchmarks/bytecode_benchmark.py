@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+This program is a part of The Commotion Client
+
+Copyright (C) 2014  Seamus Tuohy s2e@opentechinstitute.org
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+"""
+bytecode_benchmark.py
+
+Times how long it takes to get the code of every module in each extension with and without byte-code packaged into its archive.
+
+Each extension in the source directory is packaged twice with build/scripts/zip_extensions.py, once source only and once with byte-code. The code objects are fetched through a fresh zipimporter the way an extension is imported on a new launch. Module code is not run, so extensions that import the GUI can be measured without a display.
+
+Run from the root of the repository (needs Python 3.7 or newer):
+
+    python3 -m tests.benchmarks.bytecode_benchmark [extension_source_directory] [repeats]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import zipfile
+import zipimport
+
+sys.path.insert(0, os.path.join("build", "scripts"))
+import zip_extensions
+
+
+def module_names(archive_path):
+    """Returns the importable names of every .py member of an archive."""
+    names = []
+    with zipfile.ZipFile(archive_path) as archive:
+        for name in sorted(archive.namelist()):
+            if name.endswith(".py"):
+                module = name[:-3].replace("/", ".")
+                if module.endswith(".__init__"):
+                    module = module[:-len(".__init__")]
+                names.append(module)
+    return names
+
+def time_imports(archive_path, repeats):
+    """Returns the best time in seconds to get the code of every module in an archive through a new zipimporter."""
+    names = module_names(archive_path)
+    best = None
+    for _ in range(repeats):
+        #zipimport keeps each archive's directory for the life of the process. A new launch has to read it again.
+        zipimport._zip_directory_cache.pop(archive_path, None)
+        started = time.perf_counter()
+        importer = zipimport.zipimporter(archive_path)
+        for name in names:
+            parts = name.split(".")
+            sub_importer = importer if len(parts) == 1 else zipimport.zipimporter(os.path.join(archive_path, *parts[:-1]))
+            sub_importer.get_code(parts[-1])
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(names)
+
+def main(source, repeats):
+    if not zip_extensions.bytecode_supported():
+        sys.exit("Packaging byte-code needs Python 3.7 or newer.")
+    work = tempfile.mkdtemp()
+    try:
+        print("{0:<20} {1:>8} {2:>14} {3:>14} {4:>8}".format("extension", "modules", "source (ms)", "bytecode (ms)", "speedup"))
+        for extension in zip_extensions.get_extensions(source):
+            name = os.path.basename(extension)
+            results = []
+            for bytecode in [False, True]:
+                destination = os.path.join(work, "bytecode" if bytecode else "source")
+                os.makedirs(destination, exist_ok=True)
+                zip_extensions.zip_extension(extension, destination, bytecode=bytecode)
+                results.append(time_imports(os.path.join(destination, name), repeats))
+            (source_time, modules), (bytecode_time, _) = results
+            print("{0:<20} {1:>8} {2:>14.3f} {3:>14.3f} {4:>7.1f}x".format(
+                name, modules, source_time * 1000, bytecode_time * 1000, source_time / bytecode_time if bytecode_time else 0))
+    finally:
+        shutil.rmtree(work)
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else os.path.join("commotion_client", "extensions"),
+         int(sys.argv[2]) if len(sys.argv) > 2 else 20)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+This program is a part of The Commotion Client
+
+Copyright (C) 2014  Seamus Tuohy s2e@opentechinstitute.org
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+"""
+control_benchmark.py
+
+Measures the throughput and latency of the JSON control API of a running Commotion client.
+
+Each client process opens one persistent connection and calls a control command over it. Calls are sent one at a time, or in pipelined batches with --pipeline, and the latency of each call (or batch) is recorded. All clients run at the same time to show how one running client copes with many management scripts querying it.
+
+By default the benchmark starts its own client with only the messaging layer (no GUI components) on a throwaway key. Pass --key to measure a client that is already running instead.
+
+Run from the root of the repository:
+
+    python3 -m tests.benchmarks.control_benchmark [--key KEY] [--clients 8] [--calls 500] [--pipeline 1] [--command status]
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+import multiprocessing
+
+from PyQt4 import QtCore
+
+from commotion_client.utils import messaging
+
+
+def serve(key):
+    """Runs a client that only answers control requests until it is killed."""
+    from commotion_client.utils import single_application
+    app = single_application.SingleApplicationWithMessaging(key, sys.argv[:1])
+    app.register_control("status", lambda args: {"pid":os.getpid(), "connections":len(app._connections)})
+    app.register_control("echo", lambda args: args)
+    print("ready", flush=True)
+    app.exec_()
+
+def run_client(options):
+    """Makes calls over one connection and returns the latency of each call or batch in seconds."""
+    key, command, calls, pipeline = options
+    app = QtCore.QCoreApplication([])
+    latencies = []
+    with messaging.MessageClient(key, timeout=5000) as client:
+        if not client.connect():
+            raise IOError("No Commotion client is listening on {0}.".format(key))
+        for _ in range(0, calls, pipeline):
+            started = time.perf_counter()
+            client.call_many([(command, None)] * pipeline)
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+def percentile(values, fraction):
+    """Returns the value below which a fraction of sorted values fall."""
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def main(options):
+    server = None
+    key = options.key
+    if key is None:
+        key = "commotion_control_benchmark_{0}".format(os.getpid())
+        server = subprocess.Popen([sys.executable, "-m", "tests.benchmarks.control_benchmark", "--serve", key],
+                                  stdout=subprocess.PIPE, universal_newlines=True)
+        if server.stdout.readline().strip() != "ready":
+            sys.exit("The benchmark client could not be started.")
+    try:
+        calls = options.calls - options.calls % options.pipeline
+        work = [(key, options.command, calls, options.pipeline)] * options.clients
+        started = time.perf_counter()
+        with multiprocessing.Pool(options.clients) as pool:
+            results = pool.map(run_client, work)
+        elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.kill()
+            server.wait()
+    latencies = sorted(latency for result in results for latency in result)
+    total = calls * options.clients
+    print("{0} clients x {1} calls of {2} ({3} per batch)".format(options.clients, calls, options.command, options.pipeline))
+    print("throughput: {0:.0f} calls/s over {1:.3f} s".format(total / elapsed, elapsed))
+    print("latency per {0} (ms): p50 {1:.3f}  p90 {2:.3f}  p99 {3:.3f}  max {4:.3f}".format(
+        "call" if options.pipeline == 1 else "batch",
+        percentile(latencies, 0.5) * 1000, percentile(latencies, 0.9) * 1000,
+        percentile(latencies, 0.99) * 1000, latencies[-1] * 1000))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the control API of a running Commotion client.")
+    parser.add_argument("--key", help="The key of a running Commotion client. One is started if not provided.")
+    parser.add_argument("--clients", type=int, default=8, help="The number of clients calling at the same time.")
+    parser.add_argument("--calls", type=int, default=500, help="The number of calls each client makes.")
+    parser.add_argument("--pipeline", type=int, default=1, help="The number of calls written before waiting for their responses.")
+    parser.add_argument("--command", default="status", help="The control command to call.")
+    parser.add_argument("--serve", metavar="KEY", help=argparse.SUPPRESS)
+    options = parser.parse_args()
+    if options.serve:
+        serve(options.serve)
+    else:
+        main(options)
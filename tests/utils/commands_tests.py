@@ -0,0 +1,95 @@
+"""
+
+This program is a part of The Commotion Client
+
+Copyright (C) 2014  Seamus Tuohy s2e@opentechinstitute.org
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+
+"""
+Unit Tests for commotion_client/utils/commands.py
+"""
+
+
+from PyQt4 import QtCore
+from PyQt4 import QtGui
+
+
+import unittest
+
+
+from commotion_client.utils import commands
+
+class CommandDispatcherTests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication([])
+        self.run = []
+        self.dispatcher = commands.CommandDispatcher()
+        for name in ["showMain", "debug"]:
+            self.dispatcher.register(name, lambda name=name: self.run.append(name))
+
+    def tearDown(self):
+        self.app.deleteLater()
+        del self.app
+        self.app = None
+
+    def test_coalesce(self):
+        #duplicate commands queued in one pass of the event loop are run once, in the order they first arrived
+        for name in ["showMain", "debug", "showMain", "showMain"]:
+            self.assertTrue(self.dispatcher.queue(name))
+        self.assertFalse(self.dispatcher.queue("pineapple"))
+        self.assertEqual(self.run, [])
+        self.app.processEvents()
+        self.assertEqual(self.run, ["showMain", "debug"])
+        #a later pass runs the command again
+        self.dispatcher.queue("showMain")
+        self.app.processEvents()
+        self.assertEqual(self.run, ["showMain", "debug", "showMain"])
+
+    def test_hold(self):
+        #commands that arrive while held are replayed once released
+        self.dispatcher.hold()
+        self.dispatcher.queue("showMain")
+        self.dispatcher.queue("debug")
+        self.app.processEvents()
+        self.assertEqual(self.run, [])
+        self.dispatcher.release()
+        self.app.processEvents()
+        self.assertEqual(self.run, ["showMain", "debug"])
+
+    def test_hold_during_command(self):
+        #a command that holds the dispatcher (e.g. restart) keeps the commands after it queued
+        self.dispatcher.register("restart", self.dispatcher.hold)
+        for name in ["restart", "showMain"]:
+            self.dispatcher.queue(name)
+        self.app.processEvents()
+        self.assertEqual(self.dispatcher.queued, ["showMain"])
+        self.dispatcher.queue("debug")
+        self.dispatcher.release()
+        self.app.processEvents()
+        self.assertEqual(self.run, ["showMain", "debug"])
+
+    def test_failed_command(self):
+        #a failing handler does not stop the commands after it
+        def fail():
+            raise RuntimeError("failed")
+        self.dispatcher.register("fail", fail)
+        self.dispatcher.queue("fail")
+        self.dispatcher.queue("debug")
+        self.app.processEvents()
+        self.assertEqual(self.run, ["debug"])
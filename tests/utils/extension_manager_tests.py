@@ -60,10 +60,25 @@ import re
 import os
 import sys
 import copy
+import shutil
+import filecmp
+import zipfile
 import types
+from unittest import mock
+from concurrent import futures
 
 
 from commotion_client.utils import extension_manager
+from commotion_client.utils import library_index
+from commotion_client.utils import extension_archive
+from commotion_client.utils import extension_settings
+from commotion_client.utils import library_watcher
+from commotion_client.utils import module_cache
+from commotion_client.utils import archive_verifier
+from commotion_client.utils import fs_utils
+
+sys.path.insert(0, os.path.join("build", "scripts"))
+import zip_extensions
 
 class ExtensionSettingsTestCase(unittest.TestCase):
 
@@ -79,6 +94,7 @@ class ExtensionSettingsTestCase(unittest.TestCase):
         del self.app
         self.app = None
         self.ext_mgr.user_settings.clear()
+        extension_manager.invalidate()
         self.ext_mgr = None
         #Delete everything under tests/temp
         for root, dirs, files in os.walk(os.path.abspath("tests/temp/"), topdown=False):
@@ -108,6 +124,46 @@ class LoadConfigSettings(ExtensionSettingsTestCase):
             contains = (ext in k)
             self.assertTrue(contains, "Core extension {0} should have been loaded, but was not.".format(ext))
 
+    def test_load_core_sync(self):
+        self.ext_mgr.libraries['core'] = os.path.abspath("tests/mock/extensions/")
+        self.ext_mgr.libraries['global'] = os.path.abspath("tests/temp/")
+        global_path = os.path.abspath("tests/temp/unit_test_mock")
+        self.assertEqual(self.ext_mgr.load_core(), ["unit_test_mock"])
+        self.assertEqual(self.ext_mgr.extensions['global'].find("unit_test_mock")['name'], "unit_test_mock")
+        #unchanged copies are neither copied nor hashed
+        with mock.patch.object(extension_manager.fs_utils, "atomic_copy") as copy_:
+            with mock.patch.object(library_index, "file_hash") as hash_:
+                self.assertEqual(self.ext_mgr.load_core(), [])
+                self.assertFalse(copy_.called)
+                self.assertFalse(hash_.called)
+        #a touched copy with the same contents is hashed once and not copied
+        os.utime(global_path, (0, 0))
+        self.assertEqual(self.ext_mgr.load_core(), [])
+        with mock.patch.object(library_index, "file_hash") as hash_:
+            self.assertEqual(self.ext_mgr.load_core(), [])
+            self.assertFalse(hash_.called)
+        #a copy that differs is replaced and only its global config is reloaded
+        self.ext_mgr.install_loaded("global")
+        self.ext_mgr.registry.set_value("unit_test_mock", "initialized", "false")
+        self.ext_mgr.registry.set_value("unit_test_mock", "menu_item", "An Outdated Mock Testing Object")
+        self.ext_mgr.registry.set_value("unit_test_mock", "favorite", "yes")
+        with open(global_path, "ab") as global_copy:
+            global_copy.write(b"outdated")
+        with mock.patch.object(extension_manager.ExtensionManager, "init_extension_config") as init:
+            self.assertEqual(self.ext_mgr.load_core(), ["unit_test_mock"])
+            init.assert_called_once_with("core")
+        self.assertTrue(filecmp.cmp(global_path, "tests/mock/extensions/unit_test_mock", shallow=False))
+        self.assertEqual(os.listdir("tests/temp/"), ["unit_test_mock"])
+        #the installed extension is refreshed in place and keeps the user's settings
+        self.assertEqual(self.ext_mgr.get_property("unit_test_mock", "menu_item"), "A Mock Testing Object")
+        self.assertFalse(self.ext_mgr.registry.value("unit_test_mock", "initialized"))
+        self.assertEqual(self.ext_mgr.registry.value("unit_test_mock", "favorite"), "yes")
+        #a global copy that was deleted is copied back without reinstalling the extension
+        os.remove(global_path)
+        self.assertEqual(self.ext_mgr.load_core(), ["unit_test_mock"])
+        self.assertFalse(self.ext_mgr.registry.value("unit_test_mock", "initialized"))
+        self.assertEqual(self.ext_mgr.registry.value("unit_test_mock", "favorite"), "yes")
+
     def test_init_extension_config(self):
         """Test that init extension config properly handles the various use cases."""
         #ext_type MUST be core|global|user
@@ -145,8 +201,8 @@ class GetConfigSettings(ExtensionSettingsTestCase):
         empty_inst = self.ext_mgr.get_installed()
         self.assertEqual(empty_inst, {})
         #add a value to settings
-        self.ext_mgr.user_settings.setValue("test/type", "global")
-        self.ext_mgr.user_settings.sync()
+        self.ext_mgr.registry.set("test", {"type":"global"})
+        self.ext_mgr.registry.sync()
         one_item = self.ext_mgr.get_installed()
         self.assertEqual(len(one_item), 1)
         self.assertIn("test", one_item)
@@ -158,8 +214,8 @@ class GetConfigSettings(ExtensionSettingsTestCase):
         self.assertFalse(self.ext_mgr.check_installed())
         self.assertFalse(self.ext_mgr.check_installed("test"))
         #add a value to settings
-        self.ext_mgr.user_settings.setValue("test/type", "global")
-        self.ext_mgr.user_settings.sync()
+        self.ext_mgr.registry.set("test", {"type":"global"})
+        self.ext_mgr.registry.sync()
         self.assertTrue(self.ext_mgr.check_installed())
         self.assertTrue(self.ext_mgr.check_installed("test"))
         self.assertFalse(self.ext_mgr.check_installed("pineapple"))
@@ -272,10 +328,174 @@ class ExtensionLibraries(ExtensionSettingsTestCase):
         with self.assertRaises(AttributeError):
             self.ext_mgr.load_user_interface("unit_test_mock", "pineapple")
         #reject uninitialized extensions
-        self.ext_mgr.user_settings.setValue("unit_test_mock/initialized", False)
+        self.ext_mgr.registry.set_value("unit_test_mock", "initialized", False)
         with self.assertRaises(AttributeError):
             self.ext_mgr.load_user_interface("unit_test_mock", "toolbar")
 
+    def test_registry(self):
+        #setup directory with extension
+        self.ext_mgr.libraries['user'] = os.path.abspath("tests/mock/extensions/")
+        self.ext_mgr.init_extension_config("user")
+        self.ext_mgr.install_loaded("user")
+        registry = self.ext_mgr.registry
+        #indexed and un-indexed lookups are served from memory
+        self.assertEqual(registry.find("parent", "Testing"), ["unit_test_mock"])
+        self.assertEqual(registry.find("initialized", "true"), ["unit_test_mock"])
+        self.assertEqual(registry.find("menu_item", "A Mock Testing Object"), ["unit_test_mock"])
+        #writes go through to the settings file and reload with the same types
+        registry.set_value("unit_test_mock", "parent", "Moved")
+        self.assertEqual(registry.find("parent", "Testing"), [])
+        self.assertEqual(registry.values("parent"), ["Moved"])
+        registry.sync()
+        reloaded = extension_settings.ExtensionSettings(self.ext_mgr.user_settings)
+        self.assertEqual(reloaded.get("unit_test_mock"), registry.get("unit_test_mock"))
+        self.assertIs(reloaded.value("unit_test_mock", "initialized"), True)
+        self.assertEqual(reloaded.find("parent", "Moved"), ["unit_test_mock"])
+
+    def test_registry_index(self):
+        registry = self.ext_mgr.registry
+        registry.set("first", {"name":"first", "parent":"Testing", "initialized":"true"})
+        registry.set("second", {"name":"second", "parent":"Testing", "initialized":"false"})
+        self.assertEqual(registry.find("parent", "Testing"), ["first", "second"])
+        self.assertEqual(registry.find("initialized", True), ["first"])
+        #a value that moves from one extension to another moves in the index
+        registry.set_value("second", "parent", "Other")
+        self.assertEqual(registry.find("parent", "Testing"), ["first"])
+        self.assertEqual(registry.find("parent", "Other"), ["second"])
+        self.assertEqual(registry.values("parent"), ["Other", "Testing"])
+        registry.set_many({"first":{"parent":"Other", "initialized":"false"}}, replace=False)
+        self.assertEqual(registry.find("parent", "Testing"), [])
+        self.assertEqual(registry.find("parent", "Other"), ["first", "second"])
+        self.assertEqual(registry.find("initialized", "false"), ["first", "second"])
+        self.assertEqual(registry.values("parent"), ["Other"])
+        #removed extensions are dropped from the index
+        self.ext_mgr.remove_extension_settings("first")
+        self.assertEqual(registry.find("parent", "Other"), ["second"])
+        self.assertEqual(registry.find("initialized", False), ["second"])
+        #values that cannot be hashed are left out of the index and found by scanning the records
+        registry.set("third", {"name":"third", "parent":["Testing", "Other"]})
+        self.assertEqual(registry.find("parent", ["Testing", "Other"]), ["third"])
+        self.assertEqual(registry.values("parent"), ["Other"])
+        registry.set_value("third", "parent", "Other")
+        self.assertEqual(registry.find("parent", ["Testing", "Other"]), [])
+        self.assertEqual(registry.find("parent", "Other"), ["second", "third"])
+        #the incrementally kept index matches one built from scratch
+        index, key_values = copy.deepcopy(registry.index), copy.deepcopy(registry.key_values)
+        registry.build_indexes()
+        self.assertEqual(index, registry.index)
+        self.assertEqual(key_values, registry.key_values)
+
+    def test_install_extensions(self):
+        self.ext_mgr.libraries['user'] = os.path.abspath("tests/mock/extensions/")
+        self.ext_mgr.init_extension_config("user")
+        config = self.ext_mgr.extensions["user"].find("unit_test_mock")
+        #a strict batch with an invalid config writes nothing
+        self.assertEqual(self.ext_mgr.install_extensions([config, {}], "user", strict=True), [])
+        self.assertEqual(self.ext_mgr.user_settings.childGroups(), [])
+        #the whole batch is written with a single sync
+        with mock.patch.object(self.ext_mgr.user_settings, "sync") as sync:
+            self.assertEqual(self.ext_mgr.install_extensions([config, {}], "user"), ["unit_test_mock"])
+            self.assertEqual(sync.call_count, 1)
+        self.assertTrue(self.ext_mgr.check_installed("unit_test_mock"))
+        #a failed write rolls back every extension in the batch
+        registry = self.ext_mgr.registry
+        self.ext_mgr.user_settings.setValue("unit_test_mock/menu_level", "10")
+        registry.load()
+        before = registry.get("unit_test_mock")
+        def disk_full(key, value):
+            if value == "Moved":
+                raise IOError("disk full")
+            return mock.DEFAULT
+        with mock.patch.object(registry, "settings", wraps=registry.settings) as settings:
+            settings.setValue.side_effect = disk_full
+            with self.assertRaises(IOError):
+                registry.set_many({"unit_test_mock":{"type":"user", "parent":"Moved"}, "new_ext":{"type":"user"}})
+        self.assertEqual(registry.get("unit_test_mock"), before)
+        self.assertNotIn("new_ext", registry)
+        #the stored values keep their types
+        self.assertEqual(self.ext_mgr.user_settings.value("unit_test_mock/initialized"), "true")
+        self.assertEqual(self.ext_mgr.user_settings.value("unit_test_mock/menu_level"), "10")
+        reloaded = extension_settings.ExtensionSettings(self.ext_mgr.user_settings)
+        self.assertEqual(reloaded.get("unit_test_mock"), before)
+        self.assertNotIn("new_ext", reloaded)
+
+    def test_update_library(self):
+        library = os.path.abspath("tests/temp/user/")
+        os.makedirs(library)
+        self.ext_mgr.libraries['user'] = library
+        self.ext_mgr.init_extension_config("user")
+        watcher = library_watcher.LibraryWatcher(self.ext_mgr)
+        changed = []
+        watcher.extensions_changed.connect(changed.append)
+        #an archive dropped into a library is loaded and installed
+        archive = os.path.join(library, "unit_test_mock")
+        shutil.copy("tests/mock/extensions/unit_test_mock", archive)
+        watcher.queue_change(library)
+        watcher.apply_changes()
+        self.assertEqual(changed, [["unit_test_mock"]])
+        self.assertTrue(self.ext_mgr.check_installed("unit_test_mock"))
+        self.assertIn(archive, watcher.watcher.files())
+        #unchanged archives are not read again
+        with mock.patch.object(library_index.LibraryIndex, "_read") as read:
+            self.assertEqual(self.ext_mgr.update_library("user"), [])
+            self.assertFalse(read.called)
+        #a removed archive is uninstalled and its handle is closed
+        extension_archive.open_archive(archive)
+        os.remove(archive)
+        self.assertEqual(self.ext_mgr.update_library("user"), ["unit_test_mock"])
+        self.assertNotIn(archive, extension_archive._cache)
+        self.assertNotIn("unit_test_mock", self.ext_mgr.registry)
+        self.assertEqual(self.ext_mgr.extensions['user'].configs, [])
+
+    def test_update_library_changed(self):
+        library = os.path.abspath("tests/temp/user/")
+        os.makedirs(library)
+        self.ext_mgr.libraries['user'] = library
+        archive = os.path.join(library, "unit_test_mock")
+        shutil.copy("tests/mock/extensions/unit_test_mock", archive)
+        self.ext_mgr.init_extension_config("user")
+        self.ext_mgr.install_loaded("user")
+        #the user disables the extension and changes one of its settings
+        self.ext_mgr.registry.set_value("unit_test_mock", "initialized", "false")
+        self.ext_mgr.registry.set_value("unit_test_mock", "favorite", "yes")
+        #an updated archive changes the values from its config and keeps the user's
+        with zipfile.ZipFile("tests/mock/extensions/unit_test_mock") as original, zipfile.ZipFile(archive, "w") as updated:
+            for info in original.infolist():
+                data = original.read(info)
+                if info.filename == "test.conf":
+                    data = data.replace(b"A Mock Testing Object", b"An Updated Mock Testing Object")
+                updated.writestr(info, data)
+        self.assertEqual(self.ext_mgr.update_library("user"), ["unit_test_mock"])
+        self.assertEqual(self.ext_mgr.get_property("unit_test_mock", "menu_item"), "An Updated Mock Testing Object")
+        self.assertFalse(self.ext_mgr.registry.value("unit_test_mock", "initialized"))
+        self.assertEqual(self.ext_mgr.registry.value("unit_test_mock", "favorite"), "yes")
+        self.ext_mgr.user_settings.sync()
+        self.assertEqual(self.ext_mgr.user_settings.value("unit_test_mock/menu_item"), "An Updated Mock Testing Object")
+        self.assertEqual(self.ext_mgr.user_settings.value("unit_test_mock/initialized"), "false")
+        self.assertEqual(self.ext_mgr.user_settings.value("unit_test_mock/favorite"), "yes")
+
+    def test_shared_state(self):
+        extension_manager.invalidate()
+        #creating a manager does not touch the settings or the libraries
+        with mock.patch.object(extension_manager.ExtensionManager, "get_user_settings") as get_settings:
+            manager = extension_manager.ExtensionManager()
+            self.assertFalse(get_settings.called)
+        #managers share libraries, configs, and installed extensions
+        self.ext_mgr.libraries['user'] = os.path.abspath("tests/mock/extensions/")
+        self.assertEqual(len(manager.get_configs("user")), 1)
+        self.assertIs(manager.extensions, self.ext_mgr.extensions)
+        self.ext_mgr.install_loaded("user")
+        self.assertTrue(manager.check_installed("unit_test_mock"))
+        #invalidating clears the shared state and notifies listeners
+        cleared = []
+        extension_manager.on_invalidate(cleared.append)
+        manager.invalidate("extensions")
+        extension_manager.remove_invalidate_callback(cleared.append)
+        self.assertEqual(cleared, [["extensions"]])
+        self.assertEqual(self.ext_mgr.extensions, {})
+        with self.assertRaises(ValueError):
+            extension_manager.invalidate("pineapple")
+
     def test_get_config(self):
         #setup directory with extension
         self.ext_mgr.libraries['user'] = os.path.abspath("tests/mock/extensions/")
@@ -487,6 +707,172 @@ class ConfigManagerTests(unittest.TestCase):
         paths = self.empty_config.get_paths("tests/mock/extensions")
         self.assertEqual(paths, [os.path.abspath("tests/mock/extensions/unit_test_mock")])
         
+    def test_index(self):
+        index_path = os.path.abspath("tests/temp/extension_index.json")
+        #loading the library through an index persists each archive's config and members
+        index = library_index.LibraryIndex(index_path)
+        self.full_config = extension_manager.ConfigManager("tests/mock/extensions", index)
+        index.save()
+        self.assertTrue(os.path.isfile(index_path))
+        reloaded = library_index.LibraryIndex(index_path)
+        entry = reloaded.entries[os.path.abspath("tests/mock/extensions/unit_test_mock")]
+        self.assertIn("test.conf", entry["members"])
+        self.assertEqual(entry["config"]["name"], "unit_test_mock")
+        #unchanged archives are served from the index without being re-opened
+        with mock.patch.object(library_index.LibraryIndex, "_read") as read:
+            cached_config = extension_manager.ConfigManager("tests/mock/extensions", reloaded)
+            self.assertFalse(read.called)
+        self.assertEqual(cached_config.configs, self.full_config.configs)
+
+    def test_scan_files(self):
+        library = os.path.abspath("tests/temp/library")
+        os.makedirs(os.path.join(library, "level", "deeper"))
+        for path in ["first", "level/second", "level/deeper/third"]:
+            with open(os.path.join(library, path), "w") as _file:
+                _file.write(path)
+        #files are found one level down and each is stat'ed from its directory entry
+        with mock.patch.object(fs_utils.os, "stat", wraps=os.stat) as stat_:
+            found = list(fs_utils.scan_files(library))
+            if hasattr(os, "scandir"):
+                self.assertEqual([call[0][0] for call in stat_.call_args_list], [library])
+        self.assertEqual([path for path, _ in found], [os.path.join(library, "first"), os.path.join(library, "level", "second")])
+        self.assertEqual([file_stat.st_size for _, file_stat in found], [5, 12])
+        with self.assertRaises(NotADirectoryError):
+            list(fs_utils.scan_files(os.path.join(library, "first")))
+
+    def test_parallel_load(self):
+        serial = extension_manager.ConfigManager("tests/mock/extensions")
+        #reading archives on a thread pool gives the same configs in the same order
+        with futures.ThreadPoolExecutor(max_workers=4) as pool:
+            parallel = extension_manager.ConfigManager("tests/mock/extensions", executor=pool)
+        self.assertEqual(parallel.paths, serial.paths)
+        self.assertEqual(parallel.configs, serial.configs)
+
+    def test_verify_archives(self):
+        library = os.path.abspath("tests/temp/")
+        path = os.path.join(library, "unit_test_mock")
+        shutil.copy("tests/mock/extensions/unit_test_mock", path)
+        index = library_index.LibraryIndex()
+        verifier = archive_verifier.ArchiveVerifier(index, key=b"secret")
+        self.assertTrue(verifier.verify(path))
+        #an unchanged archive is only verified once
+        with mock.patch.object(archive_verifier.zipfile, "ZipFile") as zip_:
+            self.assertTrue(verifier.verify(path))
+            self.assertFalse(zip_.called)
+        #archives are checked against a signed manifest
+        archive_verifier.write_manifest(library, b"secret", index)
+        self.assertTrue(verifier.verify(path))
+        self.assertFalse(archive_verifier.ArchiveVerifier(index, key=b"other").verify(path))
+        with open(path, "ab") as archive:
+            archive.write(b"tampered")
+        self.assertFalse(verifier.verify(path))
+        #a corrupt member fails verification without a manifest
+        os.remove(os.path.join(library, archive_verifier.MANIFEST_NAME))
+        shutil.copy("tests/mock/extensions/unit_test_mock", path)
+        self.assertTrue(verifier.verify(path))
+        stat = os.stat(path)
+        with open(path, "r+b") as archive:
+            archive.seek(100)
+            archive.write(b"corrupt!")
+        #even if the archive keeps its size and modification time
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(index.lookup(path)["verified"], verifier.token(library_index.file_hash("tests/mock/extensions/unit_test_mock")))
+        self.assertFalse(verifier.verify(path))
+        #or its index entry is edited by someone without the key
+        index.annotate(path, verified=archive_verifier.ArchiveVerifier(index).token(library_index.file_hash(path)))
+        self.assertFalse(verifier.verify(path))
+
+    def test_module_cache(self):
+        path = os.path.abspath("tests/mock/extensions/unit_test_mock")
+        copy_path = os.path.abspath("tests/temp/unit_test_mock")
+        shutil.copy(path, copy_path)
+        cache = module_cache.ModuleCache(size=1)
+        #modules are only executed once and the extension is only added to sys.path once
+        units = cache.load(path, "units")
+        self.assertIs(cache.load(path, "units"), units)
+        self.assertEqual(sys.path.count(path), 1)
+        self.assertIs(sys.modules["units"], units)
+        #loading another extension evicts the least recently used one
+        copy_units = cache.load(copy_path, "units")
+        self.assertIsNot(copy_units, units)
+        self.assertNotIn(path, cache)
+        self.assertNotIn(path, sys.path)
+        #explicit unloads remove the extension's modules
+        self.assertTrue(cache.unload(copy_path))
+        self.assertNotIn("units", sys.modules)
+        self.assertNotIn(copy_path, sys.path)
+        self.assertFalse(cache.unload(copy_path))
+
+    def test_module_cache_changed(self):
+        path = os.path.abspath("tests/temp/changed_mock")
+        cache = module_cache.ModuleCache()
+        for value, padding in [("first", 0), ("second", 500)]:
+            #members move within the rewritten archive so stale offsets would read the wrong bytes
+            with zipfile.ZipFile(path, "w") as archive:
+                archive.writestr("padding.txt", "x" * padding)
+                archive.writestr("changed_mock.py", "value = '{0}'".format(value))
+            os.utime(path, ns=(0, len(value) * 10**9))
+            #a changed archive is re-read from disk and its modules are executed again
+            self.assertEqual(cache.load(path, "changed_mock").value, value)
+        cache.unload(path)
+
+    @unittest.skipUnless(zip_extensions.bytecode_supported(), "packaging byte-code needs Python 3.7 or newer")
+    def test_bytecode(self):
+        cache = module_cache.ModuleCache()
+        source = os.path.abspath("tests/temp/source/bytecode_mock")
+        os.makedirs(source)
+        with open(os.path.join(source, "bytecode_mock.py"), "w") as module:
+            module.write("def value():\n    pass\n")
+        zip_extensions.zip_extension(source, os.path.abspath("tests/temp"), bytecode=True)
+        path = os.path.abspath("tests/temp/bytecode_mock")
+        #the packager's checked-hash byte-code is loaded, so code keeps the name it was compiled with
+        self.assertTrue(extension_archive.open_archive(path).bytecode_current())
+        self.assertEqual(cache.load(path, "bytecode_mock").value.__code__.co_filename, "bytecode_mock/bytecode_mock.py")
+        cache.unload(path)
+        #byte-code for another interpreter falls back to the source
+        other_path = os.path.abspath("tests/temp/bytecode_other")
+        with zipfile.ZipFile(path) as packaged, zipfile.ZipFile(other_path, "w") as archive:
+            for info in packaged.infolist():
+                data = packaged.read(info)
+                if info.filename.endswith(".pyc"):
+                    data = b"\x00\x00\r\n" + data[len(extension_archive.MAGIC_NUMBER):]
+                archive.writestr(info, data)
+        self.assertFalse(extension_archive.open_archive(other_path).bytecode_current())
+        self.assertEqual(cache.load(other_path, "bytecode_mock").value.__code__.co_filename, os.path.join(other_path, "bytecode_mock.py"))
+        cache.unload(other_path)
+        self.assertFalse(extension_archive.open_archive("tests/mock/extensions/unit_test_mock").bytecode_current())
+
+    def test_archive(self):
+        path = "tests/mock/extensions/unit_test_mock"
+        archive = extension_archive.open_archive(path)
+        #archives are shared per path until they change on disk
+        self.assertIs(archive, extension_archive.open_archive(os.path.abspath(path)))
+        self.assertTrue(archive.has("test.conf"))
+        self.assertFalse(archive.has("pineapple.py"))
+        self.assertEqual(archive.config["name"], "unit_test_mock")
+        self.assertGreater(archive.uncompressed_size, 0)
+        extension_archive.close_archive(path)
+        self.assertIsNot(archive, extension_archive.open_archive(path))
+        #only the most recently used handles are kept open
+        paths = []
+        for number in range(3):
+            paths.append(os.path.abspath("tests/temp/archive_{0}".format(number)))
+            shutil.copy(path, paths[-1])
+        with mock.patch.object(extension_archive, "max_open_handles", 2):
+            archives = [extension_archive.open_archive(archive_path) for archive_path in paths]
+            self.assertEqual([archive.is_open for archive in archives], [False, True, True])
+            #a closed handle is opened again when a member is read
+            self.assertEqual(archives[0].config["name"], "unit_test_mock")
+            self.assertTrue(archives[0].read("test.conf"))
+            self.assertEqual([archive.is_open for archive in archives], [True, False, True])
+            self.assertGreater(archives[1].uncompressed_size, 0)
+            self.assertFalse(archives[1].is_open)
+        for archive_path in paths:
+            extension_archive.close_archive(archive_path)
+        #a non-archive raises a ValueError
+        with self.assertRaises(ValueError):
+            extension_archive.ExtensionArchive("tests/utils/extension_manager_tests.py")
+
     def test_get(self):
         self.empty_config = extension_manager.ConfigManager()
         #a config that does not exist should return an empty list
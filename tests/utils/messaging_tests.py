@@ -0,0 +1,179 @@
+"""
+
+This program is a part of The Commotion Client
+
+Copyright (C) 2014  Seamus Tuohy s2e@opentechinstitute.org
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+
+"""
+Unit Tests for commotion_client/utils/messaging.py
+"""
+
+
+from PyQt4 import QtCore
+from PyQt4 import QtGui
+from PyQt4 import QtNetwork
+
+
+import unittest
+import time
+from unittest import mock
+
+
+from commotion_client.utils import messaging
+from commotion_client.utils import single_application
+
+class FrameBufferTests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication([])
+
+    def tearDown(self):
+        self.app.deleteLater()
+        del self.app
+        self.app = None
+
+    def test_frames(self):
+        data = messaging.encode({"id":1, "message":"showMain"}) + messaging.encode({"id":2, "message":"x" * 70000})
+        buffer = messaging.FrameBuffer()
+        #frames split across reads are only returned once they are complete
+        received = []
+        for start in range(0, len(data), 4096):
+            buffer.feed(data[start:start + 4096])
+            received.extend(messaging.decode(payload) for payload in buffer.frames())
+        self.assertEqual([request["id"] for request in received], [1, 2])
+        self.assertEqual(received[1]["message"], "x" * 70000)
+        self.assertEqual(buffer.pending(), 0)
+        #a partial header waits for the rest of the frame
+        buffer.feed(messaging.encode({"id":3})[:2])
+        self.assertEqual(list(buffer.frames()), [])
+        self.assertEqual(buffer.pending(), 2)
+
+    def test_max_size(self):
+        buffer = messaging.FrameBuffer(max_size=10)
+        buffer.feed(messaging.encode_frame(b"x" * 10))
+        self.assertEqual(list(buffer.frames()), [b"x" * 10])
+        #an oversized frame is refused as soon as its header arrives
+        buffer.feed(messaging.HEADER.pack(11))
+        with self.assertRaises(ValueError):
+            list(buffer.frames())
+
+    def test_decode(self):
+        with self.assertRaises(ValueError):
+            messaging.decode(b"[1, 2]")
+        with self.assertRaises(ValueError):
+            messaging.decode(b"\xff")
+
+    def test_no_server(self):
+        self.assertFalse(messaging.send_message("commotion_unit_test_no_server", "showMain", timeout=100))
+
+
+class ClientConnectionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication([])
+        self.server = QtNetwork.QLocalServer()
+        self.server.listen("commotion_unit_test_connection")
+        self.client = QtNetwork.QLocalSocket()
+        self.client.connectToServer("commotion_unit_test_connection")
+        self.assertTrue(self.server.waitForNewConnection(1000))
+        self.requests = []
+        self.closed = []
+        self.connection = single_application.ClientConnection(self.server.nextPendingConnection(), stall_timeout=100)
+        self.connection.request_received.connect(lambda connection, request: self.requests.append(request))
+        self.connection.closed.connect(self.closed.append)
+
+    def tearDown(self):
+        self.client.abort()
+        self.server.close()
+        self.app.deleteLater()
+        del self.app
+        self.app = None
+
+    def process_events(self, condition, timeout=2):
+        end = time.time() + timeout
+        while not condition() and time.time() < end:
+            self.app.processEvents()
+
+    def test_partial_frames(self):
+        data = messaging.encode({"id":1, "message":"showMain"})
+        #the first half of a frame is buffered without dispatching anything
+        self.client.write(data[:5])
+        self.client.flush()
+        self.process_events(lambda: self.connection.buffer.pending())
+        self.assertEqual(self.requests, [])
+        self.client.write(data[5:])
+        self.client.flush()
+        self.process_events(lambda: self.requests)
+        self.assertEqual(self.requests, [{"id":1, "message":"showMain"}])
+        self.assertEqual(self.closed, [])
+
+    def test_stalled(self):
+        #a client that stops part way through a frame is dropped once the stall timeout passes
+        self.client.write(messaging.encode({"id":1, "message":"showMain"})[:5])
+        self.client.flush()
+        self.process_events(lambda: self.closed)
+        self.assertEqual(self.closed, [self.connection])
+        self.assertEqual(self.requests, [])
+
+
+class ControlTests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = single_application.SingleApplicationWithMessaging("commotion_unit_test_control", [])
+        self.app.register_control("echo", lambda args: args)
+        self.responses = []
+        self.connection = mock.Mock()
+        #responses are encoded the way ClientConnection.respond writes them
+        self.connection.respond.side_effect = lambda response: self.responses.append(messaging.decode(messaging.encode(response)[messaging.HEADER.size:]))
+
+    def tearDown(self):
+        self.app.deleteLater()
+        del self.app
+        self.app = None
+
+    def test_handle_control(self):
+        self.app.handle_request(self.connection, {"id":1, "command":"echo", "args":{"a":1}})
+        self.app.handle_request(self.connection, {"id":2, "command":"controls"})
+        self.app.handle_request(self.connection, {"id":3, "command":"pineapple"})
+        self.app.handle_request(self.connection, {"id":4, "command":"echo", "args":[1]})
+        self.assertEqual(self.responses[0], {"id":1, "ok":True, "result":{"a":1}})
+        self.assertEqual(self.responses[1]["result"], ["controls", "echo"])
+        self.assertEqual([response["ok"] for response in self.responses], [True, True, False, False])
+
+    def test_invalid_command(self):
+        #a command that is not a string is answered instead of raising in the slot
+        for request_id, command in enumerate([["echo"], {"name":"echo"}, 1, None]):
+            self.app.handle_request(self.connection, {"id":request_id, "command":command})
+        self.assertEqual([response["id"] for response in self.responses], [0, 1, 2, 3])
+        self.assertEqual([response["ok"] for response in self.responses], [False] * 4)
+
+    def test_failed_control(self):
+        def fail(args):
+            raise ValueError("bad level")
+        self.app.register_control("fail", fail)
+        self.app.register_control("crash", lambda args: 1 / 0)
+        self.app.register_control("unserializable", lambda args: object())
+        self.app.handle_request(self.connection, {"id":1, "command":"fail"})
+        self.app.handle_request(self.connection, {"id":2, "command":"crash"})
+        self.app.handle_request(self.connection, {"id":3, "command":"unserializable"})
+        self.assertEqual(self.responses[0], {"id":1, "ok":False, "error":"bad level"})
+        self.assertFalse(self.responses[1]["ok"])
+        #a result that cannot be sent as JSON is still answered
+        self.assertEqual(self.responses[2]["id"], 3)
+        self.assertFalse(self.responses[2]["ok"])
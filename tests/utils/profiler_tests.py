@@ -0,0 +1,76 @@
+"""
+
+This program is a part of The Commotion Client
+
+Copyright (C) 2014  Seamus Tuohy s2e@opentechinstitute.org
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+
+"""
+Unit Tests for commotion_client/utils/profiler.py
+"""
+
+
+from PyQt4 import QtCore
+from PyQt4 import QtGui
+
+
+import unittest
+import json
+import itertools
+
+
+from commotion_client.utils import profiler
+
+class StartupProfilerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication([])
+        #every reading of the clock is one second after the last
+        self.clock = itertools.count(0).__next__
+
+    def tearDown(self):
+        self.app.deleteLater()
+        del self.app
+        self.app = None
+        profiler.disable()
+
+    def test_disabled(self):
+        self.assertFalse(profiler.enabled())
+        with profiler.phase("nothing") as record:
+            self.assertIsNone(record)
+        self.assertIsNone(profiler.report())
+        self.assertIsNone(profiler.finish())
+
+    def test_report(self):
+        profiler.enable(self.clock)
+        with profiler.phase("init_client"):
+            with profiler.phase("extension_manager"):
+                pass
+            with profiler.phase("main_window"):
+                with profiler.phase("menu_bar"):
+                    pass
+        report = profiler.finish()
+        self.assertEqual(json.loads(json.dumps(report)), report)
+        self.assertTrue(report["finished"])
+        self.assertEqual(report["total_ms"], 9000)
+        init_client = report["phases"][0]
+        self.assertEqual((init_client["name"], init_client["start_ms"], init_client["duration_ms"]), ("init_client", 1000, 7000))
+        self.assertEqual([phase["name"] for phase in init_client["phases"]], ["extension_manager", "main_window"])
+        self.assertEqual(init_client["phases"][1]["phases"][0]["name"], "menu_bar")
+        #finishing again does not move the end of startup
+        self.assertEqual(profiler.finish()["total_ms"], 9000)
@@ -0,0 +1,98 @@
+"""
+
+This program is a part of The Commotion Client
+
+Copyright (C) 2014  Seamus Tuohy s2e@opentechinstitute.org
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+
+"""
+Unit Tests for commotion_client/utils/restart.py
+"""
+
+
+from PyQt4 import QtCore
+from PyQt4 import QtGui
+
+
+import unittest
+import time
+
+
+from commotion_client.utils import restart
+
+class RestartSequenceTests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication([])
+        self.events = []
+        self.components = []
+
+    def tearDown(self):
+        self.app.deleteLater()
+        del self.app
+        self.app = None
+
+    def process_events(self, sequence, timeout=5):
+        end = time.time() + timeout
+        while not sequence.done() and time.time() < end:
+            self.app.processEvents()
+            #deleteLater is only carried out by a running event loop
+            while self.components:
+                self.app.sendPostedEvents(self.components.pop(), QtCore.QEvent.DeferredDelete)
+        return sequence.result
+
+    def stop(self):
+        self.events.append("stop")
+        self.components = [QtCore.QObject(), QtCore.QObject()]
+        #components report they have stopped by being destroyed
+        for component in self.components:
+            component.deleteLater()
+        return self.components
+
+    def start(self):
+        self.events.append("start")
+
+    def test_restart(self):
+        sequence = restart.RestartSequence(self.stop, self.start, timeout=10000)
+        sequence.start()
+        #nothing is started until the stopped components are gone
+        self.assertEqual(self.events, ["stop"])
+        self.assertEqual(sequence.phase, "wait")
+        self.assertTrue(self.process_events(sequence))
+        self.assertEqual(self.events, ["stop", "start"])
+        self.assertEqual(sorted(sequence.timings.keys()), ["start", "stop", "wait"])
+        #the restart finished long before the wait timed out
+        self.assertLess(sequence.timings["wait"], 5000)
+
+    def test_timeout(self):
+        #a component that is never destroyed does not stop the restart
+        lingering = QtCore.QObject()
+        sequence = restart.RestartSequence(lambda: [lingering], self.start, timeout=50)
+        sequence.start()
+        self.assertTrue(self.process_events(sequence))
+        self.assertEqual(self.events, ["start"])
+
+    def test_failed(self):
+        def fail():
+            raise RuntimeError("could not start")
+        results = []
+        sequence = restart.RestartSequence(lambda: [], fail)
+        sequence.finished.connect(results.append)
+        sequence.start()
+        self.assertFalse(self.process_events(sequence))
+        self.assertEqual(results, [False])
@@ -0,0 +1,116 @@
+"""
+
+This program is a part of The Commotion Client
+
+Copyright (C) 2014  Seamus Tuohy s2e@opentechinstitute.org
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+
+"""
+Unit Tests for commotion_client/utils/validate.py
+
+Uses the mock extension in tests/mock/extensions/unit_test_mock.
+"""
+
+
+from PyQt4 import QtCore
+from PyQt4 import QtGui
+
+
+import unittest
+import os
+import sys
+import copy
+import shutil
+import tempfile
+from unittest import mock
+
+
+from commotion_client.utils import validate
+from commotion_client.utils import extension_archive
+
+class ClientConfigTests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QtGui.QApplication([])
+        self.app.setOrganizationName("test_case");
+        self.app.setApplicationName("testing_app");
+        self.library = os.path.abspath("tests/mock/extensions/")
+        self.config = copy.deepcopy(extension_archive.open_archive(os.path.join(self.library, "unit_test_mock")).config)
+        validate._reports.clear()
+
+    def tearDown(self):
+        self.app.deleteLater()
+        del self.app
+        self.app = None
+        validate._reports.clear()
+
+    def test_report(self):
+        #a valid config has no errors
+        report = validate.ClientConfig(self.config, self.library).report()
+        self.assertTrue(report.valid)
+        #every invalid value is collected into one report
+        self.config["menu_level"] = 500
+        self.config["parent"] = "ab"
+        self.config["toolbar"] = "pineapple"
+        validator = validate.ClientConfig(self.config, self.library)
+        report = validator.report()
+        self.assertEqual(list(report.errors.keys()), ["menu_level", "parent", "toolbar"])
+        self.assertFalse(report.as_dict()["valid"])
+        self.assertFalse(validator.validate_all())
+        self.assertEqual(validator.errors, ["menu_level", "parent", "toolbar"])
+
+    def test_report_cache(self):
+        validator = validate.ClientConfig(self.config, self.library)
+        with mock.patch.object(validate.ClientConfig, "build_report", wraps=validator.build_report) as build:
+            validator.validate_all()
+            validator.name()
+            validator.gui("main")
+            validate.ClientConfig(copy.deepcopy(self.config), self.library).menu_item()
+            self.assertEqual(build.call_count, 1)
+            #a different config is validated again
+            self.config["menu_level"] = 20
+            validate.ClientConfig(self.config, self.library).menu_level()
+            self.assertEqual(build.call_count, 2)
+
+    def test_path_chars(self):
+        validator = validate.ClientConfig(self.config)
+        #file names are checked against the platform's table, not compiled as patterns
+        for platform, name in [("linux", "a/b"), ("darwin", "a:b"), ("win32", "a?b"), ("win32", "a\\b")]:
+            with mock.patch.object(sys, "platform", platform):
+                self.assertFalse(validator.check_path_chars(name))
+                self.assertTrue(validator.check_path_chars("main.py"))
+                self.assertTrue(validator.check_path_chars("a(b"))
+
+    def test_validate_library(self):
+        report = validate.validate_library(self.library)
+        self.assertTrue(report.valid)
+        self.assertIn(os.path.join(self.library, "unit_test_mock"), report.reports)
+        #every broken archive in a library is rejected in a single pass
+        tmp = tempfile.mkdtemp()
+        try:
+            shutil.copy(os.path.join(self.library, "unit_test_mock"), os.path.join(tmp, "unit_test_mock"))
+            shutil.copy(os.path.join(self.library, "unit_test_mock"), os.path.join(tmp, "misnamed"))
+            with open(os.path.join(tmp, "broken"), "w") as broken:
+                broken.write("not a zip archive")
+            report = validate.validate_library(tmp)
+            self.assertFalse(report.valid)
+            self.assertEqual(sorted(report.rejected()), [os.path.join(tmp, "broken"), os.path.join(tmp, "misnamed")])
+            self.assertEqual(list(report.reports[os.path.join(tmp, "misnamed")].errors.keys()), ["name"])
+            self.assertEqual(len(report.as_dict()["archives"]), 3)
+        finally:
+            shutil.rmtree(tmp)